@@ -2,10 +2,12 @@
 """Configure alembic migrations."""
 
 from logging.config import fileConfig
+from typing import Any
 
 from cofundable.config import settings
 from cofundable.models.base import UUIDAuditBase
-from sqlalchemy import engine_from_config, pool
+from cofundable.models.search import CAUSE_SEARCH_TABLE
+from sqlalchemy import Connection, engine_from_config, pool
 
 from alembic import context
 
@@ -23,6 +25,24 @@ if config.config_file_name is not None:
 target_metadata = UUIDAuditBase.metadata
 
 
+def include_object(
+    obj: Any,  # noqa: ANN401, ARG001
+    name: str | None,
+    type_: str,
+    reflected: bool,  # noqa: FBT001
+    compare_to: Any,  # noqa: ANN401
+) -> bool:
+    """
+    Skip the SQLite full-text search tables, which aren't in the metadata.
+
+    The FTS5 table (and its shadow tables) are created by migrations and by
+    DDL events in cofundable.models.search instead of being declared.
+    """
+    if type_ == "table" and reflected and compare_to is None:
+        return not (name or "").startswith(CAUSE_SEARCH_TABLE)
+    return True
+
+
 def run_migrations_offline() -> None:
     """
     Run migrations in 'offline' mode.
@@ -43,6 +63,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -56,7 +77,14 @@ def run_migrations_online() -> None:
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    A connection can also be passed in config.attributes["connection"], e.g.
+    by tests that run the migrations on a temporary database.
+
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_on(connection)
+        return
     # gets the SQLAlchemy database URI from the dynaconf settings
     config.set_section_option(
         "alembic",
@@ -70,14 +98,20 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            render_as_batch=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        run_migrations_on(connection)
+
+
+def run_migrations_on(connection: Connection) -> None:
+    """Run the migrations using an open connection."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
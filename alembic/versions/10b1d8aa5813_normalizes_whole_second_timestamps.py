@@ -0,0 +1,47 @@
+"""Normalizes whole second timestamps
+
+Revision ID: 10b1d8aa5813
+Revises: 72b2bf073dae
+Create Date: 2026-10-18 19:25:11.799030
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10b1d8aa5813'
+down_revision: Union[str, None] = '72b2bf073dae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the tables whose rows were timestamped with the database's now() before
+# created_at and updated_at defaulted to utc_now()
+TABLES = ("account", "bookmark", "cause", "tag", "transaction", "user")
+# SQLite's now() stored "YYYY-MM-DD HH:MM:SS", without the microseconds that
+# SQLAlchemy writes and binds, so those values sort before a cursor with the
+# same time and a page could start with the row its cursor was taken from
+WHOLE_SECOND_LENGTH = 19
+MICROSECONDS = ".000000"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name in TABLES:
+        for column in ("created_at", "updated_at"):
+            table = sa.table(name, sa.column(column, sa.String))
+            value = table.c[column]
+            op.execute(
+                sa.update(table)
+                .where(sa.func.length(value) == WHOLE_SECOND_LENGTH)
+                .values({column: value + MICROSECONDS})
+            )
+
+
+def downgrade() -> None:
+    # the normalized values are the same times, so they're left as they are
+    pass
@@ -0,0 +1,78 @@
+"""Adds full-text search index for causes
+
+Revision ID: 124e75e8e7a3
+Revises: 6d2f3cb0bd8e
+Create Date: 2026-10-18 19:08:21.790343
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from cofundable.models.search import (
+    CAUSE_SEARCH_TABLE,
+    SQLITE_DDL,
+    SQLITE_DROP_DDL,
+    cause_document,
+    tag_document,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '124e75e8e7a3'
+down_revision: Union[str, None] = '6d2f3cb0bd8e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # index the existing causes, the triggers index the new ones
+        op.execute(
+            f"""
+            INSERT INTO {CAUSE_SEARCH_TABLE}
+                (cause_id, name, handle, description, tags)
+            SELECT cause.id, cause.name, cause.handle, cause.description, (
+                SELECT group_concat(tag.name, ' ')
+                FROM cause_tag JOIN tag ON tag.id = cause_tag.tag_id
+                WHERE cause_tag.cause_id = cause.id
+            )
+            FROM cause
+            """
+        )
+    elif dialect == "postgresql":
+        op.create_index(
+            "ix_cause_search_document",
+            "cause",
+            [cause_document()],
+            postgresql_using="gin",
+        )
+        op.create_index(
+            "ix_tag_search_document",
+            "tag",
+            [tag_document()],
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in (
+            "cause_search_cause_insert",
+            "cause_search_cause_update",
+            "cause_search_cause_delete",
+            "cause_search_cause_tag_insert",
+            "cause_search_cause_tag_delete",
+            "cause_search_tag_update",
+        ):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for statement in SQLITE_DROP_DDL:
+            op.execute(statement)
+    elif dialect == "postgresql":
+        op.drop_index("ix_tag_search_document", table_name="tag")
+        op.drop_index("ix_cause_search_document", table_name="cause")
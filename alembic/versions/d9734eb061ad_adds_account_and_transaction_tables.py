@@ -95,11 +95,14 @@ def downgrade() -> None:
     # ####################################################
     # Issue DML to delete Cofundable record
     # ####################################################
-    bind = op.get_bind()
-    session = orm.Session(bind=bind)
-    cause = cause_service.get_cause_by_handle(session, "cofundable")
-    if cause:
-        cause_service.delete(session, row_id=cause.id)
+    # Core statements are used instead of cause_service, whose models match
+    # the latest revision rather than this one
+    cause = sa.table("cause", sa.column("id"), sa.column("handle"))
+    cofundable = sa.select(cause.c.id).where(cause.c.handle == "cofundable")
+    for table in ("bookmark", "cause_tag"):
+        links = sa.table(table, sa.column("cause_id"))
+        op.execute(sa.delete(links).where(links.c.cause_id.in_(cofundable)))
+    op.execute(sa.delete(cause).where(cause.c.handle == "cofundable"))
 
     # ####################################################
     # Issue DDL to drop tables and constraints
@@ -0,0 +1 @@
+"""Benchmark the performance of the Cofundable API and its database layer."""
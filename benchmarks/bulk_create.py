@@ -0,0 +1,77 @@
+"""
+Compare the throughput of creating users one at a time and with create_many().
+
+Each run creates users (and their accounts) in a fresh SQLite database, first
+by calling user_service.create() once per user, then by calling
+user_service.create_many() with each of the batch sizes.
+
+Usage: python -m benchmarks.bulk_create --users 10000 --batch-sizes 100 500
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from cofundable.models.base import UUIDAuditBase
+from cofundable.schemas.user import UserRequestSchema
+from cofundable.services.users import user_service
+
+
+def time_run(
+    create_users: Callable[[Session, list[UserRequestSchema]], None],
+    users: int,
+) -> float:
+    """Create the users in a new database and return the rows/s."""
+    data = [
+        UserRequestSchema(name=f"User {i}", handle=f"user-{i}")
+        for i in range(users)
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}")
+        UUIDAuditBase.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            start = time.perf_counter()
+            create_users(db, data)
+            elapsed = time.perf_counter() - start
+        engine.dispose()
+    return users / elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print the throughput of each method."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[100, 500, 1000],
+    )
+    args = parser.parse_args()
+
+    def create_one_at_a_time(db: Session, data: list) -> None:
+        for item in data:
+            user_service.create(db, data=item)
+
+    def create_in_batches(batch_size: int) -> Callable:
+        def create_users(db: Session, data: list) -> None:
+            user_service.create_many(db, data=data, batch_size=batch_size)
+
+        return create_users
+
+    runs = {"create()": create_one_at_a_time} | {
+        f"create_many(batch_size={size})": create_in_batches(size)
+        for size in args.batch_sizes
+    }
+    print(f"{'method':<32}{'users/s':>12}")
+    for name, create_users in runs.items():
+        print(f"{name:<32}{time_run(create_users, args.users):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
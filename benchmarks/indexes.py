@@ -0,0 +1,236 @@
+"""
+Compare the latency of the services' lookups before and after adding indexes.
+
+A SQLite database is populated with accounts, causes, users, tags, bookmarks and
+(by default) 1M transactions without the secondary indexes declared on the
+models. Each lookup is timed, then the indexes are created and the lookups are
+timed again.
+
+Usage: python -m benchmarks.indexes --transactions 1000000 --queries 200
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+from uuid import UUID, uuid4
+
+from sqlalchemy import Engine, Index, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from cofundable.models import Account, Bookmark, Cause, Tag, Transaction, User
+from cofundable.models.associations import cause_tag_table
+from cofundable.models.base import UUIDAuditBase
+from cofundable.schemas.transaction import EntryType
+from cofundable.services.bookmarks import bookmark_service
+from cofundable.services.causes import cause_service
+from cofundable.services.tags import tag_service
+from cofundable.services.transactions import transaction_service
+from cofundable.services.users import user_service
+
+CHUNK_SIZE = 50_000
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def secondary_indexes() -> list[Index]:
+    """Return the indexes declared on the models, excluding primary keys."""
+    return [
+        index
+        for table in UUIDAuditBase.metadata.sorted_tables
+        for index in table.indexes
+    ]
+
+
+def chunks(rows: Iterator[dict]) -> Iterator[list[dict]]:
+    """Split the rows into lists that can be inserted with executemany."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def populate(engine: Engine, args: argparse.Namespace) -> dict[str, list]:
+    """Create the tables without secondary indexes and insert the test data."""
+    UUIDAuditBase.metadata.create_all(bind=engine)
+    for index in secondary_indexes():
+        index.drop(bind=engine)
+
+    def timestamps(i: int) -> dict:
+        created_at = START + timedelta(seconds=i)
+        return {"created_at": created_at, "updated_at": created_at}
+
+    accounts = [uuid4() for _ in range(args.causes + args.users)]
+    causes = [uuid4() for _ in range(args.causes)]
+    users = [uuid4() for _ in range(args.users)]
+    tags = [uuid4() for _ in range(args.tags)]
+    tables: list[tuple] = [
+        (
+            Account,
+            (
+                {"id": account_id, "name": f"account-{i}", "balance": 0}
+                | timestamps(i)
+                for i, account_id in enumerate(accounts)
+            ),
+        ),
+        (
+            Cause,
+            (
+                {
+                    "id": cause_id,
+                    "name": f"Cause {i}",
+                    "handle": f"cause-{i}",
+                    "account_id": accounts[i],
+                }
+                | timestamps(i)
+                for i, cause_id in enumerate(causes)
+            ),
+        ),
+        (
+            User,
+            (
+                {
+                    "id": user_id,
+                    "name": f"User {i}",
+                    "handle": f"user-{i}",
+                    "account_id": accounts[args.causes + i],
+                }
+                | timestamps(i)
+                for i, user_id in enumerate(users)
+            ),
+        ),
+        (
+            Tag,
+            (
+                {"id": tag_id, "name": f"tag-{i}"} | timestamps(i)
+                for i, tag_id in enumerate(tags)
+            ),
+        ),
+        (
+            cause_tag_table,
+            (
+                {"cause_id": cause_id, "tag_id": tag_id}
+                for cause_id in causes
+                for tag_id in random.sample(tags, 3)
+            ),
+        ),
+        (
+            Bookmark,
+            (
+                {"id": uuid4(), "user_id": user_id, "cause_id": cause_id}
+                | timestamps(i)
+                for i, user_id in enumerate(users)
+                for cause_id in random.sample(causes, 5)
+            ),
+        ),
+        (
+            Transaction,
+            (
+                {
+                    "id": uuid4(),
+                    "amount": 1,
+                    "kind": EntryType.credit,
+                    "balance_after": 0,
+                    "account_id": random.choice(accounts),
+                }
+                | timestamps(i)
+                for i in range(args.transactions)
+            ),
+        ),
+    ]
+    with engine.begin() as conn:
+        for table, rows in tables:
+            for chunk in chunks(rows):
+                conn.execute(insert(table), chunk)
+    return {"accounts": accounts, "users": users, "tags": tags}
+
+
+def lookups(ids: dict[str, list], args: argparse.Namespace) -> dict:
+    """Return the lookups to time, each is called with a session."""
+
+    def transactions_by_account(db: Session) -> None:
+        account = Account(id=random.choice(ids["accounts"]))
+        query = transaction_service.query_transactions_by_account(account)
+        db.execute(query.limit(50)).all()
+
+    def cause_by_handle(db: Session) -> None:
+        handle = f"cause-{random.randrange(args.causes)}"
+        cause_service.get_cause_by_handle(db, handle)
+
+    def user_by_handle(db: Session) -> None:
+        handle = f"user-{random.randrange(args.users)}"
+        user_service.get_user_by_handle(db, handle)
+
+    def tags_by_name(db: Session) -> None:
+        names = [f"tag-{random.randrange(args.tags)}" for _ in range(3)]
+        tag_service.get_tags_by_name(db, tag_names=names)
+
+    def bookmarks_by_user(db: Session) -> None:
+        user_id: UUID = random.choice(ids["users"])
+        query = bookmark_service.get_bookmarks_for_user(user_id)
+        db.execute(query.limit(50)).all()
+
+    def causes_by_tag(db: Session) -> None:
+        tag_id = random.choice(ids["tags"])
+        query = select(Cause).join(Cause.tags).where(Tag.id == tag_id)
+        db.execute(query).all()
+
+    return {
+        "transaction(account_id, created_at)": transactions_by_account,
+        "cause.handle": cause_by_handle,
+        "user.handle": user_by_handle,
+        "tag.name": tags_by_name,
+        "bookmark(user_id, created_at)": bookmarks_by_user,
+        "cause_tag(tag_id, cause_id)": causes_by_tag,
+    }
+
+
+def time_lookups(
+    engine: Engine,
+    queries: dict[str, Callable[[Session], None]],
+    count: int,
+) -> dict[str, float]:
+    """Return the mean latency of each lookup in milliseconds."""
+    results = {}
+    for name, lookup in queries.items():
+        start = time.perf_counter()
+        for _ in range(count):
+            with Session(engine) as db:
+                lookup(db)
+        results[name] = (time.perf_counter() - start) * 1000 / count
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the latency of each lookup."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--causes", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tags", type=int, default=1_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}")
+        ids = populate(engine, args)
+        queries = lookups(ids, args)
+        before = time_lookups(engine, queries, args.queries)
+        for index in secondary_indexes():
+            index.create(bind=engine)
+        after = time_lookups(engine, queries, args.queries)
+        engine.dispose()
+
+    print(f"{'lookup':<38}{'before (ms)':>12}{'after (ms)':>12}")
+    for name in queries:
+        print(f"{name:<38}{before[name]:>12.3f}{after[name]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
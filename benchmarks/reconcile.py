@@ -0,0 +1,136 @@
+"""
+Time the reconciliation queries on a large ledger.
+
+A SQLite database is populated with accounts and (by default) 10M transactions,
+written as matching debit/credit pairs with balances that agree with them. A
+few balances and pairs are then broken, and the queries that the reconcile
+task runs are timed, along with the peak memory used while streaming them.
+
+Usage: python -m benchmarks.reconcile --transactions 10000000 --accounts 10000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator
+from uuid import UUID
+
+from sqlalchemy import Engine, create_engine, insert, update
+from sqlalchemy.orm import Session
+
+from cofundable.cli import REPORT_BATCH_SIZE
+from cofundable.models import Account, Transaction
+from cofundable.models.base import UUIDAuditBase, uuid7
+from cofundable.schemas.transaction import EntryType
+from cofundable.services.accounts import account_service
+from cofundable.services.transactions import transaction_service
+
+CHUNK_SIZE = 50_000
+BROKEN = 10
+
+
+def transfers(
+    accounts: list[UUID],
+    pairs: int,
+    balances: dict[UUID, int],
+) -> Iterator[dict]:
+    """Yield the rows for random transfers, updating the balances."""
+    for _ in range(pairs):
+        source, target = random.sample(accounts, 2)
+        amount = random.randint(1, 100)
+        balances[source] -= amount
+        balances[target] += amount
+        debit_id, credit_id = uuid7(), uuid7()
+        for row_id, account_id, kind, match_id in (
+            (debit_id, source, EntryType.debit, credit_id),
+            (credit_id, target, EntryType.credit, debit_id),
+        ):
+            yield {
+                "id": row_id,
+                "amount": amount,
+                "kind": kind,
+                "balance_after": balances[account_id],
+                "account_id": account_id,
+                "match_entry_id": match_id,
+            }
+
+
+def populate(engine: Engine, args: argparse.Namespace) -> None:
+    """Insert the ledger and then break a few balances and pairs."""
+    UUIDAuditBase.metadata.create_all(bind=engine)
+    accounts = [uuid7() for _ in range(args.accounts)]
+    balances: dict[UUID, int] = defaultdict(int)
+    with engine.begin() as conn:
+        chunk = []
+        for row in transfers(accounts, args.transactions // 2, balances):
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                conn.execute(insert(Transaction), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(Transaction), chunk)
+        conn.execute(
+            insert(Account),
+            [
+                {
+                    "id": account_id,
+                    "name": str(i),
+                    "balance": balances[account_id],
+                }
+                for i, account_id in enumerate(accounts)
+            ],
+        )
+        for account_id in random.sample(accounts, BROKEN):
+            conn.execute(
+                update(Account)
+                .where(Account.id == account_id)
+                .values(balance=Account.balance + 1),
+            )
+        conn.execute(
+            update(Transaction)
+            .where(Transaction.account_id.in_(random.sample(accounts, BROKEN)))
+            .values(amount=Transaction.amount + 50),
+        )
+
+
+def main() -> None:
+    """Populate the ledger and print how long each query takes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=10_000_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    queries = {
+        "balance drift": account_service.query_balance_drift(),
+        "broken pairs": transaction_service.query_broken_pairs(),
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}")
+        populate(engine, args)
+        results = {}
+        for name, query in queries.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            with Session(engine) as db:
+                rows = db.execute(
+                    query,
+                    execution_options={"yield_per": REPORT_BATCH_SIZE},
+                )
+                found = sum(1 for _ in rows)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1_000_000
+            tracemalloc.stop()
+            results[name] = (found, elapsed, peak)
+        engine.dispose()
+
+    print(f"{'check':<16}{'found':>8}{'seconds':>10}{'peak MB':>10}")
+    for name, (found, elapsed, peak) in results.items():
+        print(f"{name:<16}{found:>8}{elapsed:>10.2f}{peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
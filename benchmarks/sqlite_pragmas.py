@@ -0,0 +1,115 @@
+"""
+Compare concurrent read/write throughput with and without the SQLite pragmas.
+
+One writer thread transfers shares between accounts with transfer_shares()
+while several reader threads list accounts, first using SQLite's defaults
+(rollback journal) and then using the pragmas from settings.SQLITE_PRAGMAS.
+
+Usage: python -m benchmarks.sqlite_pragmas --duration 5 --readers 4
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from cofundable.dependencies import database
+from cofundable.models import Account
+from cofundable.models.base import UUIDAuditBase
+from cofundable.services.accounts import account_service
+
+
+def populate(engine: Engine, accounts: int) -> list:
+    """Create the tables and some accounts to transfer shares between."""
+    UUIDAuditBase.metadata.create_all(bind=engine)
+    ids = [uuid4() for _ in range(accounts)]
+    with Session(engine) as db:
+        db.add_all(
+            Account(id=account_id, name=f"account-{i}", balance=100_000)
+            for i, account_id in enumerate(ids)
+        )
+        db.commit()
+    return ids
+
+
+def run(engine: Engine, ids: list, readers: int, duration: float) -> dict:
+    """Run one writer and some readers for the duration and count their ops."""
+    factory = sessionmaker(bind=engine, autoflush=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def record(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def write() -> None:
+        i = 0
+        while time.perf_counter() < stop:
+            i += 1
+            with factory() as db:
+                from_account = db.get(Account, ids[i % len(ids)])
+                to_account = db.get(Account, ids[(i + 1) % len(ids)])
+                try:
+                    account_service.transfer_shares(
+                        db,
+                        amount=1,
+                        from_account=from_account,
+                        to_account=to_account,
+                    )
+                    record("writes")
+                except OperationalError:
+                    record("errors")
+
+    def read() -> None:
+        statement = select(Account).order_by(Account.name).limit(50)
+        while time.perf_counter() < stop:
+            with factory() as db:
+                try:
+                    db.scalars(statement).all()
+                    record("reads")
+                except OperationalError:
+                    record("errors")
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    """Run the benchmark and print the throughput for each configuration."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--accounts", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'reads/s':>12}{'writes/s':>12}{'errors':>10}")
+    for mode in ("default", "pragmas"):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url = f"sqlite:///{Path(tmp_dir) / 'benchmark.db'}"
+            if mode == "pragmas":
+                engine = database.create_db_engine(url)
+            else:
+                engine = create_engine(url, **database.pool_options(url))
+            ids = populate(engine, args.accounts)
+            counts = run(engine, ids, args.readers, args.duration)
+            engine.dispose()
+        reads = counts["reads"] / args.duration
+        writes = counts["writes"] / args.duration
+        errors = counts["errors"]
+        print(f"{mode:<10}{reads:>12.1f}{writes:>12.1f}{errors:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare insert throughput into the transaction table with UUIDv4 and v7 keys.
+
+Rows are inserted in batches into a fresh SQLite database, once with random
+(version 4) ids and once with time-ordered (version 7) ids from uuid7(). The
+overall throughput, the throughput of the last batch (when the primary key's
+index is largest) and the size of the database file are reported for each.
+
+Usage: python -m benchmarks.uuid_keys --rows 1000000 --batch-size 10000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import Engine, create_engine, insert
+
+from cofundable.models import Account, Transaction
+from cofundable.models.base import UUIDAuditBase, uuid7
+from cofundable.schemas.transaction import EntryType
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def insert_rows(
+    engine: Engine,
+    new_id: Callable[[], UUID],
+    args: argparse.Namespace,
+) -> dict[str, float]:
+    """Insert the rows in batches and return the throughput in rows/s."""
+    UUIDAuditBase.metadata.create_all(bind=engine)
+    account_id = new_id()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Account),
+            {"id": account_id, "name": "benchmark", "balance": 0},
+        )
+    total = 0.0
+    batch_time = 0.0
+    for start in range(0, args.rows, args.batch_size):
+        rows = [
+            {
+                "id": new_id(),
+                "amount": 1,
+                "kind": EntryType.credit,
+                "balance_after": i + 1,
+                "account_id": account_id,
+                "created_at": START + timedelta(milliseconds=i),
+                "updated_at": START + timedelta(milliseconds=i),
+            }
+            for i in range(start, min(start + args.batch_size, args.rows))
+        ]
+        batch_start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(Transaction), rows)
+        batch_time = time.perf_counter() - batch_start
+        total += batch_time
+    return {
+        "overall": args.rows / total,
+        "last batch": min(args.batch_size, args.rows) / batch_time,
+    }
+
+
+def main() -> None:
+    """Run the benchmark for each kind of id and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    generators = {"uuid4": uuid4, "uuid7": uuid7}
+    results = {}
+    for name, new_id in generators.items():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "benchmark.db"
+            engine = create_engine(f"sqlite:///{path}")
+            results[name] = insert_rows(engine, new_id, args)
+            engine.dispose()
+            results[name]["size (MB)"] = path.stat().st_size / 1_000_000
+
+    print(
+        f"{'ids':<8}{'rows/s':>12}{'last batch rows/s':>20}{'size (MB)':>12}",
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['overall']:>12.0f}"
+            f"{result['last batch']:>20.0f}{result['size (MB)']:>12.1f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
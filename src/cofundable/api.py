@@ -1,22 +1,41 @@
 """Instantiate the Cofundable API and root-level endpoints."""
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import AsyncIterator
+
+from fastapi import APIRouter, FastAPI
 from fastapi_pagination import add_pagination
+from starlette.concurrency import run_in_threadpool
+
+from cofundable import config, instrumentation, leaderboard
+from cofundable.dependencies import database
+from cofundable.routers import bookmarks, causes, tags, transactions, users
+from cofundable.routers.aio import bookmarks as async_bookmarks
+from cofundable.routers.aio import causes as async_causes
+from cofundable.routers.aio import tags as async_tags
+from cofundable.routers.aio import transactions as async_transactions
+from cofundable.routers.aio import users as async_users
 
-from cofundable.routers.bookmarks import bookmark_router
-from cofundable.routers.causes import cause_router
-from cofundable.routers.transactions import transaction_router
-from cofundable.routers.users import user_router
+SYNC_ROUTERS = [
+    causes.cause_router,
+    users.user_router,
+    bookmarks.bookmark_router,
+    transactions.transaction_router,
+    tags.tag_router,
+]
+ASYNC_ROUTERS = [
+    async_causes.cause_router,
+    async_users.user_router,
+    async_bookmarks.bookmark_router,
+    async_transactions.transaction_router,
+    async_tags.tag_router,
+]
 
-app = FastAPI()
-app.include_router(cause_router)
-app.include_router(user_router)
-app.include_router(bookmark_router)
-app.include_router(transaction_router)
-add_pagination(app)
+root_router = APIRouter(route_class=instrumentation.InstrumentedRoute)
 
 
-@app.get("/")
+@root_router.get("/")
 async def root() -> dict:
     """Welcome user to the API and direct to openAPI spec."""
     return {
@@ -28,7 +47,93 @@ async def root() -> dict:
     }
 
 
-@app.get("/health-check")
+@root_router.get("/health-check")
 async def health_check() -> dict:
     """Check that the API is available."""
     return {"status": "ok"}
+
+
+@asynccontextmanager
+async def lifespan(api: FastAPI) -> AsyncIterator[None]:
+    """
+    Create the database engines on startup and dispose of them on shutdown.
+
+    The settings are checked first, so that the API doesn't start if a
+    setting that only some requests read is missing, see config.py. The
+    leaderboard is loaded once the engines are created, and reloaded
+    periodically until shutdown.
+    """
+    settings = config.settings
+    config.validate_startup_settings(settings)
+    state = api.state
+    if state.use_async_db:
+        async_engine = database.create_async_db_engine()
+        async_replicas = [
+            database.create_async_db_engine(url)
+            for url in settings.ASYNC_REPLICA_DATABASE_URLS
+        ]
+        state.async_session_factory = database.create_async_session_factory(
+            async_engine,
+            async_replicas,
+        )
+        leaderboard.attach(state.leaderboard, state.async_session_factory)
+        async with leaderboard.keep_synced(
+            partial(state.leaderboard.aresync, state.async_session_factory),
+        ):
+            yield
+        for async_replica in async_replicas:
+            await async_replica.dispose()
+        await async_engine.dispose()
+    else:
+        engine = database.create_db_engine()
+        replicas = [
+            database.create_db_engine(url)
+            for url in settings.REPLICA_DATABASE_URLS
+        ]
+        state.session_factory = database.create_session_factory(
+            engine,
+            replicas,
+        )
+        leaderboard.attach(state.leaderboard, state.session_factory)
+        async with leaderboard.keep_synced(
+            partial(
+                run_in_threadpool,
+                state.leaderboard.resync,
+                state.session_factory,
+            ),
+        ):
+            yield
+        for replica in replicas:
+            replica.dispose()
+        engine.dispose()
+
+
+def create_app(*, use_async_db: bool | None = None) -> FastAPI:
+    """
+    Create the API and include the routers for the chosen database stack.
+
+    Parameters
+    ----------
+    use_async_db: bool | None, optional
+        Serve the API with the async routers, which use an AsyncSession, instead
+        of the sync routers. Defaults to settings.USE_ASYNC_DB
+
+    """
+    if use_async_db is None:
+        use_async_db = config.settings.USE_ASYNC_DB
+    api = FastAPI(lifespan=lifespan)
+    api.state.use_async_db = use_async_db
+    # filled when the API starts up, then updated by committed transfers
+    api.state.leaderboard = leaderboard.Leaderboard()
+    leaderboard.track_commits()
+    if config.settings.INSTRUMENT_REQUESTS:
+        instrumentation.instrument_sessions()
+        api.add_middleware(instrumentation.ServerTimingMiddleware)
+    api.include_router(root_router)
+    for router in ASYNC_ROUTERS if use_async_db else SYNC_ROUTERS:
+        api.include_router(router)
+    add_pagination(api)
+    return api
+
+
+app = create_app()
@@ -0,0 +1,173 @@
+"""
+Run maintenance tasks for the Cofundable API from the command line.
+
+Usage:
+    python -m cofundable.cli purge-idempotency-keys --batch-size 1000
+    python -m cofundable.cli reconcile
+    python -m cofundable.cli import users users.ndjson
+    python -m cofundable.cli rebuild-rollups
+"""
+
+import argparse
+import sys
+from typing import Sequence
+
+from sqlalchemy.orm import Session
+
+from cofundable.dependencies import database
+from cofundable.imports import IMPORT_BATCH_SIZE, BulkImport, import_lines
+from cofundable.schemas.base import to_shares
+from cofundable.schemas.cause import CauseRequestSchema
+from cofundable.schemas.user import UserRequestSchema
+from cofundable.services.accounts import account_service
+from cofundable.services.causes import cause_service
+from cofundable.services.idempotency_keys import idempotency_key_service
+from cofundable.services.rollups import REBUILD_BATCH_SIZE, rollup_service
+from cofundable.services.transactions import transaction_service
+from cofundable.services.users import user_service
+
+# rows fetched from the database at a time when streaming a report
+REPORT_BATCH_SIZE = 1000
+
+
+def purge_idempotency_keys(args: argparse.Namespace) -> int:
+    """Delete the idempotency keys that have expired."""
+    engine = database.create_db_engine(args.database_url)
+    factory = database.create_session_factory(engine)
+    with factory() as db:
+        purged = idempotency_key_service.purge_expired(
+            db,
+            batch_size=args.batch_size,
+        )
+    engine.dispose()
+    sys.stdout.write(f"Purged {purged} expired idempotency keys\n")
+    return 0
+
+
+def reconcile(args: argparse.Namespace) -> int:
+    """Check that balances match the transactions and that pairs match."""
+    engine = database.create_db_engine(args.database_url)
+    factory = database.create_session_factory(engine)
+    with factory() as db:
+        drifted = report_balance_drift(db)
+        broken = report_broken_pairs(db)
+    engine.dispose()
+    sys.stdout.write(
+        f"Found {drifted} accounts with drift and {broken} broken pairs\n",
+    )
+    # a non-zero exit status lets a scheduled job alert on problems
+    return 1 if drifted or broken else 0
+
+
+def report_balance_drift(db: Session) -> int:
+    """Write each account whose balance has drifted and return the count."""
+    rows = db.execute(
+        account_service.query_balance_drift(),
+        execution_options={"yield_per": REPORT_BATCH_SIZE},
+    )
+    count = 0
+    for account_id, balance, net_change, drift in rows:
+        count += 1
+        sys.stdout.write(
+            f"Account {account_id.hex}: balance {to_shares(balance)} doesn't "
+            f"match net change {to_shares(net_change)} "
+            f"(drift {to_shares(drift)})\n",
+        )
+    return count
+
+
+def report_broken_pairs(db: Session) -> int:
+    """Write each transaction whose pair is broken and return the count."""
+    rows = db.execute(
+        transaction_service.query_broken_pairs(),
+        execution_options={"yield_per": REPORT_BATCH_SIZE},
+    )
+    count = 0
+    for transaction_id, match_entry_id, problem in rows:
+        count += 1
+        match = match_entry_id.hex if match_entry_id else None
+        sys.stdout.write(
+            f"Transaction {transaction_id.hex}: {problem} "
+            f"(match_entry_id {match})\n",
+        )
+    return count
+
+
+def import_records(args: argparse.Namespace) -> int:
+    """Create users or causes from a file with one JSON object per line."""
+    bulk_import: BulkImport
+    if args.kind == "users":
+        bulk_import = BulkImport(
+            user_service,
+            UserRequestSchema,
+            batch_size=args.batch_size,
+        )
+    else:
+        bulk_import = BulkImport(
+            cause_service,
+            CauseRequestSchema,
+            batch_size=args.batch_size,
+        )
+    engine = database.create_db_engine(args.database_url)
+    factory = database.create_session_factory(engine)
+    with args.file, factory() as db:
+        report = import_lines(db, args.file, bulk_import)
+    engine.dispose()
+    for error in report.errors:
+        sys.stdout.write(f"Line {error.line}: {error.error}\n")
+    sys.stdout.write(
+        f"Created {report.created} {args.kind}, {report.failed} rows failed\n",
+    )
+    return 1 if report.failed else 0
+
+
+def rebuild_rollups(args: argparse.Namespace) -> int:
+    """Replace every account's daily rollups, only run while writes are paused."""
+    engine = database.create_db_engine(args.database_url)
+    factory = database.create_session_factory(engine)
+    with factory() as db:
+        created = rollup_service.rebuild(db, batch_size=args.batch_size)
+    engine.dispose()
+    sys.stdout.write(f"Rebuilt {created} daily rollups\n")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Parse the arguments, run the task that they name and return its status."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--database-url",
+        help="defaults to settings.DATABASE_URL",
+    )
+    tasks = parser.add_subparsers(required=True)
+    purge = tasks.add_parser(
+        "purge-idempotency-keys",
+        help=purge_idempotency_keys.__doc__,
+    )
+    purge.add_argument(
+        "--batch-size",
+        type=int,
+        help="defaults to settings.IDEMPOTENCY_KEY_PURGE_BATCH_SIZE",
+    )
+    purge.set_defaults(task=purge_idempotency_keys)
+    tasks.add_parser("reconcile", help=reconcile.__doc__).set_defaults(
+        task=reconcile,
+    )
+    importer = tasks.add_parser("import", help=import_records.__doc__)
+    importer.add_argument("kind", choices=["users", "causes"])
+    importer.add_argument(
+        "file",
+        type=argparse.FileType("r", encoding="utf-8"),
+        help="an NDJSON file, or - to read from stdin",
+    )
+    importer.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    importer.set_defaults(task=import_records)
+    rebuild = tasks.add_parser("rebuild-rollups", help=rebuild_rollups.__doc__)
+    rebuild.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    rebuild.set_defaults(task=rebuild_rollups)
+    args = parser.parse_args(argv)
+    return args.task(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
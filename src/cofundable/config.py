@@ -1,9 +1,35 @@
 """Manage configuration variables using Dynaconf."""
 
-from dynaconf import Dynaconf
+from dynaconf import Dynaconf, Validator
 
 settings = Dynaconf(
     envvar_prefix="DYNACONF",
     settings_files=["settings.toml", ".secrets.toml"],
     environments=True,
 )
+
+# settings that are only read by some requests, which are checked when the API
+# starts up instead of failing the first request that reads them
+STARTUP_VALIDATORS = [
+    # signs the cursors used by cursor pagination, see pagination.py
+    Validator(
+        "PAGINATION_SECRET",
+        must_exist=True,
+        is_type_of=str,
+        len_min=16,
+    ),
+]
+
+
+def validate_startup_settings(current: Dynaconf) -> None:
+    """
+    Check the settings that the API needs before it accepts requests.
+
+    Raises
+    ------
+    ValidationError
+        If a setting in STARTUP_VALIDATORS is missing or invalid
+
+    """
+    for validator in STARTUP_VALIDATORS:
+        validator.validate(current)
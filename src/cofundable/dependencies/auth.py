@@ -3,9 +3,10 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from cofundable.dependencies.database import get_db
+from cofundable.dependencies.database import get_async_db, get_db
 from cofundable.services.users import User, user_service
 
 
@@ -22,3 +23,19 @@ def get_current_user(
     if not user:
         raise credentials_exception
     return user
+
+
+async def get_async_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> User:
+    """Get the currently authenticated user with their account loaded."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    stmt = user_service.query_all().options(selectinload(User.account))
+    user = (await db.execute(stmt)).scalar()
+    if not user:
+        raise credentials_exception
+    return user
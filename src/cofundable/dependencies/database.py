@@ -1,38 +1,386 @@
 # pylint: disable=invalid-name
 """Manage connection to the database using a SQLAlchemy session factory."""
 
-from typing import Generator
+import random
+from typing import Any, AsyncGenerator, Generator, Mapping, Sequence, cast
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import (
+    Engine,
+    QueuePool,
+    Select,
+    create_engine,
+    event,
+    make_url,
+)
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
-from cofundable import config
+from cofundable import config, instrumentation
 from cofundable.models.base import UUIDAuditBase
 
+# the execution option that sends a SELECT to the primary database, for reads
+# that need to see a write that may not have been replicated yet
+USE_PRIMARY = "use_primary"
 
-def create_session_factory() -> sessionmaker:  # pragma: no cover
-    """Create a sessionmaker with database connection details."""
-    engine = create_engine(config.settings.DATABASE_URL, pool_pre_ping=True)
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# the databases that the dialect specific statements are written for, i.e. the
+# full-text search in CauseCRUD.query_search() and the INSERT ... ON CONFLICT
+# upserts in services/tags.py and services/rollups.py
+SUPPORTED_DIALECTS = frozenset({"sqlite", "postgresql"})
 
+SQLITE_PRAGMAS = frozenset(
+    {
+        "journal_mode",
+        "synchronous",
+        "busy_timeout",
+        "cache_size",
+        "mmap_size",
+        "temp_store",
+        "foreign_keys",
+    },
+)
 
-def get_db() -> Generator[Session, None, None]:  # pragma: no cover
+
+def create_db_engine(url: str | None = None) -> Engine:
+    """
+    Create a SQLAlchemy engine with a connection pool configured from settings.
+
+    The engine should be created once per process (e.g. in the API's lifespan)
+    and shared by every request, so that connections are reused by the pool
+    instead of being opened and initialized for each request.
+
+    Parameters
+    ----------
+    url: str | None, optional
+        The database URL to connect to, defaults to settings.DATABASE_URL
+
+    """
+    url = url or config.settings.DATABASE_URL
+    check_dialect(url)
+    engine = create_engine(url, **pool_options(url))
+    add_sqlite_pragmas(engine)
+    if config.settings.INSTRUMENT_REQUESTS:
+        instrumentation.instrument_engine(engine)
+    return engine
+
+
+def create_async_db_engine(url: str | None = None) -> AsyncEngine:
+    """
+    Create an AsyncEngine with a connection pool configured from settings.
+
+    Parameters
+    ----------
+    url: str | None, optional
+        The database URL to connect to using an async driver (e.g. aiosqlite),
+        defaults to settings.ASYNC_DATABASE_URL
+
+    """
+    url = url or config.settings.ASYNC_DATABASE_URL
+    check_dialect(url)
+    engine = create_async_engine(url, **pool_options(url))
+    add_sqlite_pragmas(engine.sync_engine)
+    if config.settings.INSTRUMENT_REQUESTS:
+        instrumentation.instrument_engine(engine.sync_engine)
+    return engine
+
+
+def check_dialect(url: str) -> None:
+    """
+    Raise a ValueError if the URL isn't for a database the API supports.
+
+    Engines are created when the API starts up, so an unsupported database
+    stops it from starting instead of failing the first search or upsert.
+    """
+    check_dialect_name(make_url(url).get_backend_name())
+
+
+def check_dialect_name(name: str) -> None:
+    """Raise a ValueError if the dialect isn't in SUPPORTED_DIALECTS."""
+    if name not in SUPPORTED_DIALECTS:
+        supported = ", ".join(sorted(SUPPORTED_DIALECTS))
+        msg = f"Unsupported database: {name}, use one of {supported}"
+        raise ValueError(msg)
+
+
+def pool_options(url: str) -> dict:
+    """
+    Get the connection pool options for an engine from settings.
+
+    Pool sizing options are only returned if the dialect uses a QueuePool,
+    because other pools (e.g. the NullPool used by aiosqlite) don't accept them.
+    """
+    settings = config.settings
+    options = {
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    db_url = make_url(url)
+    dialect = cast(type[DefaultDialect], db_url.get_dialect())
+    if issubclass(dialect.get_pool_class(db_url), QueuePool):
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return options
+
+
+def add_sqlite_pragmas(
+    engine: Engine,
+    pragmas: Mapping[str, Any] | None = None,
+) -> None:
+    """
+    Set pragmas on each new connection the engine opens to a SQLite database.
+
+    By default SQLite uses a rollback journal, which blocks readers while a
+    write (e.g. transfer_shares()) is committed. The default pragmas from
+    settings.SQLITE_PRAGMAS switch to write-ahead logging so that readers and a
+    writer can work concurrently, and increase the page cache and mmap size.
+    Engines for other databases are left unchanged.
+
+    Parameters
+    ----------
+    engine: Engine
+        The engine whose connections should be configured, for an AsyncEngine
+        pass its sync_engine attribute
+    pragmas: Mapping[str, Any] | None, optional
+        A mapping of pragma names to values, defaults to settings.SQLITE_PRAGMAS
+        if settings.USE_SQLITE_PRAGMAS is enabled
+
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    if pragmas is None:
+        settings = config.settings
+        if not settings.USE_SQLITE_PRAGMAS:
+            return
+        pragmas = settings.SQLITE_PRAGMAS
+    statements = [
+        format_sqlite_pragma(name, value) for name, value in pragmas.items()
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection: Any, _: Any) -> None:  # noqa: ANN401
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+
+def format_sqlite_pragma(name: str, value: Any) -> str:  # noqa: ANN401
+    """
+    Format a PRAGMA statement for a SQLite connection.
+
+    The name and value are validated before they're formatted into the
+    statement, because PRAGMA statements don't accept bound parameters.
+    """
+    name = name.lower()
+    if name not in SQLITE_PRAGMAS:
+        msg = f"Unsupported SQLite pragma: {name}"
+        raise ValueError(msg)
+    if isinstance(value, bool):
+        value = "ON" if value else "OFF"
+    elif not isinstance(value, int) and not str(value).isidentifier():
+        msg = f"Invalid value for SQLite pragma {name}: {value!r}"
+        raise ValueError(msg)
+    return f"PRAGMA {name} = {value}"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica and writes to the primary database.
+
+    SELECT statements (e.g. queries from query_all(), paginate() and get()) are
+    executed on one of the replicas, which is picked when the session starts.
+    Flushes, INSERT/UPDATE/DELETE statements and SELECT ... FOR UPDATE are sent
+    to the primary instead. After the first write, the session is pinned to the
+    primary, so later reads in the same request can see the data it wrote even
+    if it hasn't been replicated yet. A SELECT with the USE_PRIMARY execution
+    option is sent to the primary too, without pinning the session.
+
+    Parameters
+    ----------
+    primary: Engine
+        The engine for the primary database, which accepts writes
+    replicas: Sequence[Engine]
+        The engines for the read replicas, if empty every statement is sent to
+        the primary
+
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: Engine,
+        replicas: Sequence[Engine] = (),
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """Init the RoutingSession with the primary and replica engines."""
+        super().__init__(**kwargs)
+        self.primary = primary
+        # pick a replica per session so reads in a request are consistent
+        self.replica: Engine | None = None
+        if replicas:
+            self.replica = random.choice(replicas)  # noqa: S311
+        self.pinned_to_primary = False
+
+    def get_bind(  # pylint: disable=unused-argument
+        self,
+        mapper: Any = None,  # noqa: ANN401, ARG002
+        clause: Any = None,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401, ARG002
+    ) -> Engine:
+        """Return the engine used to execute a given statement."""
+        if self._flushing or is_write(clause):
+            self.pinned_to_primary = True
+        if self.replica is None or self.pinned_to_primary:
+            return self.primary
+        if isinstance(clause, Select) and not uses_primary(clause):
+            return self.replica
+        return self.primary
+
+
+def uses_primary(clause: Select) -> bool:
+    """Check if a SELECT has been marked to be read from the primary."""
+    return bool(clause.get_execution_options().get(USE_PRIMARY, False))
+
+
+def is_write(clause: Any) -> bool:  # noqa: ANN401
+    """Check if a statement writes to the database or locks rows for a write."""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, Select):
+        # pylint: disable-next=protected-access
+        return clause._for_update_arg is not None  # noqa: SLF001
+    return False
+
+
+def create_session_factory(
+    engine: Engine,
+    replicas: Sequence[Engine] = (),
+) -> sessionmaker:
+    """
+    Create a sessionmaker bound to an existing engine.
+
+    Records aren't expired when a session commits, so the values that were
+    just written (and any relationships that were already loaded) can be
+    returned without selecting them again.
+
+    Parameters
+    ----------
+    engine: Engine
+        The engine for the primary database
+    replicas: Sequence[Engine], optional
+        Engines for read replicas, if any are passed the sessions will be
+        instances of RoutingSession that send reads to the replicas
+
+    """
+    if replicas:
+        return sessionmaker(
+            class_=RoutingSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            primary=engine,
+            replicas=replicas,
+        )
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=engine,
+    )
+
+
+def create_async_session_factory(
+    engine: AsyncEngine,
+    replicas: Sequence[AsyncEngine] = (),
+) -> async_sessionmaker:
+    """
+    Create an async_sessionmaker bound to an existing AsyncEngine.
+
+    Attributes aren't expired on commit, because reloading them would require
+    implicit IO, which isn't allowed when using an AsyncSession. If replicas
+    are passed, a RoutingSession is used to route the statements that the
+    AsyncSession proxies.
+    """
+    if replicas:
+        return async_sessionmaker(
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+            primary=engine.sync_engine,
+            replicas=[replica.sync_engine for replica in replicas],
+        )
+    return async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=engine,
+    )
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Yield a connection to the database to manage transactions.
 
+    Parameters
+    ----------
+    request: Request
+        The incoming request, used to access the session factory that is
+        created once when the API starts up and stored on ``app.state``
+
     Yields
     ------
     Session
         A SQLAlechemy session that manages a connection to the database
 
     """
-    SessionFactory = create_session_factory()  # noqa: N806
+    SessionFactory = request.app.state.session_factory  # noqa: N806
+
+    with SessionFactory() as db:
+        yield db
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yield an async connection to the database to manage transactions.
+
+    Parameters
+    ----------
+    request: Request
+        The incoming request, used to access the async session factory that is
+        created when the API starts up with settings.USE_ASYNC_DB enabled
+
+    Yields
+    ------
+    AsyncSession
+        A SQLAlchemy AsyncSession that manages a connection to the database
+
+    """
+    SessionFactory = request.app.state.async_session_factory  # noqa: N806
 
-    try:
-        db = SessionFactory()
+    async with SessionFactory() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_session_factory(request: Request) -> sessionmaker:
+    """
+    Return the session factory, for responses that open their own session.
+
+    The session from get_db() is closed before a StreamingResponse is sent,
+    so a response that reads from the database while it streams should open
+    (and close) a session from this factory instead.
+    """
+    return request.app.state.session_factory
+
+
+def get_async_session_factory(request: Request) -> async_sessionmaker:
+    """Return the async session factory, see get_session_factory()."""
+    return request.app.state.async_session_factory
 
 
 def init_test_db(db: Session, *, testing: bool = False) -> None:
@@ -0,0 +1,19 @@
+"""Access the leaderboard of causes that is kept in memory by the API."""
+
+from fastapi import Request
+
+from cofundable.leaderboard import Leaderboard
+
+
+def get_leaderboard(request: Request) -> Leaderboard:
+    """
+    Return the leaderboard that is loaded when the API starts up.
+
+    Parameters
+    ----------
+    request: Request
+        The incoming request, used to access the leaderboard that is stored
+        on ``app.state`` and updated by committed transfers
+
+    """
+    return request.app.state.leaderboard
@@ -1,5 +1,7 @@
 """Create custom errors for the Cofundable API."""
 
+from uuid import UUID
+
 
 class CauseHandleNotFoundError(Exception):
     """
@@ -16,3 +18,74 @@ class CauseHandleNotFoundError(Exception):
         """Init the CauseHandleNotFoundError."""
         super().__init__()
         self.handle = handle
+
+
+class InsufficientBalanceError(Exception):
+    """
+    The account doesn't have enough shares to transfer the amount requested.
+
+    Attributes
+    ----------
+    account_id: UUID
+        The id of the account that shares were being transferred from
+    amount: int
+        The amount that was being transferred, in minor units
+
+    """
+
+    def __init__(self, account_id: UUID, amount: int) -> None:
+        """Init the InsufficientBalanceError."""
+        super().__init__()
+        self.account_id = account_id
+        self.amount = amount
+
+
+class SelfTransferError(Exception):
+    """
+    Shares were being transferred from an account to itself.
+
+    Attributes
+    ----------
+    account_id: UUID
+        The id of the account that was both the sender and the recipient
+
+    """
+
+    def __init__(self, account_id: UUID) -> None:
+        """Init the SelfTransferError."""
+        super().__init__()
+        self.account_id = account_id
+
+
+class AccountNotFoundError(Exception):
+    """
+    No account was found for one or more of the ids provided.
+
+    Attributes
+    ----------
+    account_ids: set[UUID]
+        The ids that didn't match an account in the database
+
+    """
+
+    def __init__(self, account_ids: set[UUID]) -> None:
+        """Init the AccountNotFoundError."""
+        super().__init__()
+        self.account_ids = account_ids
+
+
+class IdempotencyKeyReusedError(Exception):
+    """
+    An Idempotency-Key was sent again with a different request body.
+
+    Attributes
+    ----------
+    key: str
+        The key that was already used for another request
+
+    """
+
+    def __init__(self, key: str) -> None:
+        """Init the IdempotencyKeyReusedError."""
+        super().__init__()
+        self.key = key
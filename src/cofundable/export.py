@@ -0,0 +1,187 @@
+# pylint: disable=invalid-name
+"""
+Stream the results of a query to the client as NDJSON or CSV.
+
+Exports can cover an account's whole history, so rather than loading every
+row the query is executed with yield_per, which fetches the rows in batches
+from a server-side cursor (where the driver supports one). Each batch is
+serialized and sent as one chunk of a StreamingResponse, and the next batch
+isn't fetched until that chunk has been sent, so memory use stays the same
+however many rows are exported and a slow client slows down the query instead
+of the rows piling up in the app.
+
+Dependencies with yield are closed before a StreamingResponse is sent, so the
+rows are read in a new session that is opened by the stream itself, using the
+factory from get_session_factory().
+"""
+
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator, Iterator, Sequence
+
+import sqlalchemy as sa
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+# rows fetched from the database and sent to the client at a time
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    """Formats that the rows of an export can be serialized in."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """Return the media type of a response in this format."""
+        if self is ExportFormat.csv:
+            return "text/csv"
+        return "application/x-ndjson"
+
+
+# pylint: disable-next=too-many-arguments
+def stream_export(  # noqa: PLR0913
+    session_factory: sessionmaker,
+    query: sa.Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+    *,
+    filename: str,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    Return a response that streams every row selected by a query.
+
+    Parameters
+    ----------
+    session_factory: sessionmaker
+        The factory for the session that the rows are read in, which is
+        opened when the response starts and closed when it ends
+    query: Select
+        The query for the records to export, e.g. from
+        TransactionService.query_transactions_by_account()
+    schema: type[BaseModel]
+        The schema used to serialize each record, its fields are the columns
+        of a CSV export
+    export_format: ExportFormat
+        The format to serialize the records in
+    filename: str
+        The name of the file that the client should save the export as,
+        without an extension
+    batch_size: int, optional
+        The number of rows fetched and sent at a time
+
+    """
+    chunks = export_chunks(
+        session_factory,
+        query,
+        schema,
+        export_format,
+        batch_size=batch_size,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=export_format.media_type,
+        headers=download_headers(filename, export_format),
+    )
+
+
+# pylint: disable-next=too-many-arguments
+def astream_export(  # noqa: PLR0913
+    session_factory: async_sessionmaker,
+    query: sa.Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+    *,
+    filename: str,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> StreamingResponse:
+    """Return a response that streams the rows, see stream_export()."""
+    chunks = aexport_chunks(
+        session_factory,
+        query,
+        schema,
+        export_format,
+        batch_size=batch_size,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=export_format.media_type,
+        headers=download_headers(filename, export_format),
+    )
+
+
+def export_chunks(
+    session_factory: sessionmaker,
+    query: sa.Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+    *,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[str]:
+    """Yield the serialized rows of the query, one batch at a time."""
+    if export_format is ExportFormat.csv:
+        yield csv_header(schema)
+    with session_factory() as db:
+        result = db.execute(
+            query,
+            execution_options={"yield_per": batch_size},
+        )
+        for batch in result.scalars().partitions():
+            yield serialize(batch, schema, export_format)
+
+
+async def aexport_chunks(
+    session_factory: async_sessionmaker,
+    query: sa.Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+    *,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[str]:
+    """Yield the serialized rows of the query, see export_chunks()."""
+    if export_format is ExportFormat.csv:
+        yield csv_header(schema)
+    async with session_factory() as db:
+        result = await db.stream(
+            query,
+            execution_options={"yield_per": batch_size},
+        )
+        async for batch in result.scalars().partitions():
+            yield serialize(batch, schema, export_format)
+
+
+def serialize(
+    records: Sequence,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+) -> str:
+    """Serialize a batch of records as lines of NDJSON or CSV."""
+    items = [schema.model_validate(record) for record in records]
+    if export_format is ExportFormat.ndjson:
+        return "".join(f"{item.model_dump_json()}\n" for item in items)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(schema.model_fields))
+    writer.writerows(item.model_dump(mode="json") for item in items)
+    return buffer.getvalue()
+
+
+def csv_header(schema: type[BaseModel]) -> str:
+    """Return the header row of a CSV export, which names the fields."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(schema.model_fields)
+    return buffer.getvalue()
+
+
+def download_headers(filename: str, export_format: ExportFormat) -> dict:
+    """Return the headers that ask the client to save the export as a file."""
+    return {
+        "Content-Disposition": (
+            f'attachment; filename="{filename}.{export_format.value}"'
+        ),
+    }
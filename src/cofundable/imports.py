@@ -0,0 +1,374 @@
+"""
+Import users or causes in bulk from NDJSON, one batch of rows at a time.
+
+Each line of the input is validated with the request schema that the create
+endpoints use. Valid rows are collected into batches, and each batch is created
+by the service's create_many(), which inserts the records, their accounts and
+their tag links with multi-row INSERT statements, and is committed on its own.
+
+Rows that fail validation, whose handle is already taken, or that conflict with
+a concurrent change, are reported with their line number and skipped without
+aborting the rest of their batch. Only one batch is held in memory at a time,
+the next lines aren't read until it has been committed, and lines longer than
+MAX_LINE_LENGTH are reported without being kept, so the memory used doesn't
+depend on the input's size.
+"""
+
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Generic,
+    Iterable,
+    TypeVar,
+    cast,
+)
+
+import sqlalchemy as sa
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from cofundable.schemas.cause import CauseRequestSchema
+from cofundable.schemas.imports import ImportErrorSchema, ImportReportSchema
+from cofundable.schemas.user import UserRequestSchema
+from cofundable.services.base import InsertOnlyBase
+
+# rows that are validated and then created together
+IMPORT_BATCH_SIZE = 1000
+# the number of errors included in a report, the rest are only counted
+MAX_REPORTED_ERRORS = 100
+# bytes in a line of a streamed body, longer lines are reported as errors
+# instead of being read into memory
+MAX_LINE_LENGTH = 64 * 1024
+
+ImportSchemaT = TypeVar(
+    "ImportSchemaT",
+    bound=UserRequestSchema | CauseRequestSchema,
+)
+
+# documents the body of the import endpoints, which is read as a stream
+# instead of being parsed by FastAPI
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {
+                "schema": {
+                    "type": "string",
+                    "description": "One JSON object per line",
+                },
+            },
+        },
+    },
+}
+
+
+class BulkImport(Generic[ImportSchemaT]):
+    """
+    Collect rows of NDJSON into batches and create the records they describe.
+
+    Parameters
+    ----------
+    service: InsertOnlyBase
+        The service that creates the records, e.g. user_service
+    schema: type[UserRequestSchema] | type[CauseRequestSchema]
+        The schema used to validate each row, which has a unique handle
+    batch_size: int, optional
+        The number of rows that are created together
+
+    Attributes
+    ----------
+    report: ImportReportSchema
+        The number of records created so far and the rows that failed
+
+    """
+
+    def __init__(
+        self,
+        service: InsertOnlyBase[Any, ImportSchemaT],
+        schema: type[ImportSchemaT],
+        *,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ) -> None:
+        """Init the BulkImport with an empty batch and report."""
+        self.service = service
+        self.schema = schema
+        self.batch_size = batch_size
+        self.report = ImportReportSchema()
+        self._batch: list[tuple[int, ImportSchemaT]] = []
+
+    @property
+    def batch_is_full(self) -> bool:
+        """Check whether the current batch should be created."""
+        return len(self._batch) >= self.batch_size
+
+    def add(self, line_number: int, line: str | bytes | None) -> None:
+        """
+        Validate a line and add it to the batch, or report why it's invalid.
+
+        None is passed in place of a line that was too long to read, see
+        aiter_lines().
+        """
+        if line is None:
+            self._fail(
+                line_number,
+                f"Line is longer than {MAX_LINE_LENGTH} bytes",
+            )
+            return
+        if not line.strip():
+            return
+        try:
+            item = self.schema.model_validate_json(line)
+        except ValidationError as error:
+            self._fail(line_number, describe(error))
+            return
+        # mypy widens the validated item to the TypeVar's bound
+        self._batch.append((line_number, cast(ImportSchemaT, item)))
+
+    def create_batch(self, db: Session) -> None:
+        """
+        Create the records in the current batch and commit them.
+
+        The batch is inserted in a SAVEPOINT. If it conflicts with a concurrent
+        change (e.g. a handle was taken after the handles were checked), it's
+        rolled back to the savepoint and the rows are inserted again one at a
+        time, each in its own savepoint, so only the rows that conflict fail.
+        """
+        rows = self._take_batch()
+        if not rows:
+            return
+        taken = set(db.scalars(self._taken_handles_query(rows)))
+        rows = self._skip_taken_handles(rows, taken)
+        try:
+            with db.begin_nested():
+                self._create(db, rows)
+        except IntegrityError:
+            for row in rows:
+                self._create_row(db, row)
+        else:
+            self.report.created += len(rows)
+        db.commit()
+
+    async def acreate_batch(self, db: AsyncSession) -> None:
+        """Create the records in the current batch, see create_batch()."""
+        rows = self._take_batch()
+        if not rows:
+            return
+        taken = set(await db.scalars(self._taken_handles_query(rows)))
+        rows = self._skip_taken_handles(rows, taken)
+        try:
+            async with db.begin_nested():
+                await self._acreate(db, rows)
+        except IntegrityError:
+            for row in rows:
+                await self._acreate_row(db, row)
+        else:
+            self.report.created += len(rows)
+        await db.commit()
+
+    def _create(
+        self,
+        db: Session,
+        rows: list[tuple[int, ImportSchemaT]],
+    ) -> None:
+        """Insert the records for the rows without committing them."""
+        self.service.create_many(
+            db,
+            data=[item for _, item in rows],
+            batch_size=self.batch_size,
+            defer_commit=True,
+        )
+
+    async def _acreate(
+        self,
+        db: AsyncSession,
+        rows: list[tuple[int, ImportSchemaT]],
+    ) -> None:
+        """Insert the records for the rows, see _create()."""
+        await self.service.acreate_many(
+            db,
+            data=[item for _, item in rows],
+            batch_size=self.batch_size,
+            defer_commit=True,
+        )
+
+    def _create_row(self, db: Session, row: tuple[int, ImportSchemaT]) -> None:
+        """Insert one row in its own savepoint, or report that it conflicted."""
+        try:
+            with db.begin_nested():
+                self._create(db, [row])
+        except IntegrityError:
+            self._fail_conflict(row)
+            return
+        self.report.created += 1
+
+    async def _acreate_row(
+        self,
+        db: AsyncSession,
+        row: tuple[int, ImportSchemaT],
+    ) -> None:
+        """Insert one row in its own savepoint, see _create_row()."""
+        try:
+            async with db.begin_nested():
+                await self._acreate(db, [row])
+        except IntegrityError:
+            self._fail_conflict(row)
+            return
+        self.report.created += 1
+
+    def _take_batch(self) -> list[tuple[int, ImportSchemaT]]:
+        """Return the rows in the current batch and start a new one."""
+        rows, self._batch = self._batch, []
+        return rows
+
+    def _taken_handles_query(
+        self,
+        rows: list[tuple[int, ImportSchemaT]],
+    ) -> sa.Select:
+        """Return a query for the handles in the batch that already exist."""
+        column = self.service.model.__table__.c.handle
+        handles = {item.handle for _, item in rows}
+        return sa.select(column).where(column.in_(handles))
+
+    def _skip_taken_handles(
+        self,
+        rows: list[tuple[int, ImportSchemaT]],
+        taken: set[str],
+    ) -> list[tuple[int, ImportSchemaT]]:
+        """Report the rows whose handle exists or is repeated in the batch."""
+        valid = []
+        for line_number, item in rows:
+            if item.handle in taken:
+                self._fail(line_number, f"handle: {item.handle} is taken")
+                continue
+            taken.add(item.handle)
+            valid.append((line_number, item))
+        return valid
+
+    def _fail_conflict(self, row: tuple[int, ImportSchemaT]) -> None:
+        """Report a row that conflicted with a concurrent change."""
+        line_number, item = row
+        self._fail(
+            line_number,
+            f"Conflicted with a concurrent change, {item.handle} wasn't created",
+        )
+
+    def _fail(self, line_number: int, error: str) -> None:
+        """Count a row that failed and include it in the report if there's room."""
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(  # pylint: disable=no-member
+                ImportErrorSchema(line=line_number, error=error),
+            )
+
+
+def describe(error: ValidationError) -> str:
+    """Summarize each problem found when a row was validated."""
+    return "; ".join(
+        (
+            ".".join(str(loc) for loc in detail["loc"]) + f": {detail['msg']}"
+            if detail["loc"]
+            else detail["msg"]
+        )
+        for detail in error.errors()
+    )
+
+
+def import_lines(
+    db: Session,
+    lines: Iterable[str | bytes],
+    bulk_import: BulkImport,
+) -> ImportReportSchema:
+    """
+    Import every line, creating the rows a batch at a time.
+
+    Parameters
+    ----------
+    db: Session
+        Instance of SQLAlchemy session that manages database transactions
+    lines: Iterable[str | bytes]
+        The lines of NDJSON, e.g. an open file
+    bulk_import: BulkImport
+        Validates the rows and creates them in batches
+
+    Returns
+    -------
+    ImportReportSchema
+        The number of records created and the rows that failed
+
+    """
+    for line_number, line in enumerate(lines, start=1):
+        bulk_import.add(line_number, line)
+        if bulk_import.batch_is_full:
+            bulk_import.create_batch(db)
+    bulk_import.create_batch(db)
+    return bulk_import.report
+
+
+async def import_stream(
+    db: Session,
+    chunks: AsyncIterable[bytes],
+    bulk_import: BulkImport,
+) -> ImportReportSchema:
+    """
+    Import the lines from a request body as it's received.
+
+    The batches are created in a worker thread, because the session is
+    synchronous, and more of the body isn't read until a batch is done.
+    """
+    line_number = 0
+    async for line in aiter_lines(chunks):
+        line_number += 1
+        bulk_import.add(line_number, line)
+        if bulk_import.batch_is_full:
+            await run_in_threadpool(bulk_import.create_batch, db)
+    await run_in_threadpool(bulk_import.create_batch, db)
+    return bulk_import.report
+
+
+async def aimport_stream(
+    db: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    bulk_import: BulkImport,
+) -> ImportReportSchema:
+    """Import the lines from a request body, see import_stream()."""
+    line_number = 0
+    async for line in aiter_lines(chunks):
+        line_number += 1
+        bulk_import.add(line_number, line)
+        if bulk_import.batch_is_full:
+            await bulk_import.acreate_batch(db)
+    await bulk_import.acreate_batch(db)
+    return bulk_import.report
+
+
+async def aiter_lines(
+    chunks: AsyncIterable[bytes],
+    max_line_length: int = MAX_LINE_LENGTH,
+) -> AsyncIterator[bytes | None]:
+    """
+    Split a stream of bytes into lines, without reading all of it first.
+
+    A line longer than max_line_length bytes is yielded as None. The part of it
+    that has been read is dropped as soon as it's too long, and the rest is
+    skipped up to the next newline, so the buffer doesn't grow with the line.
+    """
+    buffer = b""
+    too_long = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            # the first line is the end of the one that was too long, if any
+            yield None if too_long or len(line) > max_line_length else line
+            too_long = False
+        if len(buffer) > max_line_length:
+            too_long = True
+            buffer = b""
+    if too_long:
+        yield None
+    elif buffer:
+        yield buffer
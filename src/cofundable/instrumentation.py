@@ -0,0 +1,270 @@
+"""
+Measure the database and serialization work done to handle each request.
+
+When settings.INSTRUMENT_REQUESTS is enabled, every response includes:
+
+- an ``X-Query-Count`` header with the number of SQL statements executed
+- a ``Server-Timing`` header with the time spent (in milliseconds) executing
+  SQL statements (db), running ORM queries and loading their results (orm),
+  serializing the response with pydantic (serialize) and handling the request
+  overall (app)
+
+The metrics for the current request are stored in a ContextVar that is set by
+ServerTimingMiddleware and updated by SQLAlchemy event hooks and by the
+InstrumentedRoute class used by the routers. When the setting is disabled, none
+of the hooks or the middleware are installed.
+"""
+
+import asyncio
+import functools
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cofundable import config
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Track the database and serialization work done for a single request.
+
+    Attributes
+    ----------
+    queries: int
+        The number of SQL statements executed
+    db_time: float
+        Seconds spent executing SQL statements and fetching their results
+    orm_time: float
+        Seconds spent in ORM queries, e.g. compiling statements and loading
+        objects from their results, excluding db_time
+    serialize_time: float
+        Seconds spent serializing the response, excluding db_time and orm_time
+        for any relationships that were lazy loaded during serialization
+
+    """
+
+    queries: int = 0
+    db_time: float = 0.0
+    orm_time: float = 0.0
+    serialize_time: float = 0.0
+    # bookkeeping used to exclude nested or overlapping measurements
+    orm_depth: int = 0
+    endpoint_done_at: float | None = None
+    loading_time_at_endpoint_done: float = 0.0
+
+    @property
+    def loading_time(self) -> float:
+        """Return the total time spent in the database and loading objects."""
+        return self.db_time + self.orm_time
+
+    def server_timing(self, app_time: float) -> str:
+        """Format the metrics as the value of a Server-Timing header."""
+        timings = {
+            "db": self.db_time,
+            "orm": self.orm_time,
+            "serialize": self.serialize_time,
+            "app": app_time,
+        }
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.2f}"
+            for name, seconds in timings.items()
+        )
+
+
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics",
+    default=None,
+)
+
+
+class ServerTimingMiddleware:
+    """Collect metrics for each HTTP request and add them to response headers."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Init the middleware with the ASGI app that it wraps."""
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Set the metrics for the request then add them to the response."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        start = perf_counter()
+
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(metrics.queries)
+                headers[SERVER_TIMING_HEADER] = metrics.server_timing(
+                    perf_counter() - start,
+                )
+            await send(message)
+
+        token = request_metrics.set(metrics)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_metrics.reset(token)
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Route that records how long it takes to serialize the endpoint's response.
+
+    The time is measured from when the endpoint returns to when the response is
+    created, which includes validating and serializing the return value using
+    the response model. Routers should pass this as their route_class, if
+    settings.INSTRUMENT_REQUESTS is disabled it behaves exactly like APIRoute.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable[..., Any],
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """Init the route and wrap the endpoint to record when it returns."""
+        super().__init__(path, endpoint, **kwargs)
+        if config.settings.INSTRUMENT_REQUESTS and self.dependant.call:
+            self.dependant.call = record_endpoint_done(self.dependant.call)
+
+    def get_route_handler(self) -> Callable:
+        """Return a request handler that records the serialization time."""
+        handler = super().get_route_handler()
+        if not config.settings.INSTRUMENT_REQUESTS:
+            return handler
+
+        async def instrumented_handler(request: Request) -> Response:
+            response = await handler(request)
+            metrics = request_metrics.get()
+            if metrics is not None and metrics.endpoint_done_at is not None:
+                elapsed = perf_counter() - metrics.endpoint_done_at
+                loading = (
+                    metrics.loading_time
+                    - metrics.loading_time_at_endpoint_done
+                )
+                metrics.serialize_time += elapsed - loading
+            return response
+
+        return instrumented_handler
+
+
+def record_endpoint_done(call: Callable) -> Callable:
+    """Wrap an endpoint to record the time when it returns."""
+
+    def mark_done() -> None:
+        metrics = request_metrics.get()
+        if metrics is not None:
+            metrics.endpoint_done_at = perf_counter()
+            metrics.loading_time_at_endpoint_done = metrics.loading_time
+
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_endpoint(
+            *args: Any,  # noqa: ANN401
+            **kwargs: Any,  # noqa: ANN401
+        ) -> Any:  # noqa: ANN401
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                mark_done()
+
+        return async_endpoint
+
+    @functools.wraps(call)
+    def endpoint(
+        *args: Any,  # noqa: ANN401
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+        try:
+            return call(*args, **kwargs)
+        finally:
+            mark_done()
+
+    return endpoint
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count the statements executed by an engine and time their execution.
+
+    Parameters
+    ----------
+    engine: Engine
+        The engine to instrument, for an AsyncEngine pass its sync_engine
+
+    """
+    if not event.contains(engine, "before_cursor_execute", before_execute):
+        event.listen(engine, "before_cursor_execute", before_execute)
+        event.listen(engine, "after_cursor_execute", after_execute)
+
+
+def instrument_sessions() -> None:
+    """Time how long each Session spends loading ORM objects from results."""
+    if not event.contains(Session, "do_orm_execute", time_orm_execute):
+        event.listen(Session, "do_orm_execute", time_orm_execute)
+
+
+def before_execute(conn: Any, *_: Any) -> None:  # noqa: ANN401
+    """Record the time a statement started executing on the connection."""
+    if request_metrics.get() is not None:
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def after_execute(conn: Any, *_: Any) -> None:  # noqa: ANN401
+    """Add the statement's execution time to the metrics for the request."""
+    metrics = request_metrics.get()
+    if metrics is not None and conn.info.get("query_start"):
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - conn.info["query_start"].pop()
+
+
+def time_orm_execute(state: ORMExecuteState) -> Any:  # noqa: ANN401
+    """
+    Execute an ORM query and time how long it takes to load its results.
+
+    The results are frozen (i.e. fully loaded) so that the time spent turning
+    rows into ORM objects can be measured, then the time spent executing SQL
+    is subtracted. Streamed results, and queries run while an outer query is
+    already being timed (e.g. eager loads), are left to the outer query.
+    """
+    metrics = request_metrics.get()
+    options = state.execution_options
+    if (
+        metrics is None
+        or metrics.orm_depth
+        or not state.is_select
+        or options.get("yield_per")
+        or options.get("stream_results")
+    ):
+        return None
+    start = perf_counter()
+    db_time = metrics.db_time
+    metrics.orm_depth += 1
+    try:
+        frozen = state.invoke_statement().freeze()
+    finally:
+        metrics.orm_depth -= 1
+        elapsed = perf_counter() - start
+        metrics.orm_time += elapsed - (metrics.db_time - db_time)
+    return frozen()
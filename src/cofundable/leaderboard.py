@@ -0,0 +1,262 @@
+"""
+Rank causes by balance in memory, for the GET /causes/leaderboard endpoint.
+
+Ranking the causes in the database means sorting every cause's account on each
+request. Instead, the balances are loaded once when the API starts into a list
+of (-balance, account_id) keys that is kept sorted, so the top causes are the
+start of the list and the rank of a cause is found by bisecting it, without a
+query.
+
+When a transfer is committed, the balances that it changed (which AccountCRUD
+notes in Session.info, see CHANGED_BALANCES) are applied to the leaderboard by
+an after_commit hook on the session. Each update is a bisect to remove the old
+key and an insort of the new one, which move the keys after them in the list
+with a memmove but do no allocation per cause. Updates that are missed, e.g.
+because they were committed by another process, are corrected by reloading the
+balances every settings.LEADERBOARD_RESYNC_INTERVAL seconds, see keep_synced().
+"""
+
+import asyncio
+import threading
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager, suppress
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    NamedTuple,
+    Sequence,
+)
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from cofundable import config
+from cofundable.models.base import utc_now
+from cofundable.schemas.leaderboard import LeaderboardEntrySchema
+from cofundable.services.accounts import CHANGED_BALANCES
+from cofundable.services.causes import cause_service
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import datetime
+
+# the key in Session.info of the leaderboard that commits should update
+LEADERBOARD = "leaderboard"
+
+
+class RankedCause(NamedTuple):
+    """The details of a cause that are returned with its rank."""
+
+    cause_id: UUID
+    handle: str
+    name: str
+
+
+class Leaderboard:
+    """
+    Keep the causes sorted by balance as transfers to them are committed.
+
+    Attributes
+    ----------
+    synced_at: datetime | None
+        When the balances were last loaded from the database
+
+    """
+
+    def __init__(self) -> None:
+        """Init an empty leaderboard, which is filled by load()."""
+        self.synced_at: datetime | None = None
+        self._lock = threading.Lock()
+        # sorted so that the highest balance comes first, ties by account id
+        self._keys: list[tuple[int, UUID]] = []
+        self._balances: dict[UUID, int] = {}
+        self._causes: dict[UUID, RankedCause] = {}
+        self._accounts_by_handle: dict[str, UUID] = {}
+        # updates committed while the balances are being reloaded
+        self._updates_during_load: dict[UUID, int] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of causes on the leaderboard."""
+        return len(self._keys)
+
+    def load(self, db: Session) -> None:
+        """Replace every cause's balance with its balance in the database."""
+        self._start_load()
+        self._replace(db.execute(cause_service.query_balances()).all())
+
+    async def aload(self, db: AsyncSession) -> None:
+        """Replace every cause's balance, see load()."""
+        self._start_load()
+        result = await db.execute(cause_service.query_balances())
+        self._replace(result.all())
+
+    def resync(self, session_factory: sessionmaker) -> None:
+        """Load the balances in a new session from the factory."""
+        with session_factory() as db:
+            self.load(db)
+
+    async def aresync(self, session_factory: async_sessionmaker) -> None:
+        """Load the balances in a new session from the async factory."""
+        async with session_factory() as db:
+            await self.aload(db)
+
+    def update(self, balances: dict[UUID, int]) -> None:
+        """
+        Set the balances of the accounts that belong to causes.
+
+        Parameters
+        ----------
+        balances: dict[UUID, int]
+            The new balance of each account in minor units. Accounts that
+            aren't on the leaderboard, e.g. users' accounts and causes created
+            since it was loaded, are skipped until the next load().
+
+        """
+        with self._lock:
+            if self._updates_during_load is not None:
+                self._updates_during_load.update(balances)
+            for account_id, balance in balances.items():
+                self._set_balance(account_id, balance)
+
+    def top(self, limit: int) -> list[LeaderboardEntrySchema]:
+        """Return the causes with the highest balances, highest first."""
+        with self._lock:
+            return [
+                self._entry(account_id) for _, account_id in self._keys[:limit]
+            ]
+
+    def rank(self, handle: str) -> LeaderboardEntrySchema | None:
+        """Return a cause's position on the leaderboard, if it's on it."""
+        with self._lock:
+            account_id = self._accounts_by_handle.get(handle)
+            if account_id is None:
+                return None
+            return self._entry(account_id)
+
+    def _start_load(self) -> None:
+        """Start collecting the updates made while the balances are loaded."""
+        with self._lock:
+            self._updates_during_load = {}
+
+    def _replace(self, rows: Sequence[Any]) -> None:
+        """Replace the balances with the rows returned by query_balances()."""
+        causes = {}
+        balances = {}
+        for row in rows:
+            causes[row.account_id] = RankedCause(row.id, row.handle, row.name)
+            balances[row.account_id] = row.balance
+        with self._lock:
+            # updates committed while loading may not be included in the rows
+            for account_id, balance in (
+                self._updates_during_load or {}
+            ).items():
+                if account_id in balances:
+                    balances[account_id] = balance
+            self._updates_during_load = None
+            self._causes = causes
+            self._balances = balances
+            self._keys = sorted(
+                (-balance, account_id)
+                for account_id, balance in balances.items()
+            )
+            self._accounts_by_handle = {
+                cause.handle: account_id
+                for account_id, cause in causes.items()
+            }
+            self.synced_at = utc_now()
+
+    def _set_balance(self, account_id: UUID, balance: int) -> None:
+        """Move an account's key to the position of its new balance."""
+        old_balance = self._balances.get(account_id)
+        if old_balance is None or old_balance == balance:
+            return
+        index = bisect_left(self._keys, (-old_balance, account_id))
+        del self._keys[index]
+        insort(self._keys, (-balance, account_id))
+        self._balances[account_id] = balance
+
+    def _entry(self, account_id: UUID) -> LeaderboardEntrySchema:
+        """Return the position of a cause, which it shares with equal balances."""
+        balance = self._balances[account_id]
+        cause = self._causes[account_id]
+        return LeaderboardEntrySchema(
+            # a shorter tuple sorts first, so this finds the first tied key
+            rank=bisect_left(self._keys, (-balance,)) + 1,
+            cause_id=cause.cause_id,
+            handle=cause.handle,
+            name=cause.name,
+            balance=balance,
+        )
+
+
+def attach(
+    leaderboard: Leaderboard,
+    session_factory: sessionmaker | async_sessionmaker,
+) -> None:
+    """Update the leaderboard when a session from the factory commits."""
+    session_factory.configure(info={LEADERBOARD: leaderboard})
+
+
+def track_commits() -> None:
+    """Listen for commits that change balances, for every attached factory."""
+    if not event.contains(Session, "after_commit", apply_changed_balances):
+        event.listen(Session, "after_commit", apply_changed_balances)
+        event.listen(Session, "after_soft_rollback", discard_changed_balances)
+
+
+def apply_changed_balances(session: Session) -> None:
+    """Apply the balances changed by a committed transaction to the leaderboard."""
+    balances = session.info.pop(CHANGED_BALANCES, None)
+    leaderboard = session.info.get(LEADERBOARD)
+    if balances and leaderboard is not None:
+        leaderboard.update(balances)
+
+
+def discard_changed_balances(session: Session, _: Any) -> None:  # noqa: ANN401
+    """Forget the balances changed by a transaction that was rolled back."""
+    session.info.pop(CHANGED_BALANCES, None)
+
+
+@asynccontextmanager
+async def keep_synced(
+    resync: Callable[[], Awaitable[None]],
+    interval: float | None = None,
+) -> AsyncIterator[None]:
+    """
+    Load the leaderboard, then reload it every interval seconds until exit.
+
+    A load that fails (e.g. because the database is unavailable, or hasn't
+    been migrated yet) is retried at the next interval, and the leaderboard is
+    left as it was until then, so it doesn't stop the API from starting.
+
+    Parameters
+    ----------
+    resync: Callable[[], Awaitable[None]]
+        Loads the leaderboard's balances, e.g. Leaderboard.aresync() with a
+        session factory
+    interval: float | None, optional
+        The number of seconds between loads, defaults to
+        settings.LEADERBOARD_RESYNC_INTERVAL
+
+    """
+    if interval is None:
+        interval = config.settings.LEADERBOARD_RESYNC_INTERVAL
+
+    async def resync_periodically() -> None:
+        while True:
+            await asyncio.sleep(interval)
+            with suppress(SQLAlchemyError):
+                await resync()
+
+    with suppress(SQLAlchemyError):
+        await resync()
+    task = asyncio.create_task(resync_periodically())
+    try:
+        yield
+    finally:
+        task.cancel()
@@ -12,18 +12,24 @@ so that the migration scripts are auto-generated correctly
 __all__ = [
     "UUIDAuditBase",
     "Account",
+    "AccountDailyRollup",
     "Bookmark",
     "Cause",
     "Tag",
     "EntryType",
+    "IdempotencyKey",
     "Transaction",
     "User",
+    "cause_search_table",
 ]
 
 from cofundable.models.account import Account
 from cofundable.models.base import UUIDAuditBase
 from cofundable.models.bookmark import Bookmark
 from cofundable.models.cause import Cause
+from cofundable.models.idempotency_key import IdempotencyKey
+from cofundable.models.rollup import AccountDailyRollup
+from cofundable.models.search import cause_search_table
 from cofundable.models.tag import Tag
 from cofundable.models.transaction import EntryType, Transaction
 from cofundable.models.user import User
@@ -7,10 +7,9 @@ or cause to earn, spend, and pledge shares in Cofundable.
 
 from __future__ import annotations
 
-from decimal import Decimal  # noqa: TCH003
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Numeric
+from sqlalchemy import BigInteger
 from sqlalchemy.orm import relationship
 
 from cofundable.models.base import Mapped, UUIDAuditBase, mapped_column
@@ -25,7 +24,8 @@ class Account(UUIDAuditBase):
     """Manage transactions for a user or cause."""
 
     name: Mapped[str]
-    balance: Mapped[Decimal] = mapped_column(Numeric)
+    # in minor units (hundredths of a share), see schemas.base.MinorUnits
+    balance: Mapped[int] = mapped_column(BigInteger)
 
     # Each account should have either a user or a cause but not both
     user: Mapped[User] = relationship(back_populates="account")
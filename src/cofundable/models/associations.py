@@ -1,6 +1,6 @@
 """Create association tables for many-to-many relationships."""
 
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 
 from cofundable.models.base import UUIDAuditBase
 
@@ -9,4 +9,6 @@ cause_tag_table = Table(
     UUIDAuditBase.metadata,
     Column("cause_id", ForeignKey("cause.id"), primary_key=True),
     Column("tag_id", ForeignKey("tag.id"), primary_key=True),
+    # the primary key covers lookups by cause_id, this covers lookups by tag_id
+    Index("ix_cause_tag_tag_id_cause_id", "tag_id", "cause_id"),
 )
@@ -1,6 +1,11 @@
 # pylint: disable=no-self-argument
 """Create base models that other models can inherit from."""
 
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, ClassVar
 from uuid import UUID
 
 from sqlalchemy import DateTime
@@ -10,23 +15,99 @@ from sqlalchemy.orm import (
     declared_attr,
     mapped_column,
 )
-from sqlalchemy.sql import functions
+
+UUID7_MAX_COUNTER = 0xFFF  # the counter is stored in 12 bits
+
+
+def utc_now() -> datetime:
+    """
+    Return the current time in UTC.
+
+    Timestamps are set in Python instead of with the database's now() so that
+    they have microsecond precision on every database (SQLite's only has
+    seconds), which keeps the (created_at, id) keys used by cursor pagination
+    consistent between the rows and the cursors.
+    """
+    return datetime.now(timezone.utc)
+
+
+class UUID7Generator:
+    """
+    Generate time-ordered version 7 UUIDs that are monotonic within a process.
+
+    The first 48 bits are the Unix timestamp in milliseconds, so ids created
+    later sort after ids created earlier and new rows are appended to the end
+    of the primary key's index instead of being scattered across it. The next
+    12 bits are a counter that is incremented for ids created within the same
+    millisecond (see RFC 9562, section 6.2, method 1) and the remaining 62 bits
+    are random.
+    """
+
+    def __init__(self) -> None:
+        """Init the generator with no previously generated id."""
+        self._last_ms = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> UUID:
+        """Return a new UUID that sorts after every id generated before it."""
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # start from a random value in the lower half of the counter
+                self._counter = int.from_bytes(os.urandom(2)) & 0x7FF
+            else:
+                self._counter += 1
+                if self._counter > UUID7_MAX_COUNTER:
+                    # the counter overflowed, so borrow the next millisecond
+                    self._last_ms += 1
+                    self._counter = 0
+            timestamp, counter = self._last_ms, self._counter
+        rand_b = int.from_bytes(os.urandom(8)) & 0x3FFF_FFFF_FFFF_FFFF
+        return UUID(
+            int=(timestamp & 0xFFFF_FFFF_FFFF) << 80
+            | 0x7 << 76
+            | counter << 64
+            | 0b10 << 62
+            | rand_b,
+        )
+
+
+uuid7 = UUID7Generator()
 
 
 class UUIDAuditBase(DeclarativeBase):
-    """Base db model that includes id, created_at, and update_at."""
+    """
+    Base db model that includes id, created_at, and update_at.
+
+    New ids are created by the class's id_generator, which defaults to uuid7()
+    and can be replaced on a subclass (e.g. with uuid.uuid4) to change how the
+    ids for that model are generated.
+    """
+
+    id_generator: ClassVar[Callable[[], UUID]] = staticmethod(uuid7)
+
+    # fetch any server-generated values with RETURNING when a row is inserted
+    # or updated, instead of expiring them and selecting them again later
+    __mapper_args__ = {"eager_defaults": True}  # noqa: RUF012
 
     id: Mapped[UUID] = mapped_column(primary_key=True)
     created_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
-        default=functions.now(),
+        default=utc_now,
     )
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
-        default=functions.now(),
-        onupdate=functions.now(),
+        default=utc_now,
+        onupdate=utc_now,
     )
 
+    @classmethod
+    def new_id(cls) -> UUID:
+        """Return a new id for a record of this model."""
+        return cls.id_generator()
+
     @declared_attr.directive
     def __tablename__(cls) -> str:  # noqa: N805
         """Set default table name as the lowercase version of the class name."""
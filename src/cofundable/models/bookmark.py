@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID, ForeignKey, UniqueConstraint
+from sqlalchemy import UUID, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from cofundable.models.base import Mapped, UUIDAuditBase, mapped_column
@@ -17,7 +17,11 @@ if TYPE_CHECKING:  # pragma: no cover
 class Bookmark(UUIDAuditBase):
     """Store information related to a user's bookmarks."""
 
-    __table_args__ = (UniqueConstraint("user_id", "cause_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "cause_id"),
+        # supports listing a user's bookmarks by most recent
+        Index("ix_bookmark_user_id_created_at", "user_id", "created_at"),
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("user.id"),
@@ -22,7 +22,7 @@ class Cause(UUIDAuditBase):
     __table_args__ = (UniqueConstraint("account_id"),)
 
     name: Mapped[str]
-    handle: Mapped[str]
+    handle: Mapped[str] = mapped_column(unique=True, index=True)
     description: Mapped[str | None]
     account_id: Mapped[UUID] = mapped_column(
         ForeignKey("account.id"),
@@ -0,0 +1,40 @@
+"""Create an ORM for the idempotencykey table in the database."""
+
+from __future__ import annotations
+
+from sqlalchemy import UUID, DateTime, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import mapped_column
+
+from cofundable.models.base import Mapped, UUIDAuditBase
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKey(UUIDAuditBase):
+    """
+    Store the outcome of a request that was sent with an Idempotency-Key.
+
+    When a client retries a request with the same key, the transactions that
+    were created by the original request are returned instead of making the
+    transfer again.
+    """
+
+    __table_args__ = (
+        # each key is looked up with a single probe of this unique index
+        UniqueConstraint("user_id", "key"),
+    )
+
+    key: Mapped[str] = mapped_column(String(MAX_KEY_LENGTH))
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id"),
+        nullable=False,
+    )
+    # sha256 of the request body, so a key can't be reused for a new request
+    request_hash: Mapped[str] = mapped_column(String(64))
+    debit_id: Mapped[UUID] = mapped_column(ForeignKey("transaction.id"))
+    credit_id: Mapped[UUID] = mapped_column(ForeignKey("transaction.id"))
+    # supports purging expired keys in batches
+    expires_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        index=True,
+    )
@@ -0,0 +1,37 @@
+"""Create an ORM for the accountdailyrollup table in the database."""
+
+from __future__ import annotations
+
+import datetime  # noqa: TCH003
+
+from sqlalchemy import UUID, BigInteger, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import mapped_column
+
+from cofundable.models.base import Mapped, UUIDAuditBase
+
+
+class AccountDailyRollup(UUIDAuditBase):
+    """
+    Store the credits and debits of an account on a given day (in UTC).
+
+    The rollups are updated in the same database transaction as the ledger
+    by AccountCRUD.transfer_shares(), so an account's funding over a range of
+    days can be read from one row per day instead of every transaction.
+    """
+
+    __table_args__ = (
+        # each rollup is upserted by this key, which also supports reading an
+        # account's rollups for a range of days with one index range scan
+        UniqueConstraint("account_id", "day"),
+    )
+
+    account_id: Mapped[UUID] = mapped_column(
+        ForeignKey("account.id"),
+        nullable=False,
+    )
+    day: Mapped[datetime.date] = mapped_column(Date)
+    # totals are in minor units (hundredths of a share)
+    credit_total: Mapped[int] = mapped_column(BigInteger, default=0)
+    credit_count: Mapped[int] = mapped_column(default=0)
+    debit_total: Mapped[int] = mapped_column(BigInteger, default=0)
+    debit_count: Mapped[int] = mapped_column(default=0)
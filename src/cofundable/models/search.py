@@ -0,0 +1,175 @@
+# ruff: noqa: S608 - the DDL is only formatted with the constants below
+"""
+Create the full-text index that GET /causes/search queries.
+
+On SQLite the index is an FTS5 virtual table, cause_search, with one document
+per cause made of its name, handle, description and the names of its tags. The
+documents are kept up to date by triggers on the cause, cause_tag and tag
+tables, so every write made through CauseCRUD (create(), create_many() and
+update()) updates the index in the same transaction, one document at a time.
+
+The cause_id column is indexed too, which lets the triggers find a cause's
+document with a MATCH on that column instead of scanning every document.
+Searches are limited to the other columns by SEARCH_COLUMNS.
+
+On PostgreSQL, GIN indexes on tsvector expressions of the cause and tag tables
+are used instead, see cause_document() and tag_document().
+"""
+
+import sqlalchemy as sa
+
+from cofundable.models.base import UUIDAuditBase
+from cofundable.models.cause import Cause
+from cofundable.models.tag import Tag
+
+# the SQLite FTS5 table, its shadow tables (e.g. cause_search_data) share the
+# name as a prefix
+CAUSE_SEARCH_TABLE = "cause_search"
+# the columns of a document that a search is matched against
+SEARCH_COLUMNS = ("name", "handle", "description", "tags")
+# the text search configuration used to parse documents on PostgreSQL
+POSTGRESQL_TEXT_SEARCH_CONFIG = "english"
+
+# queried with SQLAlchemy, but created by the DDL below instead of metadata
+cause_search_table = sa.table(
+    CAUSE_SEARCH_TABLE,
+    sa.column("cause_id", Cause.id.type),
+    *(sa.column(name) for name in SEARCH_COLUMNS),
+)
+
+# the space separated names of a cause's tags, for the tags column
+_TAG_NAMES = """(
+    SELECT group_concat(tag.name, ' ')
+    FROM cause_tag JOIN tag ON tag.id = cause_tag.tag_id
+    WHERE cause_tag.cause_id = {cause_id}
+)"""
+# matches the document of a cause by its id
+_MATCH_CAUSE = "cause_search MATCH 'cause_id:\"' || {cause_id} || '\"'"
+
+SQLITE_DDL = [
+    # the prefix indexes make searches for the start of a word, e.g. "mut*",
+    # as fast as searches for a whole word
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {CAUSE_SEARCH_TABLE} USING fts5(
+        cause_id, name, handle, description, tags,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_cause_insert
+    AFTER INSERT ON cause BEGIN
+        INSERT INTO {CAUSE_SEARCH_TABLE}
+            (cause_id, name, handle, description, tags)
+        VALUES (
+            new.id, new.name, new.handle, new.description,
+            {_TAG_NAMES.format(cause_id="new.id")}
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_cause_update
+    AFTER UPDATE OF name, handle, description ON cause BEGIN
+        UPDATE {CAUSE_SEARCH_TABLE}
+        SET name = new.name,
+            handle = new.handle,
+            description = new.description
+        WHERE {_MATCH_CAUSE.format(cause_id="new.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_cause_delete
+    AFTER DELETE ON cause BEGIN
+        DELETE FROM {CAUSE_SEARCH_TABLE}
+        WHERE {_MATCH_CAUSE.format(cause_id="old.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_cause_tag_insert
+    AFTER INSERT ON cause_tag BEGIN
+        UPDATE {CAUSE_SEARCH_TABLE}
+        SET tags = {_TAG_NAMES.format(cause_id="new.cause_id")}
+        WHERE {_MATCH_CAUSE.format(cause_id="new.cause_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_cause_tag_delete
+    AFTER DELETE ON cause_tag BEGIN
+        UPDATE {CAUSE_SEARCH_TABLE}
+        SET tags = {_TAG_NAMES.format(cause_id="old.cause_id")}
+        WHERE {_MATCH_CAUSE.format(cause_id="old.cause_id")};
+    END
+    """,
+    # tags are rarely renamed, so this scans the documents instead of
+    # matching each cause with the tag one at a time
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cause_search_tag_update
+    AFTER UPDATE OF name ON tag BEGIN
+        UPDATE {CAUSE_SEARCH_TABLE}
+        SET tags = {_TAG_NAMES.format(cause_id="cause_search.cause_id")}
+        WHERE cause_id IN (
+            SELECT cause_id FROM cause_tag WHERE tag_id = new.id
+        );
+    END
+    """,
+]
+
+# the triggers are dropped along with the cause, cause_tag and tag tables
+SQLITE_DROP_DDL = [f"DROP TABLE IF EXISTS {CAUSE_SEARCH_TABLE}"]
+
+
+def postgresql_config() -> sa.TextClause:
+    """
+    Return the text search configuration as a literal.
+
+    Literals are rendered inline instead of as bound parameters, so that the
+    expressions in a query match the ones in the indexes exactly.
+    """
+    return sa.text(f"'{POSTGRESQL_TEXT_SEARCH_CONFIG}'::regconfig")
+
+
+def cause_document() -> sa.Function:
+    """Return the tsvector of a cause's name, handle and description."""
+    space = sa.text("' '")
+    text = (
+        Cause.__table__.c.name
+        + space
+        + Cause.__table__.c.handle
+        + space
+        + sa.func.coalesce(
+            Cause.__table__.c.description,
+            sa.text("''"),
+        )
+    )
+    return sa.func.to_tsvector(postgresql_config(), text)
+
+
+def tag_document() -> sa.Function:
+    """Return the tsvector of a tag's name."""
+    return sa.func.to_tsvector(postgresql_config(), Tag.__table__.c.name)
+
+
+# SQLite can't index a tsvector, so these are only created on PostgreSQL
+sa.Index(
+    "ix_cause_search_document",
+    cause_document(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+sa.Index(
+    "ix_tag_search_document",
+    tag_document(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+for statement in SQLITE_DDL:
+    sa.event.listen(
+        UUIDAuditBase.metadata,
+        "after_create",
+        sa.DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in SQLITE_DROP_DDL:
+    sa.event.listen(
+        UUIDAuditBase.metadata,
+        "before_drop",
+        sa.DDL(statement).execute_if(dialect="sqlite"),
+    )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import mapped_column, relationship
 
 from cofundable.models.associations import cause_tag_table
 from cofundable.models.base import Mapped, UUIDAuditBase
@@ -16,8 +16,11 @@ if TYPE_CHECKING:  # pragma: no cover
 class Tag(UUIDAuditBase):
     """Store information related to a cause."""
 
-    name: Mapped[str]
+    name: Mapped[str] = mapped_column(unique=True, index=True)
     description: Mapped[str | None]
+    # the number of causes with this tag, so tags can be listed with their
+    # counts without joining cause_tag, see TagsCRUD.count_causes()
+    cause_count: Mapped[int] = mapped_column(default=0, server_default="0")
 
     causes: Mapped[list[Cause]] = relationship(
         secondary=cause_tag_table,
@@ -7,7 +7,7 @@ import uuid  # noqa: TCH003
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID, ForeignKey, UniqueConstraint
+from sqlalchemy import UUID, BigInteger, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import mapped_column, relationship
 
 from cofundable.models.base import Mapped, UUIDAuditBase
@@ -26,13 +26,26 @@ class EntryType(Enum):
 class Transaction(UUIDAuditBase):
     """Store information related to a transaction in Cofundable."""
 
-    __table_args__ = (UniqueConstraint("match_entry_id"),)
+    __table_args__ = (
+        UniqueConstraint("match_entry_id"),
+        # supports listing an account's transactions by most recent, and
+        # finding the last transaction before a given time
+        Index(
+            "ix_transaction_account_id_created_at",
+            "account_id",
+            "created_at",
+        ),
+    )
 
     # columns
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
-    amount: Mapped[float]
+    # amounts and balances are in minor units (hundredths of a share)
+    amount: Mapped[int] = mapped_column(BigInteger)
     kind: Mapped[EntryType]
     note: Mapped[str | None]
+    # the account's balance after this transaction, so the balance at any time
+    # can be read from the last transaction before it instead of summing them
+    balance_after: Mapped[int] = mapped_column(BigInteger)
     account_id: Mapped[UUID] = mapped_column(
         ForeignKey("account.id"),
         nullable=False,
@@ -20,7 +20,7 @@ class User(UUIDAuditBase):
 
     __table_args__ = (UniqueConstraint("account_id"),)
 
-    handle: Mapped[str]
+    handle: Mapped[str] = mapped_column(unique=True, index=True)
     name: Mapped[str]
     bio: Mapped[str | None]
     account_id: Mapped[UUID] = mapped_column(
@@ -0,0 +1,463 @@
+"""
+Paginate query results using page numbers or keyset (cursor) pagination.
+
+Page responses use LIMIT/OFFSET and, unless the client passes
+include_total=false, count every row that matches the query. Endpoints that
+list large tables can cache those counts for settings.PAGINATION_COUNT_TTL
+seconds instead of counting on every request.
+
+Cursor pages instead filter on the (created_at, id) of the last row on the
+previous page, which an index can seek to directly, so every page costs the
+same no matter how deep it is. Queries whose rows are found through an index
+that ends with a time-ordered UUID (e.g. cause_tag's (tag_id, cause_id) index)
+can be paginated by that id alone instead, see paginate_by_id().
+
+Cursors are opaque to clients: they're base64 encoded and signed with an HMAC
+using settings.PAGINATION_SECRET so that a cursor that has been modified is
+rejected instead of being used to build a query.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from math import ceil
+from typing import (
+    Annotated,
+    Any,
+    Generic,
+    Hashable,
+    MutableMapping,
+    Sequence,
+    TypeVar,
+)
+from uuid import UUID
+
+import fastapi_pagination
+import sqlalchemy as sa
+from fastapi import HTTPException, Query, status
+from fastapi_pagination import create_page, resolve_params
+from fastapi_pagination.bases import AbstractPage, AbstractParams, RawParams
+from fastapi_pagination.ext.sqlalchemy import count_query, paginate_query
+from fastapi_pagination.links import Page as LinksPage
+from fastapi_pagination.links.bases import create_links, validation_decorator
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cofundable import config
+
+ItemT = TypeVar("ItemT")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class Params(fastapi_pagination.Params):
+    """Page number and size params, with an option to skip counting items."""
+
+    include_total: bool = Query(
+        default=True,
+        description="Count the total number of items, false skips the count",
+    )
+
+    def to_raw_params(self) -> RawParams:
+        """Return the limit and offset, and whether to count the items."""
+        raw_params = super().to_raw_params()
+        raw_params.include_total = self.include_total
+        return raw_params
+
+
+class Page(LinksPage[ItemT], Generic[ItemT]):
+    """
+    Response schema for a page of results, with links to other pages.
+
+    If the total wasn't counted, the link to the last page is omitted and the
+    link to the next page is included whenever the current page is full.
+    """
+
+    __params_type__ = Params
+
+    @validation_decorator
+    # pylint: disable-next=no-self-argument
+    def __root_validator__(cls, value: Any) -> Any:  # noqa: ANN401, N805
+        """Create the links to the first, last, next and previous pages."""
+        if not isinstance(value, MutableMapping) or "links" in value:
+            return value
+        page, size, total = (value[key] for key in ("page", "size", "total"))
+        last: dict[str, Any] | None = None
+        if total is None:
+            has_next = len(value["items"]) >= size
+        else:
+            last = {"page": max(ceil(total / size), 1)}
+            has_next = page * size < total
+        value["links"] = create_links(
+            first={"page": 1},
+            # create_links() omits any link that is None, including last
+            last=last,  # type: ignore[arg-type]
+            next={"page": page + 1} if has_next else None,
+            prev={"page": page - 1} if page - 1 >= 1 else None,
+        )
+        return value
+
+
+class CountCache:
+    """
+    Cache the total number of rows matched by a count query for a short time.
+
+    Parameters
+    ----------
+    ttl: float | None, optional
+        Seconds that a count is cached for, defaults to
+        settings.PAGINATION_COUNT_TTL
+
+    """
+
+    def __init__(self, ttl: float | None = None) -> None:
+        """Init the CountCache with an empty cache."""
+        self.ttl = ttl
+        self._counts: dict[Hashable, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        bind: sa.Engine | sa.Connection,
+        stmt: sa.Select,
+    ) -> Hashable:
+        """Return the cache key for a count query run on a given database."""
+        compiled = stmt.compile(bind)
+        params = tuple(sorted(compiled.params.items()))
+        return (str(bind.engine.url), compiled.string, params)
+
+    def get(self, key: Hashable) -> int | None:
+        """Return the cached count for the key if it hasn't expired."""
+        with self._lock:
+            expires_at, total = self._counts.get(key, (0.0, 0))
+        if expires_at < time.monotonic():
+            return None
+        return total
+
+    def set(self, key: Hashable, total: int) -> None:
+        """
+        Cache the count for the key and remove the counts that have expired.
+
+        Keys are moved to the end of the cache when they're set, so the counts
+        are kept in order of when they expire and the expired ones can be
+        removed from the start without scanning the rest.
+        """
+        ttl = self.ttl
+        if ttl is None:
+            ttl = config.settings.PAGINATION_COUNT_TTL
+        now = time.monotonic()
+        with self._lock:
+            self._counts.pop(key, None)
+            self._counts[key] = (now + ttl, total)
+            # the count that was just set hasn't expired, so this stops at it
+            oldest = next(iter(self._counts))
+            while self._counts[oldest][0] < now:
+                del self._counts[oldest]
+                oldest = next(iter(self._counts))
+
+    def clear(self) -> None:
+        """Remove all of the cached counts."""
+        with self._lock:
+            self._counts.clear()
+
+
+count_cache = CountCache()
+
+
+def paginate(
+    db: Session,
+    query: sa.Select,
+    *,
+    cache_count: bool = False,
+) -> AbstractPage:
+    """
+    Return the page of results requested by the page number params.
+
+    Parameters
+    ----------
+    db: Session
+        Instance of SQLAlchemy session that manages database transactions
+    query: Select
+        The query to paginate
+    cache_count: bool, optional
+        Cache the total number of items for settings.PAGINATION_COUNT_TTL
+        seconds, so that it is only counted once for every request in that
+        period. The total may be out of date by up to that many seconds.
+
+    """
+    params: AbstractParams = resolve_params()
+    total = None
+    if params.to_raw_params().include_total:
+        stmt = count_query(query)
+        if not cache_count:
+            total = db.scalar(stmt)
+        else:
+            key = count_cache.key(db.get_bind(), stmt)
+            total = count_cache.get(key)
+            if total is None:
+                total = db.scalar(stmt)
+                count_cache.set(key, total)
+    result = db.execute(paginate_query(query, params))
+    return create_page(
+        result.unique().scalars().all(),
+        total=total,
+        params=params,
+    )
+
+
+async def apaginate(
+    db: AsyncSession,
+    query: sa.Select,
+    *,
+    cache_count: bool = False,
+) -> AbstractPage:
+    """Return the page of results requested, see paginate() for details."""
+    params: AbstractParams = resolve_params()
+    total = None
+    if params.to_raw_params().include_total:
+        stmt = count_query(query)
+        if not cache_count:
+            total = await db.scalar(stmt)
+        else:
+            key = count_cache.key(db.get_bind(), stmt)
+            total = count_cache.get(key)
+            if total is None:
+                total = await db.scalar(stmt)
+                count_cache.set(key, total)
+    result = await db.execute(paginate_query(query, params))
+    return create_page(
+        result.unique().scalars().all(),
+        total=total,
+        params=params,
+    )
+
+
+class CursorPage(BaseModel, Generic[ItemT]):
+    """Response schema for a page of results returned by cursor pagination."""
+
+    items: Sequence[ItemT]
+    size: int
+    next_cursor: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+@dataclass
+class CursorParams:
+    """
+    Parameters for a cursor page, parsed from the request's query string.
+
+    Attributes
+    ----------
+    size: int
+        The maximum number of items to return
+    after: tuple[datetime, UUID] | None
+        The created_at and id of the last item on the previous page, or None
+        to return the first page
+
+    """
+
+    size: int
+    after: tuple[datetime, UUID] | None = None
+
+
+def cursor_params(
+    cursor: Annotated[
+        str | None,
+        Query(description="The next_cursor returned by the previous page"),
+    ] = None,
+    size: Annotated[
+        int,
+        Query(ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    ] = DEFAULT_PAGE_SIZE,
+) -> CursorParams:
+    """Parse the cursor pagination params, returning 400 if a cursor is invalid."""
+    if cursor is None:
+        return CursorParams(size=size)
+    try:
+        return CursorParams(size=size, after=decode_cursor(cursor))
+    except ValueError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        ) from error
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode and sign the keys of the last row on a page as a cursor."""
+    payload = json.dumps([created_at.isoformat(), row_id.hex]).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Verify a cursor's signature and decode the keys it contains.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed or its signature doesn't match its payload
+
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, binascii.Error) as error:
+        msg = "Malformed cursor"
+        raise ValueError(msg) from error
+    if not hmac.compare_digest(signature, _sign(payload)):
+        msg = "Cursor signature doesn't match"
+        raise ValueError(msg)
+    created_at, row_id = json.loads(payload)
+    return (datetime.fromisoformat(created_at), UUID(row_id))
+
+
+def paginate_by_keyset(
+    db: Session,
+    query: sa.Select,
+    params: CursorParams,
+) -> dict[str, Any]:
+    """
+    Return a page of results from a query ordered by (created_at, id) desc.
+
+    Parameters
+    ----------
+    db: Session
+        Instance of SQLAlchemy session that manages database transactions
+    query: Select
+        The query to paginate, which selects a model with created_at and id
+        columns, any order_by clauses are replaced
+    params: CursorParams
+        The cursor and page size from the request
+
+    Returns
+    -------
+    dict[str, Any]
+        The items on the page and the cursor for the next page, which can be
+        validated by a CursorPage response model
+
+    """
+    items = db.execute(keyset_query(query, params)).scalars().all()
+    return build_page(items, params)
+
+
+async def apaginate_by_keyset(
+    db: AsyncSession,
+    query: sa.Select,
+    params: CursorParams,
+) -> dict[str, Any]:
+    """Return a page of results, see paginate_by_keyset() for details."""
+    items = (await db.execute(keyset_query(query, params))).scalars().all()
+    return build_page(items, params)
+
+
+def keyset_query(query: sa.Select, params: CursorParams) -> sa.Select:
+    """Filter the query to the rows after the cursor and limit it to a page."""
+    model = query.column_descriptions[0]["entity"]
+    keys = sa.tuple_(model.created_at, model.id)
+    query = query.order_by(None).order_by(
+        model.created_at.desc(),
+        model.id.desc(),
+    )
+    if params.after is not None:
+        created_at, row_id = params.after
+        after = sa.tuple_(
+            sa.literal(created_at, model.created_at.type),
+            sa.literal(row_id, model.id.type),
+        )
+        query = query.where(keys < after)
+    # fetch an extra row to find out whether there is another page
+    return query.limit(params.size + 1)
+
+
+def paginate_by_id(
+    db: Session,
+    query: sa.Select,
+    params: CursorParams,
+    id_column: sa.ColumnElement,
+) -> dict[str, Any]:
+    """
+    Return a page of results from a query ordered by an id column desc.
+
+    Ids are version 7 UUIDs, which are in order of creation, so the pages are
+    ordered from newest to oldest like paginate_by_keyset(). Ordering by the
+    id alone lets an index whose last column is the id serve the order, and
+    the cursors are the same, but only the id in a cursor is used.
+
+    Parameters
+    ----------
+    db: Session
+        Instance of SQLAlchemy session that manages database transactions
+    query: Select
+        The query to paginate, which selects a model with created_at and id
+        columns, any order_by clauses are replaced
+    params: CursorParams
+        The cursor and page size from the request
+    id_column: ColumnElement
+        The column that the query is ordered by, whose values are the ids of
+        the selected model, e.g. a foreign key in an association table
+
+    """
+    items = db.execute(id_keyset_query(query, params, id_column)).scalars()
+    return build_page(items.all(), params)
+
+
+async def apaginate_by_id(
+    db: AsyncSession,
+    query: sa.Select,
+    params: CursorParams,
+    id_column: sa.ColumnElement,
+) -> dict[str, Any]:
+    """Return a page of results, see paginate_by_id() for details."""
+    stmt = id_keyset_query(query, params, id_column)
+    items = (await db.execute(stmt)).scalars().all()
+    return build_page(items, params)
+
+
+def id_keyset_query(
+    query: sa.Select,
+    params: CursorParams,
+    id_column: sa.ColumnElement,
+) -> sa.Select:
+    """Filter the query to the ids after the cursor and limit it to a page."""
+    query = query.order_by(None).order_by(id_column.desc())
+    if params.after is not None:
+        _, row_id = params.after
+        query = query.where(id_column < sa.literal(row_id, id_column.type))
+    # fetch an extra row to find out whether there is another page
+    return query.limit(params.size + 1)
+
+
+def build_page(items: Sequence, params: CursorParams) -> dict[str, Any]:
+    """Build a page from the items fetched by keyset_query()."""
+    next_cursor = None
+    if len(items) > params.size:
+        items = items[: params.size]
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"items": items, "size": params.size, "next_cursor": next_cursor}
+
+
+def _sign(payload: bytes) -> bytes:
+    """Sign the cursor payload with the pagination secret."""
+    secret = config.settings.PAGINATION_SECRET.encode()
+    return hmac.new(secret, payload, hashlib.sha256).digest()
+
+
+def _b64encode(value: bytes) -> str:
+    """Encode bytes as URL-safe base64 without padding."""
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    """Decode URL-safe base64 that may be missing its padding."""
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
@@ -0,0 +1,9 @@
+"""
+Create routers that serve the API endpoints with the async database stack.
+
+These routers expose the same endpoints as the routers in cofundable.routers,
+but they are declared with ``async def`` and use an AsyncSession, so requests
+are served on the event loop instead of being sent to the threadpool.
+Since an AsyncSession can't lazy load relationships, each query eagerly loads
+the relationships that are included in the response model.
+"""
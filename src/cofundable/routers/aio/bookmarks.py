@@ -0,0 +1,86 @@
+"""Route API requests related to bookmarking causes using an AsyncSession."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+from fastapi_pagination.bases import AbstractPage
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cofundable.dependencies.auth import get_async_current_user
+from cofundable.dependencies.database import get_async_db
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.models import Bookmark, User
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    apaginate,
+    apaginate_by_keyset,
+    cursor_params,
+)
+from cofundable.schemas.bookmark import BookmarkResponseSchema
+from cofundable.services.bookmarks import (
+    BOOKMARK_LOADER_OPTIONS,
+    bookmark_service,
+)
+
+bookmark_router = APIRouter(
+    route_class=InstrumentedRoute,
+    tags=["bookmarks"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@bookmark_router.get(
+    "/user/bookmarks/",
+    summary="List current user's bookmarks",
+    response_model=Page[BookmarkResponseSchema],
+)
+async def list_bookmarks_for_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+) -> AbstractPage:
+    """Fetch a paginated list of bookmarks for the currently authenticated user."""
+    query = bookmark_service.get_bookmarks_for_user(
+        curr_user.id,
+        options=BOOKMARK_LOADER_OPTIONS,
+    )
+    return await apaginate(db, query)
+
+
+@bookmark_router.get(
+    "/user/bookmarks/cursor",
+    summary="List current user's bookmarks using cursor pagination",
+    response_model=CursorPage[BookmarkResponseSchema],
+)
+async def list_bookmarks_for_current_user_by_cursor(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """Fetch the current user's bookmarks from newest to oldest."""
+    query = bookmark_service.get_bookmarks_for_user(
+        curr_user.id,
+        options=BOOKMARK_LOADER_OPTIONS,
+    )
+    return await apaginate_by_keyset(db, query, params)
+
+
+@bookmark_router.put(
+    "/user/bookmarks/{cause}",
+    summary="Bookmark a cause for the current user",
+    response_model=BookmarkResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def bookmark_cause_for_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    cause: str,
+) -> Bookmark:
+    """Add a cause to the currently authenticated user's list of bookmarks."""
+    return await bookmark_service.abookmark_cause_for_user(
+        db,
+        user_id=curr_user.id,
+        cause_handle=cause,
+        options=BOOKMARK_LOADER_OPTIONS,
+    )
@@ -0,0 +1,168 @@
+"""Route API requests related to Cofundable causes using an AsyncSession."""
+
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi_pagination.bases import AbstractPage
+
+from cofundable.dependencies.database import AsyncSession, get_async_db
+from cofundable.dependencies.leaderboard import get_leaderboard
+from cofundable.imports import NDJSON_REQUEST_BODY, BulkImport, aimport_stream
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.leaderboard import Leaderboard
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    apaginate,
+    apaginate_by_keyset,
+    cursor_params,
+)
+from cofundable.schemas.cause import CauseRequestSchema, CauseResponseSchema
+from cofundable.schemas.imports import ImportReportSchema
+from cofundable.schemas.leaderboard import LeaderboardSchema
+from cofundable.services.causes import (
+    CAUSE_LOADER_OPTIONS,
+    Cause,
+    cause_service,
+)
+
+# the most causes returned by the leaderboard at once
+MAX_LEADERBOARD_LIMIT = 100
+
+cause_router = APIRouter(
+    route_class=InstrumentedRoute,
+    prefix="/causes",
+    tags=["causes"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@cause_router.get(
+    "/",
+    summary="Get a list of causes",
+    response_model=Page[CauseResponseSchema],
+)
+async def list_causes(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> AbstractPage:
+    """Fetch summary-level information about a list of causes."""
+    query = cause_service.query_all(options=CAUSE_LOADER_OPTIONS)
+    return await apaginate(db, query, cache_count=True)
+
+
+@cause_router.get(
+    "/cursor",
+    summary="Get a list of causes using cursor pagination",
+    response_model=CursorPage[CauseResponseSchema],
+)
+async def list_causes_by_cursor(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """Fetch causes from newest to oldest, a page at a time."""
+    query = cause_service.query_all(options=CAUSE_LOADER_OPTIONS)
+    return await apaginate_by_keyset(db, query, params)
+
+
+@cause_router.post(
+    "/",
+    summary="Create a cause",
+    response_model=CauseResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def post_cause(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    payload: CauseRequestSchema,
+) -> Cause:
+    """Create a new cause."""
+    return await cause_service.acreate(db=db, data=payload)
+
+
+@cause_router.post(
+    "/import",
+    summary="Create causes in bulk from NDJSON",
+    response_model=ImportReportSchema,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+async def import_causes(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    request: Request,
+) -> ImportReportSchema:
+    """Create a cause from each line of the body, reporting any rows that fail."""
+    bulk_import = BulkImport(cause_service, CauseRequestSchema)
+    return await aimport_stream(db, request.stream(), bulk_import)
+
+
+@cause_router.get(
+    "/leaderboard",
+    summary="Get the causes with the highest balances",
+    response_model=LeaderboardSchema,
+)
+async def get_cause_leaderboard(
+    board: Annotated[Leaderboard, Depends(get_leaderboard)],
+    limit: Annotated[int, Query(ge=1, le=MAX_LEADERBOARD_LIMIT)] = 10,
+    cause_handle: Annotated[
+        str | None,
+        Query(description="Also return the rank of this cause"),
+    ] = None,
+) -> LeaderboardSchema:
+    """Rank the causes by balance from memory, without querying the database."""
+    cause = None
+    if cause_handle is not None:
+        cause = board.rank(cause_handle)
+        if cause is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cause not found",
+            )
+    return LeaderboardSchema(
+        causes=board.top(limit),
+        cause=cause,
+        synced_at=board.synced_at,
+    )
+
+
+@cause_router.get(
+    "/search",
+    summary="Search for causes",
+    response_model=Page[CauseResponseSchema],
+)
+async def search_causes(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    q: Annotated[
+        str,
+        Query(min_length=1, description="Words to search for"),
+    ],
+) -> AbstractPage:
+    """Fetch the causes whose name, handle, description or tags match, best first."""
+    query = cause_service.query_search(
+        q,
+        db.get_bind().dialect.name,
+        options=CAUSE_LOADER_OPTIONS,
+    )
+    return await apaginate(db, query)
+
+
+@cause_router.get(
+    "/{cause_id}",
+    summary="Get cause details",
+    response_model=CauseResponseSchema,
+)
+async def get_cause_by_id(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    cause_id: UUID,
+) -> Cause:
+    """Fetch the details for a specific cause using its id."""
+    cause = await cause_service.aget(
+        db=db,
+        row_id=cause_id,
+        options=CAUSE_LOADER_OPTIONS,
+    )
+    if not cause:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cause not found",
+        )
+    return cause
@@ -0,0 +1,406 @@
+"""Route API requests related to transactions using an AsyncSession."""
+
+from datetime import date, datetime
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from fastapi_pagination.bases import AbstractPage
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from cofundable.dependencies.auth import get_async_current_user
+from cofundable.dependencies.database import (
+    get_async_db,
+    get_async_session_factory,
+)
+from cofundable.errors import (
+    AccountNotFoundError,
+    IdempotencyKeyReusedError,
+    InsufficientBalanceError,
+    SelfTransferError,
+)
+from cofundable.export import ExportFormat, astream_export
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.models.account import Account
+from cofundable.models.base import utc_now
+from cofundable.models.cause import Cause
+from cofundable.models.idempotency_key import MAX_KEY_LENGTH
+from cofundable.models.user import User
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    apaginate,
+    apaginate_by_keyset,
+    cursor_params,
+)
+from cofundable.schemas.rollup import FundingStatsSchema
+from cofundable.schemas.transaction import (
+    MAX_TRANSFERS_PER_REQUEST,
+    BalanceSchema,
+    TransactionExportSchema,
+    TransactionSchema,
+    TransferResponseSchema,
+    TransferSharesBodySchema,
+)
+from cofundable.services.accounts import account_service
+from cofundable.services.causes import cause_service
+from cofundable.services.idempotency_keys import idempotency_key_service
+from cofundable.services.rollups import rollup_service
+from cofundable.services.transactions import transaction_service
+
+EXPORT_FORMAT = "The format to export the transactions in"
+AS_OF = (
+    "Return the balance at this time instead of now, e.g. 2024-05-01T00:00Z"
+)
+STATS_START = "The first day (in UTC) to include, e.g. 2024-05-01"
+STATS_END = "The last day (in UTC) to include, e.g. 2024-05-31"
+
+transaction_router = APIRouter(
+    route_class=InstrumentedRoute,
+    tags=["transactions"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@transaction_router.post(
+    "/user/transactions/transfer",
+    summary="Transfer shares from the current user",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=TransferResponseSchema,
+)
+async def transfer_shares_for_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    data: TransferSharesBodySchema,
+    response: Response,
+    idempotency_key: Annotated[
+        str | None,
+        Header(
+            max_length=MAX_KEY_LENGTH,
+            description="Retries with the same key return the first outcome",
+        ),
+    ] = None,
+) -> TransferResponseSchema:
+    """Transfer shares from the currently authenticated user to another account."""
+    # a retry is answered from the stored outcome, without touching accounts
+    if idempotency_key is not None:
+        try:
+            stored = await idempotency_key_service.aget_response(
+                db,
+                user_id=curr_user.id,
+                key=idempotency_key,
+                data=data,
+            )
+        except IdempotencyKeyReusedError as error:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            ) from error
+        if stored is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return stored
+    to_account = await account_service.aget(db, data.to_account_id)
+    if not to_account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No account found with id: {data.to_account_id.hex}",
+        )
+    # the balance is checked by the UPDATE that debits it, instead of here,
+    # so that concurrent transfers can't both pass the check
+    try:
+        debit, credit = await account_service.atransfer_shares(
+            db=db,
+            amount=data.amount,
+            to_account=to_account,
+            from_account=curr_user.account,
+            defer_commit=idempotency_key is not None,
+        )
+    except InsufficientBalanceError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current user doesn't have enough shares to transfer that amount",
+        ) from error
+    except SelfTransferError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current user can't transfer shares to their own account",
+        ) from error
+    if idempotency_key is None:
+        return TransferResponseSchema(debit_id=debit.id, credit_id=credit.id)
+    # the key is committed with the transfer, if a concurrent retry committed
+    # first, this transfer is rolled back and that one's outcome is returned
+    return await idempotency_key_service.arecord(
+        db,
+        user_id=curr_user.id,
+        key=idempotency_key,
+        data=data,
+        transfer=(debit, credit),
+    )
+
+
+@transaction_router.post(
+    "/user/transactions/transfers",
+    summary="Make several transfers from the current user",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def transfer_shares_in_bulk_for_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    data: Annotated[
+        list[TransferSharesBodySchema],
+        Body(min_length=1, max_length=MAX_TRANSFERS_PER_REQUEST),
+    ],
+) -> None:
+    """Make every transfer from the current user, or none of them."""
+    try:
+        await account_service.atransfer_shares_in_bulk(
+            db=db,
+            transfers=data,
+            from_account=curr_user.account,
+        )
+    except AccountNotFoundError as error:
+        missing = sorted(account_id.hex for account_id in error.account_ids)
+        account_ids = ", ".join(missing)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No account found with id: {account_ids}",
+        ) from error
+    except InsufficientBalanceError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current user doesn't have enough shares to transfer that amount",
+        ) from error
+    except SelfTransferError as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current user can't transfer shares to their own account",
+        ) from error
+
+
+@transaction_router.get(
+    "/user/transactions",
+    summary="List transactions for the current user",
+    status_code=status.HTTP_200_OK,
+    response_model=Page[TransactionSchema],
+)
+async def list_user_transactions(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+) -> AbstractPage:
+    """List the transactions for the current user."""
+    query = transaction_service.query_transactions_by_account(
+        account=curr_user.account,
+    )
+    return await apaginate(db, query)
+
+
+@transaction_router.get(
+    "/user/transactions/cursor",
+    summary="List transactions for the current user using cursor pagination",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[TransactionSchema],
+)
+async def list_user_transactions_by_cursor(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """List the transactions for the current user from newest to oldest."""
+    query = transaction_service.query_transactions_by_account(
+        account=curr_user.account,
+    )
+    return await apaginate_by_keyset(db, query, params)
+
+
+@transaction_router.get(
+    "/causes/{cause_handle}/transactions",
+    summary="List transactions for a given cause",
+    status_code=status.HTTP_200_OK,
+    response_model=Page[TransactionSchema],
+)
+async def list_cause_transactions(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    cause_handle: str,
+) -> AbstractPage:
+    """List the transactions for the current user."""
+    cause = await get_cause_or_404(db, cause_handle)
+    query = transaction_service.query_transactions_by_account(
+        account=cause.account,
+    )
+    return await apaginate(db, query, cache_count=True)
+
+
+@transaction_router.get(
+    "/causes/{cause_handle}/transactions/cursor",
+    summary="List transactions for a given cause using cursor pagination",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[TransactionSchema],
+)
+async def list_cause_transactions_by_cursor(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    cause_handle: str,
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """List the transactions for a cause from newest to oldest."""
+    cause = await get_cause_or_404(db, cause_handle)
+    query = transaction_service.query_transactions_by_account(
+        account=cause.account,
+    )
+    return await apaginate_by_keyset(db, query, params)
+
+
+@transaction_router.get(
+    "/user/transactions/export",
+    summary="Export every transaction for the current user",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def export_user_transactions(
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    session_factory: Annotated[
+        async_sessionmaker,
+        Depends(get_async_session_factory),
+    ],
+    export_format: Annotated[
+        ExportFormat,
+        Query(alias="format", description=EXPORT_FORMAT),
+    ] = ExportFormat.ndjson,
+) -> StreamingResponse:
+    """Stream the current user's transactions as NDJSON or CSV."""
+    query = transaction_service.query_transactions_by_account(
+        account=curr_user.account,
+    )
+    return astream_export(
+        session_factory,
+        query,
+        TransactionExportSchema,
+        export_format,
+        filename="transactions",
+    )
+
+
+@transaction_router.get(
+    "/causes/{cause_handle}/transactions/export",
+    summary="Export every transaction for a given cause",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def export_cause_transactions(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    session_factory: Annotated[
+        async_sessionmaker,
+        Depends(get_async_session_factory),
+    ],
+    cause_handle: str,
+    export_format: Annotated[
+        ExportFormat,
+        Query(alias="format", description=EXPORT_FORMAT),
+    ] = ExportFormat.ndjson,
+) -> StreamingResponse:
+    """Stream a cause's transactions as NDJSON or CSV."""
+    cause = await get_cause_or_404(db, cause_handle)
+    query = transaction_service.query_transactions_by_account(
+        account=cause.account,
+    )
+    return astream_export(
+        session_factory,
+        query,
+        TransactionExportSchema,
+        export_format,
+        filename=f"{cause_handle}-transactions",
+    )
+
+
+@transaction_router.get(
+    "/user/balance",
+    summary="Get the current user's balance at a point in time",
+    status_code=status.HTTP_200_OK,
+    response_model=BalanceSchema,
+)
+async def get_user_balance(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+    as_of: Annotated[datetime | None, Query(description=AS_OF)] = None,
+) -> BalanceSchema:
+    """Return the current user's balance, now or at a given time."""
+    return await get_balance(db, curr_user.account, as_of)
+
+
+@transaction_router.get(
+    "/causes/{cause_handle}/balance",
+    summary="Get a cause's balance at a point in time",
+    status_code=status.HTTP_200_OK,
+    response_model=BalanceSchema,
+)
+async def get_cause_balance(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    cause_handle: str,
+    as_of: Annotated[datetime | None, Query(description=AS_OF)] = None,
+) -> BalanceSchema:
+    """Return a cause's balance, now or at a given time."""
+    cause = await get_cause_or_404(db, cause_handle)
+    return await get_balance(db, cause.account, as_of)
+
+
+@transaction_router.get(
+    "/causes/{cause_handle}/stats",
+    summary="Get the funding a cause received over a range of days",
+    status_code=status.HTTP_200_OK,
+    response_model=FundingStatsSchema,
+)
+async def get_cause_stats(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    cause_handle: str,
+    start: Annotated[date | None, Query(description=STATS_START)] = None,
+    end: Annotated[date | None, Query(description=STATS_END)] = None,
+) -> FundingStatsSchema:
+    """Return a cause's credits and debits in total and for each day."""
+    cause = await get_cause_or_404(db, cause_handle)
+    return await rollup_service.aget_stats(
+        db,
+        cause.account,
+        start=start,
+        end=end,
+    )
+
+
+async def get_balance(
+    db: AsyncSession,
+    account: Account,
+    as_of: datetime | None,
+) -> BalanceSchema:
+    """Return an account's balance at a given time, or its current balance."""
+    if as_of is None:
+        return BalanceSchema(
+            account_id=account.id,
+            balance=account.balance,
+            as_of=utc_now(),
+        )
+    balance = await transaction_service.aget_balance_as_of(db, account, as_of)
+    return BalanceSchema(account_id=account.id, balance=balance, as_of=as_of)
+
+
+async def get_cause_or_404(db: AsyncSession, cause_handle: str) -> Cause:
+    """Find a cause by its handle with its account, or raise a 404 error."""
+    cause = await cause_service.aget_cause_by_handle(
+        db,
+        handle=cause_handle,
+        options=[selectinload(Cause.account)],
+    )
+    if not cause:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cause not found",
+        )
+    return cause
@@ -0,0 +1,62 @@
+"""Route API requests related to users using an AsyncSession."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cofundable.dependencies.auth import get_async_current_user
+from cofundable.dependencies.database import get_async_db
+from cofundable.imports import NDJSON_REQUEST_BODY, BulkImport, aimport_stream
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.models import User
+from cofundable.schemas.imports import ImportReportSchema
+from cofundable.schemas.user import UserRequestSchema, UserResponseSchema
+from cofundable.services.users import user_service
+
+user_router = APIRouter(
+    route_class=InstrumentedRoute,
+    tags=["users"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@user_router.get(
+    "/user/",
+    summary="Get the currently authenticated user",
+    response_model=UserResponseSchema,
+)
+async def get_current_logged_in_user(
+    curr_user: Annotated[User, Depends(get_async_current_user)],
+) -> User:
+    """Fetch the details about the user who is currently logged in."""
+    return curr_user
+
+
+@user_router.post(
+    "/users/",
+    summary="Create a new user",
+    response_model=UserResponseSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    payload: UserRequestSchema,
+) -> User:
+    """Create a new user."""
+    return await user_service.acreate(db, data=payload)
+
+
+@user_router.post(
+    "/users/import",
+    summary="Create users in bulk from NDJSON",
+    response_model=ImportReportSchema,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+async def import_users(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    request: Request,
+) -> ImportReportSchema:
+    """Create a user from each line of the body, reporting any rows that fail."""
+    bulk_import = BulkImport(user_service, UserRequestSchema)
+    return await aimport_stream(db, request.stream(), bulk_import)
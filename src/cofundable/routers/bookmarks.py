@@ -1,19 +1,31 @@
 """Route API requests related to bookmarking causes."""
 
-from typing import Annotated, Sequence
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination.links import Page
+from fastapi_pagination.bases import AbstractPage
 from sqlalchemy.orm import Session
 
 from cofundable.dependencies.auth import get_current_user
 from cofundable.dependencies.database import get_db
+from cofundable.instrumentation import InstrumentedRoute
 from cofundable.models import Bookmark, User
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    cursor_params,
+    paginate,
+    paginate_by_keyset,
+)
 from cofundable.schemas.bookmark import BookmarkResponseSchema
-from cofundable.services.bookmarks import bookmark_service
+from cofundable.services.bookmarks import (
+    BOOKMARK_LOADER_OPTIONS,
+    bookmark_service,
+)
 
 bookmark_router = APIRouter(
+    route_class=InstrumentedRoute,
     tags=["bookmarks"],
     responses={404: {"description": "Not found"}},
 )
@@ -27,10 +39,31 @@ bookmark_router = APIRouter(
 def list_bookmarks_for_current_user(
     db: Annotated[Session, Depends(get_db)],
     curr_user: Annotated[User, Depends(get_current_user)],
-) -> Sequence[Bookmark]:
+) -> AbstractPage:
     """Fetch a paginated list of bookmarks for the currently authenticated user."""
-    query = bookmark_service.get_bookmarks_for_user(curr_user.id)
-    return paginate(conn=db, query=query)
+    query = bookmark_service.get_bookmarks_for_user(
+        curr_user.id,
+        options=BOOKMARK_LOADER_OPTIONS,
+    )
+    return paginate(db, query)
+
+
+@bookmark_router.get(
+    "/user/bookmarks/cursor",
+    summary="List current user's bookmarks using cursor pagination",
+    response_model=CursorPage[BookmarkResponseSchema],
+)
+def list_bookmarks_for_current_user_by_cursor(
+    db: Annotated[Session, Depends(get_db)],
+    curr_user: Annotated[User, Depends(get_current_user)],
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """Fetch the current user's bookmarks from newest to oldest."""
+    query = bookmark_service.get_bookmarks_for_user(
+        curr_user.id,
+        options=BOOKMARK_LOADER_OPTIONS,
+    )
+    return paginate_by_keyset(db, query, params)
 
 
 @bookmark_router.put(
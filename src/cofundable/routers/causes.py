@@ -1,17 +1,38 @@
 """Route API requests related to Cofundable causes."""
 
-from typing import Annotated, Sequence
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination.links import Page
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi_pagination.bases import AbstractPage
 
 from cofundable.dependencies.database import Session, get_db
+from cofundable.dependencies.leaderboard import get_leaderboard
+from cofundable.imports import NDJSON_REQUEST_BODY, BulkImport, import_stream
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.leaderboard import Leaderboard
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    cursor_params,
+    paginate,
+    paginate_by_keyset,
+)
 from cofundable.schemas.cause import CauseRequestSchema, CauseResponseSchema
-from cofundable.services.causes import Cause, cause_service
+from cofundable.schemas.imports import ImportReportSchema
+from cofundable.schemas.leaderboard import LeaderboardSchema
+from cofundable.services.causes import (
+    CAUSE_LOADER_OPTIONS,
+    Cause,
+    cause_service,
+)
+
+# the most causes returned by the leaderboard at once
+MAX_LEADERBOARD_LIMIT = 100
 
 cause_router = APIRouter(
+    route_class=InstrumentedRoute,
     prefix="/causes",
     tags=["causes"],
     responses={404: {"description": "Not found"}},
@@ -23,9 +44,24 @@ cause_router = APIRouter(
     summary="Get a list of causes",
     response_model=Page[CauseResponseSchema],
 )
-def list_causes(db: Annotated[Session, Depends(get_db)]) -> Sequence[Cause]:
+def list_causes(db: Annotated[Session, Depends(get_db)]) -> AbstractPage:
     """Fetch summary-level information about a list of causes."""
-    return paginate(conn=db, query=cause_service.query_all())
+    query = cause_service.query_all(options=CAUSE_LOADER_OPTIONS)
+    return paginate(db, query, cache_count=True)
+
+
+@cause_router.get(
+    "/cursor",
+    summary="Get a list of causes using cursor pagination",
+    response_model=CursorPage[CauseResponseSchema],
+)
+def list_causes_by_cursor(
+    db: Annotated[Session, Depends(get_db)],
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """Fetch causes from newest to oldest, a page at a time."""
+    query = cause_service.query_all(options=CAUSE_LOADER_OPTIONS)
+    return paginate_by_keyset(db, query, params)
 
 
 @cause_router.post(
@@ -42,6 +78,71 @@ def post_cause(
     return cause_service.create(db=db, data=payload)
 
 
+@cause_router.post(
+    "/import",
+    summary="Create causes in bulk from NDJSON",
+    response_model=ImportReportSchema,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+async def import_causes(
+    db: Annotated[Session, Depends(get_db)],
+    request: Request,
+) -> ImportReportSchema:
+    """Create a cause from each line of the body, reporting any rows that fail."""
+    bulk_import = BulkImport(cause_service, CauseRequestSchema)
+    return await import_stream(db, request.stream(), bulk_import)
+
+
+@cause_router.get(
+    "/leaderboard",
+    summary="Get the causes with the highest balances",
+    response_model=LeaderboardSchema,
+)
+async def get_cause_leaderboard(
+    board: Annotated[Leaderboard, Depends(get_leaderboard)],
+    limit: Annotated[int, Query(ge=1, le=MAX_LEADERBOARD_LIMIT)] = 10,
+    cause_handle: Annotated[
+        str | None,
+        Query(description="Also return the rank of this cause"),
+    ] = None,
+) -> LeaderboardSchema:
+    """Rank the causes by balance from memory, without querying the database."""
+    cause = None
+    if cause_handle is not None:
+        cause = board.rank(cause_handle)
+        if cause is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cause not found",
+            )
+    return LeaderboardSchema(
+        causes=board.top(limit),
+        cause=cause,
+        synced_at=board.synced_at,
+    )
+
+
+@cause_router.get(
+    "/search",
+    summary="Search for causes",
+    response_model=Page[CauseResponseSchema],
+)
+def search_causes(
+    db: Annotated[Session, Depends(get_db)],
+    q: Annotated[
+        str,
+        Query(min_length=1, description="Words to search for"),
+    ],
+) -> AbstractPage:
+    """Fetch the causes whose name, handle, description or tags match, best first."""
+    query = cause_service.query_search(
+        q,
+        db.get_bind().dialect.name,
+        options=CAUSE_LOADER_OPTIONS,
+    )
+    return paginate(db, query)
+
+
 @cause_router.get(
     "/{cause_id}",
     summary="Get cause details",
@@ -52,7 +153,11 @@ def get_cause_by_id(
     cause_id: UUID,
 ) -> Cause:
     """Fetch the details for a specific cause using its id."""
-    cause = cause_service.get(db=db, row_id=cause_id)
+    cause = cause_service.get(
+        db=db,
+        row_id=cause_id,
+        options=CAUSE_LOADER_OPTIONS,
+    )
     if not cause:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
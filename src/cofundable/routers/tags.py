@@ -0,0 +1,68 @@
+"""Route API requests related to Cofundable tags."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi_pagination.bases import AbstractPage
+
+from cofundable.dependencies.database import Session, get_db
+from cofundable.instrumentation import InstrumentedRoute
+from cofundable.models.associations import cause_tag_table
+from cofundable.pagination import (
+    CursorPage,
+    CursorParams,
+    Page,
+    cursor_params,
+    paginate,
+    paginate_by_id,
+)
+from cofundable.schemas.cause import CauseResponseSchema
+from cofundable.schemas.tag import TagResponseSchema
+from cofundable.services.causes import CAUSE_LOADER_OPTIONS, cause_service
+from cofundable.services.tags import tag_service
+
+tag_router = APIRouter(
+    route_class=InstrumentedRoute,
+    prefix="/tags",
+    tags=["tags"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@tag_router.get(
+    "/",
+    summary="Get a list of tags with their cause counts",
+    response_model=Page[TagResponseSchema],
+)
+def list_tags(
+    db: Annotated[Session, Depends(get_db)],
+) -> AbstractPage:
+    """Fetch every tag and the number of causes with it, in order of name."""
+    query = tag_service.query_all_with_counts()
+    return paginate(db, query, cache_count=True)
+
+
+@tag_router.get(
+    "/{tag_name}/causes",
+    summary="Get the causes with a tag using cursor pagination",
+    response_model=CursorPage[CauseResponseSchema],
+)
+def list_causes_by_tag(
+    db: Annotated[Session, Depends(get_db)],
+    tag_name: str,
+    params: Annotated[CursorParams, Depends(cursor_params)],
+) -> dict:
+    """Fetch the causes with a tag from newest to oldest, a page at a time."""
+    tag = tag_service.get_tag_by_name(db, tag_name)
+    if tag is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tag not found",
+        )
+    query = cause_service.query_by_tag(tag, options=CAUSE_LOADER_OPTIONS)
+    return paginate_by_id(
+        db,
+        query,
+        params,
+        cause_tag_table.c.cause_id,
+    )
@@ -2,16 +2,20 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.orm import Session
 
 from cofundable.dependencies.auth import get_current_user
 from cofundable.dependencies.database import get_db
+from cofundable.imports import NDJSON_REQUEST_BODY, BulkImport, import_stream
+from cofundable.instrumentation import InstrumentedRoute
 from cofundable.models import User
+from cofundable.schemas.imports import ImportReportSchema
 from cofundable.schemas.user import UserRequestSchema, UserResponseSchema
 from cofundable.services.users import user_service
 
 user_router = APIRouter(
+    route_class=InstrumentedRoute,
     tags=["users"],
     responses={404: {"description": "Not found"}},
 )
@@ -41,3 +45,18 @@ def create_user(
 ) -> User:
     """Create a new user."""
     return user_service.create(db, data=payload)
+
+
+@user_router.post(
+    "/users/import",
+    summary="Create users in bulk from NDJSON",
+    response_model=ImportReportSchema,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+async def import_users(
+    db: Annotated[Session, Depends(get_db)],
+    request: Request,
+) -> ImportReportSchema:
+    """Create a user from each line of the body, reporting any rows that fail."""
+    bulk_import = BulkImport(user_service, UserRequestSchema)
+    return await import_stream(db, request.stream(), bulk_import)
@@ -2,9 +2,11 @@
 
 from pydantic import BaseModel
 
+from cofundable.schemas.base import MinorUnits
+
 
 class AccountSchema(BaseModel):
     """Base schema for an account, with common fields."""
 
     name: str
-    balance: int | float
+    balance: MinorUnits
@@ -1,9 +1,17 @@
 """Create a base schema that other schemas can inherit from."""
 
 from datetime import datetime
+from decimal import Decimal
+from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, GetPydanticSchema, PlainSerializer
+from pydantic_core import core_schema
+
+# amounts and balances are stored as integer minor units (hundredths of a
+# share) so the database sums them exactly, the schemas convert them to and
+# from shares at the edges of the API
+MINOR_UNITS_PER_SHARE = 100
 
 BASE_EXAMPLE = {
     "id": "ad83342a-e81d-46d0-9009-36e89dc72d1c",
@@ -20,3 +28,50 @@ class UUIDAuditResponseBase(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+def to_minor_units(shares: Decimal) -> int:
+    """
+    Convert a number of shares to integer minor units.
+
+    Raises
+    ------
+    ValueError
+        If the number of shares is more precise than one minor unit
+
+    """
+    minor_units = shares * MINOR_UNITS_PER_SHARE
+    if minor_units != minor_units.to_integral_value():
+        msg = f"Shares can't be more precise than {1 / MINOR_UNITS_PER_SHARE}"
+        raise ValueError(msg)
+    return int(minor_units)
+
+
+def to_shares(minor_units: int) -> Decimal:
+    """Convert integer minor units to a number of shares."""
+    return Decimal(minor_units) / MINOR_UNITS_PER_SHARE
+
+
+_dump_as_shares = PlainSerializer(
+    lambda minor_units: minor_units / MINOR_UNITS_PER_SHARE,
+    return_type=float,
+    when_used="json",
+)
+
+MinorUnits = Annotated[int, _dump_as_shares]
+"""An amount in minor units, e.g. from the database, dumped to JSON as shares."""
+
+Shares = Annotated[
+    int,
+    GetPydanticSchema(
+        lambda source, handler: core_schema.chain_schema(
+            [
+                core_schema.decimal_schema(),
+                core_schema.no_info_plain_validator_function(to_minor_units),
+                handler(source),
+            ],
+        ),
+    ),
+    _dump_as_shares,
+]
+"""An amount parsed from a number of shares, e.g. in a request, as minor units."""
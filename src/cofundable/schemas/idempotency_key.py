@@ -0,0 +1,17 @@
+"""Declare the schemas for the idempotency keys sent with transfer requests."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class IdempotencyKeyCreateSchema(BaseModel):
+    """Schema used by the IdempotencyKeyService class to record a key."""
+
+    key: str
+    user_id: UUID
+    request_hash: str
+    debit_id: UUID
+    credit_id: UUID
+    expires_at: datetime
@@ -0,0 +1,21 @@
+"""Declare the schemas for reports on bulk imports of users and causes."""
+
+from pydantic import BaseModel, Field
+
+
+class ImportErrorSchema(BaseModel):
+    """Schema used to report a row that couldn't be imported."""
+
+    line: int
+    error: str
+
+
+class ImportReportSchema(BaseModel):
+    """Schema used to report how many rows were imported or failed."""
+
+    created: int = 0
+    failed: int = 0
+    errors: list[ImportErrorSchema] = Field(
+        default=[],
+        description="The first errors found, up to a limit, see failed",
+    )
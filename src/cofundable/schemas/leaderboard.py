@@ -0,0 +1,29 @@
+"""Declare schemas for the leaderboard of causes ranked by balance."""
+
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from cofundable.schemas.base import MinorUnits
+
+
+class LeaderboardEntrySchema(BaseModel):
+    """A cause's position on the leaderboard."""
+
+    rank: int
+    cause_id: UUID
+    handle: str
+    name: str
+    balance: MinorUnits
+
+
+class LeaderboardSchema(BaseModel):
+    """Schema used to serialize the top causes and the rank of a given cause."""
+
+    causes: list[LeaderboardEntrySchema]
+    # the position of the cause that was asked for, if any
+    cause: LeaderboardEntrySchema | None = None
+    # when the leaderboard was last loaded from the database, it's updated by
+    # committed transfers in between
+    synced_at: datetime | None
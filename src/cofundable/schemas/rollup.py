@@ -0,0 +1,42 @@
+"""Declare schemas for the daily rollups of each account's transactions."""
+
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+from cofundable.schemas.base import MinorUnits
+
+
+class FundingTotalsSchema(BaseModel):
+    """The sum and number of an account's credits and debits."""
+
+    credit_total: MinorUnits = 0
+    credit_count: int = 0
+    debit_total: MinorUnits = 0
+    debit_count: int = 0
+
+
+class DailyRollupSchema(FundingTotalsSchema):
+    """The credits and debits of an account on one day (in UTC)."""
+
+    day: date
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DailyRollupCreateSchema(DailyRollupSchema):
+    """Schema used by the RollupService class to create a rollup."""
+
+    account_id: UUID
+
+
+class FundingStatsSchema(BaseModel):
+    """Schema used to serialize the funding of an account over a range of days."""
+
+    account_id: UUID
+    start: date | None
+    end: date | None
+    totals: FundingTotalsSchema
+    # the days in the range with at least one transaction, oldest first
+    days: list[DailyRollupSchema]
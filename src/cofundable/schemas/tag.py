@@ -1,6 +1,6 @@
 """Declare the schemas for tags in Cofundable."""
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class TagSchema(BaseModel):
@@ -8,3 +8,11 @@ class TagSchema(BaseModel):
 
     name: str
     description: str | None = None
+
+
+class TagResponseSchema(TagSchema):
+    """Response schema for a tag that includes the number of causes with it."""
+
+    cause_count: int
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,19 +1,23 @@
 """Declare schemas for transactions between accounts."""
 
-from decimal import Decimal
+from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 from cofundable.models.transaction import EntryType
 from cofundable.schemas.account import AccountSchema
+from cofundable.schemas.base import MinorUnits, Shares
+
+MAX_TRANSFERS_PER_REQUEST = 100
 
 
 class TransactionSchema(BaseModel):
     """Base schema for a transaction, with common fields."""
 
-    amount: float | Decimal
+    amount: MinorUnits
     kind: EntryType
+    balance_after: MinorUnits
     note: str | None = None
 
 
@@ -30,8 +34,35 @@ class TransactionDumpSchema(TransactionSchema):
     match_entry_id: UUID
 
 
+class TransactionExportSchema(TransactionSchema):
+    """Schema used to serialize each transaction in an export."""
+
+    id: UUID
+    created_at: datetime
+    match_entry_id: UUID | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class TransferSharesBodySchema(BaseModel):
     """Schema used to deserialize the body of POST user/transactions/transfer."""
 
     to_account_id: UUID
-    amount: Decimal
+    amount: Shares = Field(gt=0)
+
+
+class TransferResponseSchema(BaseModel):
+    """Schema used to serialize the transactions created by a transfer."""
+
+    debit_id: UUID
+    credit_id: UUID
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BalanceSchema(BaseModel):
+    """Schema used to serialize an account's balance at a point in time."""
+
+    account_id: UUID
+    balance: MinorUnits
+    as_of: datetime
@@ -1,28 +1,556 @@
 """Handle business logic for accounts that store share balances in Cofundable."""
 
-from decimal import Decimal
+from collections import defaultdict
+from typing import Sequence
+from uuid import UUID
 
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from cofundable.errors import (
+    AccountNotFoundError,
+    InsufficientBalanceError,
+    SelfTransferError,
+)
 from cofundable.models.account import Account
 from cofundable.models.transaction import Transaction
 from cofundable.schemas.account import AccountSchema
-from cofundable.schemas.transaction import EntryType
+from cofundable.schemas.transaction import (
+    EntryType,
+    TransactionCreateSchema,
+    TransferSharesBodySchema,
+)
 from cofundable.services.base import CRUDBase
+from cofundable.services.rollups import rollup_service
 from cofundable.services.transactions import transaction_service
 
+# the key in Session.info of the balances changed in the current transaction,
+# by account id, which hooks can read once the transaction is committed (see
+# leaderboard.py)
+CHANGED_BALANCES = "changed_balances"
+
 
 class AccountCRUD(CRUDBase[Account, AccountSchema, AccountSchema]):
     """Manage CRUD operations for the Cause model."""
 
-    def transfer_shares(
+    # pylint: disable-next=too-many-arguments
+    def transfer_shares(  # noqa: PLR0913
         self,
         db: Session,
-        amount: float | Decimal,
+        amount: int,
+        from_account: Account,
+        to_account: Account,
+        *,
+        defer_commit: bool = False,
+    ) -> tuple[Transaction, Transaction]:
+        """
+        Transfer shares from one account to another and record the transactions.
+
+        Each balance is changed by one UPDATE ... RETURNING statement that does
+        the arithmetic in the database, and the debit only matches a row if its
+        balance >= amount. That way concurrent transfers can't overdraw the
+        account or overwrite each other's changes, without serializing them in
+        the app. The accounts are updated in order of their ids so that
+        transfers in opposite directions can't deadlock each other. The daily
+        rollups of both accounts are updated in the same transaction, see
+        RollupService.record_transactions().
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        amount: int
+            The amount to transfer in minor units (hundredths of a share)
+        from_account: Account
+            The account that is debited
+        to_account: Account
+            The account that is credited
+        defer_commit: bool, optional
+            Optionally defer committing the transfer, so that other changes
+            can be committed (or rolled back) in the same transaction
+
+        Returns
+        -------
+        tuple[Transaction, Transaction]
+            The matching debit and credit transactions
+
+        Raises
+        ------
+        InsufficientBalanceError
+            If from_account doesn't have enough shares, in which case nothing
+            is changed and the session is rolled back
+        SelfTransferError
+            If from_account and to_account are the same account, in which case
+            nothing is changed
+
+        """
+        self._check_not_self_transfer(from_account, [to_account.id])
+        for account, stmt in self._balance_updates(
+            amount,
+            from_account,
+            to_account,
+        ):
+            balance = db.scalar(stmt)
+            if balance is None:
+                error = InsufficientBalanceError(from_account.id, amount)
+                db.rollback()
+                raise error
+            self._set_balance(db, account, balance)
+        debit, credit = self._record_transfer(
+            db,
+            amount=amount,
+            from_account=from_account,
+            to_account=to_account,
+        )
+        rollup_service.record_transactions(db, [debit, credit])
+        if not defer_commit:
+            db.commit()
+        return (debit, credit)
+
+    # pylint: disable-next=too-many-arguments
+    async def atransfer_shares(  # noqa: PLR0913
+        self,
+        db: AsyncSession,
+        amount: int,
         from_account: Account,
         to_account: Account,
+        *,
+        defer_commit: bool = False,
     ) -> tuple[Transaction, Transaction]:
-        """Record matching transactions that transfer shares from account to another."""
+        """Transfer shares, see transfer_shares() for details."""
+        self._check_not_self_transfer(from_account, [to_account.id])
+        for account, stmt in self._balance_updates(
+            amount,
+            from_account,
+            to_account,
+        ):
+            balance = await db.scalar(stmt)
+            if balance is None:
+                error = InsufficientBalanceError(from_account.id, amount)
+                await db.rollback()
+                raise error
+            self._set_balance(db, account, balance)
+        debit, credit = self._record_transfer(
+            db,
+            amount=amount,
+            from_account=from_account,
+            to_account=to_account,
+        )
+        await rollup_service.arecord_transactions(db, [debit, credit])
+        if not defer_commit:
+            await db.commit()
+        return (debit, credit)
+
+    def transfer_shares_in_bulk(
+        self,
+        db: Session,
+        *,
+        from_account: Account,
+        transfers: Sequence[TransferSharesBodySchema],
+    ) -> list[tuple[Transaction, Transaction]]:
+        """
+        Make many transfers from one account in a single database transaction.
+
+        The sender and the recipients are found and locked in order of their
+        ids by one SELECT ... WHERE id IN ... ORDER BY id FOR UPDATE query, so
+        that concurrent transfers between the same accounts can't deadlock
+        each other, like in transfer_shares(). Then the total is debited by
+        one guarded UPDATE, every recipient is credited by one UPDATE and the
+        transactions are inserted in bulk, so the number of statements doesn't
+        grow with the number of transfers. Either every transfer is committed
+        or none of them are.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        from_account: Account
+            The account that is debited for every transfer
+        transfers: Sequence[TransferSharesBodySchema]
+            The account to credit and the amount to transfer to it, for each
+            transfer
+
+        Returns
+        -------
+        list[tuple[Transaction, Transaction]]
+            The matching debit and credit transactions for each transfer
+
+        Raises
+        ------
+        AccountNotFoundError
+            If any of the accounts to credit don't exist
+        InsufficientBalanceError
+            If from_account doesn't have enough shares for all of the transfers,
+            in which case the session is rolled back
+        SelfTransferError
+            If from_account is one of the accounts to credit, in which case
+            nothing is changed
+
+        """
+        self._check_not_self_transfer(
+            from_account,
+            [transfer.to_account_id for transfer in transfers],
+        )
+        to_accounts = {
+            account.id: account
+            for account in db.scalars(
+                self._lock_accounts_query(from_account, transfers),
+            )
+            if account.id != from_account.id
+        }
+        self._check_recipients_exist(transfers, to_accounts)
+        debit_stmt, credit_stmt = self._bulk_balance_updates(
+            from_account,
+            transfers,
+        )
+        balance = db.scalar(debit_stmt)
+        if balance is None:
+            error = InsufficientBalanceError(
+                from_account.id,
+                self._total(transfers),
+            )
+            db.rollback()
+            raise error
+        self._set_balance(db, from_account, balance)
+        for account_id, new_balance in db.execute(credit_stmt).tuples():
+            self._set_balance(db, to_accounts[account_id], new_balance)
+        credit_entries = transaction_service.insert_many(
+            db,
+            self._credit_rows(transfers, to_accounts),
+        )
+        debits = transaction_service.insert_many(
+            db,
+            self._debit_rows(from_account, transfers, credit_entries),
+        )
+        db.execute(
+            sa.update(Transaction),
+            self._match_credits(debits, credit_entries),
+        )
+        rollup_service.record_transactions(db, [*debits, *credit_entries])
+        db.commit()
+        return list(zip(debits, credit_entries, strict=True))
+
+    async def atransfer_shares_in_bulk(
+        self,
+        db: AsyncSession,
+        *,
+        from_account: Account,
+        transfers: Sequence[TransferSharesBodySchema],
+    ) -> list[tuple[Transaction, Transaction]]:
+        """Make many transfers, see transfer_shares_in_bulk() for details."""
+        self._check_not_self_transfer(
+            from_account,
+            [transfer.to_account_id for transfer in transfers],
+        )
+        to_accounts = {
+            account.id: account
+            for account in await db.scalars(
+                self._lock_accounts_query(from_account, transfers),
+            )
+            if account.id != from_account.id
+        }
+        self._check_recipients_exist(transfers, to_accounts)
+        debit_stmt, credit_stmt = self._bulk_balance_updates(
+            from_account,
+            transfers,
+        )
+        balance = await db.scalar(debit_stmt)
+        if balance is None:
+            error = InsufficientBalanceError(
+                from_account.id,
+                self._total(transfers),
+            )
+            await db.rollback()
+            raise error
+        self._set_balance(db, from_account, balance)
+        for account_id, new_balance in (
+            await db.execute(credit_stmt)
+        ).tuples():
+            self._set_balance(db, to_accounts[account_id], new_balance)
+        credit_entries = await transaction_service.ainsert_many(
+            db,
+            self._credit_rows(transfers, to_accounts),
+        )
+        debits = await transaction_service.ainsert_many(
+            db,
+            self._debit_rows(from_account, transfers, credit_entries),
+        )
+        await db.execute(
+            sa.update(Transaction),
+            self._match_credits(debits, credit_entries),
+        )
+        await rollup_service.arecord_transactions(
+            db,
+            [*debits, *credit_entries],
+        )
+        await db.commit()
+        return list(zip(debits, credit_entries, strict=True))
+
+    def query_balance_drift(self) -> sa.Select:
+        """
+        Return a query for the accounts whose balance doesn't match the ledger.
+
+        The net change of every account (its credits minus its debits) is
+        summed by one GROUP BY over the transaction table, so the database
+        reads each transaction once and only the accounts that have drifted
+        are returned, instead of loading the whole ledger into Python.
+
+        Returns
+        -------
+        Select
+            A query for the account_id, balance, net_change and drift (the
+            balance minus the net change) of each account, ordered by id
+
+        """
+        signed_amount = sa.case(
+            (Transaction.kind == EntryType.credit, Transaction.amount),
+            else_=-Transaction.amount,
+        )
+        net = (
+            sa.select(
+                Transaction.account_id,
+                sa.func.sum(signed_amount).label("net_change"),
+            )
+            .group_by(Transaction.account_id)
+            .subquery()
+        )
+        net_change = sa.func.coalesce(net.c.net_change, 0)
+        drift = Account.balance - net_change
+        return (
+            sa.select(
+                Account.id.label("account_id"),
+                Account.balance,
+                net_change.label("net_change"),
+                drift.label("drift"),
+            )
+            .outerjoin(net, net.c.account_id == Account.id)
+            # amounts are integers, so any difference at all is drift
+            .where(drift != 0)
+            .order_by(Account.id)
+        )
+
+    def _total(self, transfers: Sequence[TransferSharesBodySchema]) -> int:
+        """Return the total amount transferred, in minor units."""
+        return sum(transfer.amount for transfer in transfers)
+
+    def _lock_accounts_query(
+        self,
+        from_account: Account,
+        transfers: Sequence[TransferSharesBodySchema],
+    ) -> sa.Select:
+        """Return a query that locks every account changed, in order of id."""
+        account_ids = {transfer.to_account_id for transfer in transfers}
+        account_ids.add(from_account.id)
+        return (
+            sa.select(Account)
+            .where(Account.id.in_(account_ids))
+            .order_by(Account.id)
+            .with_for_update()
+        )
+
+    def _check_not_self_transfer(
+        self,
+        from_account: Account,
+        to_account_ids: Sequence[UUID],
+    ) -> None:
+        """Raise a SelfTransferError if the sender is one of the recipients."""
+        # the balance after recorded for the debit wouldn't include the credit
+        if from_account.id in to_account_ids:
+            raise SelfTransferError(from_account.id)
+
+    def _check_recipients_exist(
+        self,
+        transfers: Sequence[TransferSharesBodySchema],
+        to_accounts: dict[UUID, Account],
+    ) -> None:
+        """Raise an AccountNotFoundError if any of the recipients are missing."""
+        missing = {transfer.to_account_id for transfer in transfers}
+        missing -= to_accounts.keys()
+        if missing:
+            raise AccountNotFoundError(account_ids=missing)
+
+    def _bulk_balance_updates(
+        self,
+        from_account: Account,
+        transfers: Sequence[TransferSharesBodySchema],
+    ) -> tuple[sa.Update, sa.Update]:
+        """Return the UPDATEs that debit the total and credit each recipient."""
+        total = self._total(transfers)
+        amounts: dict[UUID, int] = defaultdict(int)
+        for transfer in transfers:
+            amounts[transfer.to_account_id] += transfer.amount
+        debit = (
+            sa.update(Account)
+            .where(Account.id == from_account.id, Account.balance >= total)
+            .values(balance=Account.balance - total)
+            .returning(Account.balance)
+        )
+        credit = (
+            sa.update(Account)
+            .where(Account.id.in_(amounts))
+            .values(
+                balance=Account.balance + sa.case(amounts, value=Account.id),
+            )
+            .returning(Account.id, Account.balance)
+        )
+        return (
+            debit.execution_options(synchronize_session=False),
+            credit.execution_options(synchronize_session=False),
+        )
+
+    def _credit_rows(
+        self,
+        transfers: Sequence[TransferSharesBodySchema],
+        to_accounts: dict[UUID, Account],
+    ) -> list[dict]:
+        """Create the rows for the credit transaction of each transfer."""
+        balances_after = self._balances_after(
+            {
+                account_id: account.balance
+                for account_id, account in to_accounts.items()
+            },
+            [
+                (transfer.to_account_id, transfer.amount)
+                for transfer in transfers
+            ],
+        )
+        return transaction_service.build_rows(
+            [
+                TransactionCreateSchema(
+                    amount=transfer.amount,
+                    kind=EntryType.credit,
+                    account_id=transfer.to_account_id,
+                    balance_after=balance_after,
+                )
+                for transfer, balance_after in zip(
+                    transfers,
+                    balances_after,
+                    strict=True,
+                )
+            ],
+        )
+
+    def _debit_rows(
+        self,
+        from_account: Account,
+        transfers: Sequence[TransferSharesBodySchema],
+        credit_entries: Sequence[Transaction],
+    ) -> list[dict]:
+        """
+        Create the rows for the debit transaction of each transfer.
+
+        The credits are inserted first, so each debit is inserted with the id
+        of its matching credit.
+        """
+        balances_after = self._balances_after(
+            {from_account.id: from_account.balance},
+            [(from_account.id, -transfer.amount) for transfer in transfers],
+        )
+        rows = transaction_service.build_rows(
+            [
+                TransactionCreateSchema(
+                    amount=transfer.amount,
+                    kind=EntryType.debit,
+                    account_id=from_account.id,
+                    balance_after=balance_after,
+                )
+                for transfer, balance_after in zip(
+                    transfers,
+                    balances_after,
+                    strict=True,
+                )
+            ],
+        )
+        for row, credit in zip(rows, credit_entries, strict=True):
+            row["match_entry_id"] = credit.id
+        return rows
+
+    def _balances_after(
+        self,
+        final_balances: dict[UUID, int],
+        changes: Sequence[tuple[UUID, int]],
+    ) -> list[int]:
+        """
+        Return the balance of the account after each change, in order.
+
+        The UPDATEs only return each account's balance after all of the changes,
+        so the balance after each one is found by undoing the later changes.
+        """
+        balances = dict(final_balances)
+        balances_after = []
+        for account_id, change in reversed(changes):
+            balances_after.append(balances[account_id])
+            balances[account_id] -= change
+        return balances_after[::-1]
+
+    def _match_credits(
+        self,
+        debits: Sequence[Transaction],
+        credit_entries: Sequence[Transaction],
+    ) -> list[dict]:
+        """
+        Match each credit to its debit, returning the rows to update.
+
+        The matching entries are also set on the records themselves, so that
+        they don't need to be loaded again.
+        """
+        rows = []
+        for debit, credit in zip(debits, credit_entries, strict=True):
+            rows.append({"id": credit.id, "match_entry_id": debit.id})
+            set_committed_value(credit, "match_entry_id", debit.id)
+            set_committed_value(credit, "match_entry", debit)
+            set_committed_value(debit, "match_entry", credit)
+        return rows
+
+    def _set_balance(
+        self,
+        db: Session | AsyncSession,
+        account: Account,
+        balance: int,
+    ) -> None:
+        """Set a balance returned by an UPDATE and note that it was changed."""
+        # set the new balance without marking it as a change to flush
+        set_committed_value(account, "balance", balance)
+        db.info.setdefault(CHANGED_BALANCES, {})[account.id] = balance
+
+    def _balance_updates(
+        self,
+        amount: int,
+        from_account: Account,
+        to_account: Account,
+    ) -> list[tuple[Account, sa.Update]]:
+        """Return the UPDATE statement for each account, in order of id."""
+        debit = sa.update(Account).where(
+            Account.id == from_account.id,
+            Account.balance >= amount,
+        )
+        credit = sa.update(Account).where(Account.id == to_account.id)
+        updates = [
+            (from_account, debit.values(balance=Account.balance - amount)),
+            (to_account, credit.values(balance=Account.balance + amount)),
+        ]
+        return [
+            (
+                account,
+                stmt.returning(Account.balance).execution_options(
+                    # the balances are set on the accounts from RETURNING
+                    synchronize_session=False,
+                ),
+            )
+            for account, stmt in sorted(updates, key=lambda item: item[0].id)
+        ]
+
+    def _record_transfer(
+        self,
+        db: Session | AsyncSession,
+        *,
+        amount: int,
+        from_account: Account,
+        to_account: Account,
+    ) -> tuple[Transaction, Transaction]:
+        """Add matching debit and credit transactions to the session."""
         # create a matching credit and debit transactions
         debit = transaction_service.record_transaction(
             db=db,
@@ -38,9 +566,6 @@ class AccountCRUD(CRUDBase[Account, AccountSchema, AccountSchema]):
         )
         debit.match_entry = credit
         credit.match_entry = debit
-        # commit the transactions
-        db.add_all([credit, debit])
-        db.commit()
         return (debit, credit)
 
 
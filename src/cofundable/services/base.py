@@ -1,18 +1,30 @@
 """Create a CRUDBase class that other services can inherit from."""
 
-from typing import Generic, Sequence, Type, TypeVar
-from uuid import UUID, uuid4
+from typing import Callable, Generic, Sequence, Type, TypeVar
+from uuid import UUID
 
 import sqlalchemy as sa
 from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ORMOption
 
+from cofundable import config
 from cofundable.models.base import UUIDAuditBase
 
 ModelTypeT = TypeVar("ModelTypeT", bound=UUIDAuditBase)
 CreateSchemaTypeT = TypeVar("CreateSchemaTypeT", bound=BaseModel)
 UpdateSchemaTypeT = TypeVar("UpdateSchemaTypeT", bound=BaseModel)
 
+UpsertInsert = postgresql.Insert | sqlite.Insert
+
+# the dialects whose INSERT statements support ON CONFLICT
+UPSERT_DIALECTS: dict[str, Callable[..., UpsertInsert]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
     """Base class that supports Create and Read methods but not Update or Delete."""
@@ -21,7 +33,12 @@ class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
         """Init the InsertOnlyBase class with a given SQLAlchemy model."""
         self.model = model
 
-    def get(self, db: Session, row_id: UUID) -> ModelTypeT | None:
+    def get(
+        self,
+        db: Session,
+        row_id: UUID,
+        options: Sequence[ORMOption] = (),
+    ) -> ModelTypeT | None:
         """
         Use the primary key to return a single record from the table.
 
@@ -31,6 +48,9 @@ class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
             Instance of SQLAlchemy session that manages database transactions
         row_id: UUID
             The value of the primary key used to retrieve the record
+        options: Sequence[ORMOption], optional
+            Loader options (e.g. selectinload) for relationships that will be
+            accessed after the record is returned, to avoid lazy loading them
 
         Returns
         -------
@@ -39,7 +59,30 @@ class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
             is found for the primary key value passed, or None otherwise
 
         """
-        return db.get(self.model, row_id)
+        return db.get(self.model, row_id, options=options)
+
+    async def aget(
+        self,
+        db: AsyncSession,
+        row_id: UUID,
+        options: Sequence[ORMOption] = (),
+    ) -> ModelTypeT | None:
+        """
+        Use the primary key to return a single record from the table.
+
+        Parameters
+        ----------
+        db: AsyncSession
+            Instance of SQLAlchemy AsyncSession that manages database transactions
+        row_id: UUID
+            The value of the primary key used to retrieve the record
+        options: Sequence[ORMOption], optional
+            Loader options (e.g. selectinload) for relationships that will be
+            accessed after the record is returned, since an AsyncSession can't
+            lazy load them
+
+        """
+        return await db.get(self.model, row_id, options=options)
 
     def get_all(
         self,
@@ -67,9 +110,29 @@ class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
             query = self.query_all()
         return db.execute(query).scalars().all()
 
-    def query_all(self) -> sa.Select:
-        """Return a query of all records that can be paginated."""
-        return sa.select(self.model)
+    async def aget_all(
+        self,
+        db: AsyncSession,
+        query: sa.Select | None = None,
+    ) -> Sequence[ModelTypeT]:
+        """Return all rows in the table, or from the query if one is provided."""
+        if query is None:
+            query = self.query_all()
+        return (await db.execute(query)).scalars().all()
+
+    def query_all(self, options: Sequence[ORMOption] = ()) -> sa.Select:
+        """
+        Return a query of all records that can be paginated.
+
+        Parameters
+        ----------
+        options: Sequence[ORMOption], optional
+            Loader options for the relationships included in the response, so
+            that they're loaded for the whole page with a constant number of
+            queries instead of being lazy loaded one row at a time
+
+        """
+        return sa.select(self.model).options(*options)
 
     def create(
         self,
@@ -94,22 +157,248 @@ class InsertOnlyBase(Generic[ModelTypeT, CreateSchemaTypeT]):
             all creations if one fails.
 
         """
-        record = self.model(id=uuid4(), **data.model_dump())
+        record = self.build(data)
         if defer_commit:
             return record
         return self.commit_changes(db, record)
 
+    async def acreate(
+        self,
+        db: AsyncSession,
+        *,
+        data: CreateSchemaTypeT,  # must be passed as keyword argument
+        defer_commit: bool = False,  # optionally defer commit
+    ) -> ModelTypeT:
+        """Insert a new row into the table, see create() for details."""
+        record = self.build(data)
+        if defer_commit:
+            return record
+        return await self.acommit_changes(db, record)
+
+    def create_many(
+        self,
+        db: Session,
+        *,
+        data: Sequence[CreateSchemaTypeT],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[ModelTypeT]:
+        """
+        Insert many new rows into the table using multi-row INSERT statements.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        data: Sequence[CreateSchemaTypeT]
+            The instances of the Pydantic schema that contain the data used to
+            insert each new row in the database
+        batch_size: int | None, optional
+            The maximum number of rows inserted by each INSERT statement,
+            defaults to settings.BULK_INSERT_BATCH_SIZE
+        defer_commit: bool
+            Optionally defer committing the new records, see create()
+
+        Returns
+        -------
+        list[ModelTypeT]
+            The new records in the same order as the data. Their values are
+            returned by the INSERT statements (with RETURNING), so they aren't
+            refreshed one row at a time after they're inserted.
+
+        """
+        rows = self.build_rows(data)
+        records = self.insert_many(db, rows, batch_size=batch_size)
+        if defer_commit:
+            return records
+        return self.commit_many(db, records, batch_size=batch_size)
+
+    async def acreate_many(
+        self,
+        db: AsyncSession,
+        *,
+        data: Sequence[CreateSchemaTypeT],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[ModelTypeT]:
+        """Insert many new rows into the table, see create_many() for details."""
+        rows = self.build_rows(data)
+        records = await self.ainsert_many(db, rows, batch_size=batch_size)
+        if defer_commit:
+            return records
+        return await self.acommit_many(db, records, batch_size=batch_size)
+
+    def build(self, data: CreateSchemaTypeT) -> ModelTypeT:
+        """
+        Create a new record from the data without adding it to a session.
+
+        Subclasses can override this to set related records that should be
+        inserted along with the new record, as long as they don't query the db.
+        That way create() and acreate() can share the same logic.
+        """
+        return self.model(id=self.model.new_id(), **data.model_dump())
+
+    def build_rows(self, data: Sequence[CreateSchemaTypeT]) -> list[dict]:
+        """Create the values for each new row inserted by create_many()."""
+        return [
+            {"id": self.model.new_id(), **item.model_dump()} for item in data
+        ]
+
+    def insert_many(
+        self,
+        db: Session,
+        rows: list[dict],
+        *,
+        batch_size: int | None = None,
+    ) -> list[ModelTypeT]:
+        """Insert the rows in batches and return them as new records."""
+        if not rows:
+            return []
+        stmt = self.insert_many_stmt(batch_size)
+        return list(db.scalars(stmt, rows).all())
+
+    async def ainsert_many(
+        self,
+        db: AsyncSession,
+        rows: list[dict],
+        *,
+        batch_size: int | None = None,
+    ) -> list[ModelTypeT]:
+        """Insert the rows in batches and return them as new records."""
+        if not rows:
+            return []
+        stmt = self.insert_many_stmt(batch_size)
+        return list((await db.scalars(stmt, rows)).all())
+
+    def insert_many_stmt(self, batch_size: int | None = None) -> sa.Insert:
+        """
+        Return an INSERT statement that returns the new records in order.
+
+        When it's executed with a list of rows, SQLAlchemy's "insertmanyvalues"
+        feature inserts the rows using one multi-row INSERT ... RETURNING
+        statement per batch instead of one statement per row.
+        """
+        if batch_size is None:
+            batch_size = config.settings.BULK_INSERT_BATCH_SIZE
+        return (
+            sa.insert(self.model)
+            .returning(self.model, sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=batch_size)
+        )
+
+    def commit_many(
+        self,
+        db: Session,
+        records: list[ModelTypeT],
+        *,
+        batch_size: int | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> list[ModelTypeT]:
+        """
+        Commit the new records then reload them in batches if they've expired.
+
+        If the session expires its records on commit, they're reloaded with one
+        SELECT per batch (along with any relationships loaded by the options)
+        instead of being refreshed one at a time when they're next accessed.
+        """
+        ids = [record.id for record in records]
+        db.commit()
+        if db.expire_on_commit:
+            for stmt in self._reload_stmts(ids, batch_size, options):
+                db.execute(stmt).scalars().all()
+        return records
+
+    async def acommit_many(
+        self,
+        db: AsyncSession,
+        records: list[ModelTypeT],
+        *,
+        batch_size: int | None = None,
+        options: Sequence[ORMOption] = (),
+    ) -> list[ModelTypeT]:
+        """Commit the new records, see commit_many() for details."""
+        ids = [record.id for record in records]
+        await db.commit()
+        if db.sync_session.expire_on_commit:
+            for stmt in self._reload_stmts(ids, batch_size, options):
+                (await db.execute(stmt)).scalars().all()
+        return records
+
+    def _reload_stmts(
+        self,
+        ids: list[UUID],
+        batch_size: int | None,
+        options: Sequence[ORMOption],
+    ) -> list[sa.Select]:
+        """Return the queries that reload the records in batches."""
+        if batch_size is None:
+            batch_size = config.settings.BULK_INSERT_BATCH_SIZE
+        return [
+            sa.select(self.model)
+            .where(self.model.id.in_(ids[start : start + batch_size]))
+            .options(*options)
+            for start in range(0, len(ids), batch_size)
+        ]
+
     def commit_changes(
         self,
         db: Session,
         record: ModelTypeT,
+        *,
+        refresh: bool = True,
     ) -> ModelTypeT:
-        """Add changes to a session, commits them, and refreshes the record."""
+        """
+        Add changes to a session, commit them, and refresh the record.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        record: ModelTypeT
+            The new or updated record to commit
+        refresh: bool, optional
+            Select any of the record's columns that weren't loaded when it was
+            written, e.g. because the session expired them on commit. Sessions
+            created by create_session_factory() don't expire records, and
+            server-generated values are returned by the INSERT or UPDATE, so
+            usually there's nothing to select. Pass False to skip the check.
+
+        """
         db.add(record)
         db.commit()
-        db.refresh(record)  # issues a SELECT stmt to refresh values of record
+        if refresh and (columns := self._unloaded_columns(record)):
+            db.refresh(record, attribute_names=columns)
+        return record
+
+    async def acommit_changes(
+        self,
+        db: AsyncSession,
+        record: ModelTypeT,
+        *,
+        refresh: bool = True,
+    ) -> ModelTypeT:
+        """
+        Add changes to a session, commit them, and refresh the record.
+
+        Only the column attributes are refreshed, because refreshing the whole
+        record would expire relationships that were set before the commit and
+        an AsyncSession can't lazy load them again. See commit_changes().
+        """
+        db.add(record)
+        await db.commit()
+        if refresh and (columns := self._unloaded_columns(record)):
+            await db.refresh(record, attribute_names=columns)
         return record
 
+    def _unloaded_columns(self, record: ModelTypeT) -> list[str]:
+        """Return the names of the record's columns that need to be loaded."""
+        unloaded = sa.inspect(record).unloaded
+        return [
+            attr.key
+            for attr in sa.inspect(self.model).column_attrs
+            if attr.key in unloaded
+        ]
+
 
 class CRUDBase(
     Generic[ModelTypeT, CreateSchemaTypeT, UpdateSchemaTypeT],
@@ -157,6 +446,18 @@ class CRUDBase(
             setattr(record, field, value)
         return self.commit_changes(db, record)
 
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        *,
+        record: ModelTypeT,
+        update_data: UpdateSchemaTypeT,
+    ) -> ModelTypeT:
+        """Update a record in the table, see update() for details."""
+        for field, value in update_data.model_dump(exclude_unset=True).items():
+            setattr(record, field, value)
+        return await self.acommit_changes(db, record)
+
     def delete(self, db: Session, *, row_id: UUID) -> None:
         """
         Delete a record from the table.
@@ -172,3 +473,9 @@ class CRUDBase(
         record = db.get(self.model, row_id)
         db.delete(record)
         db.commit()
+
+    async def adelete(self, db: AsyncSession, *, row_id: UUID) -> None:
+        """Delete a record from the table, see delete() for details."""
+        record = await db.get(self.model, row_id)
+        await db.delete(record)
+        await db.commit()
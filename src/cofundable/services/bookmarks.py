@@ -1,12 +1,16 @@
 """Handle business logic related to Cofundable bookmarks."""
 
+from typing import Sequence
 from uuid import UUID
 
 from sqlalchemy import Select, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from cofundable.errors import CauseHandleNotFoundError
 from cofundable.models.bookmark import Bookmark
+from cofundable.models.cause import Cause
 from cofundable.schemas.bookmark import (
     BookmarkCreateSchema,
     BookmarkUpdateSchema,
@@ -14,6 +18,11 @@ from cofundable.schemas.bookmark import (
 from cofundable.services.base import CRUDBase
 from cofundable.services.causes import cause_service
 
+# load the bookmarked cause and its tags, which are included in the response
+BOOKMARK_LOADER_OPTIONS: Sequence[ORMOption] = (
+    joinedload(Bookmark.cause).selectinload(Cause.tags),
+)
+
 BaseClasses = CRUDBase[
     Bookmark,
     BookmarkCreateSchema,
@@ -24,9 +33,15 @@ BaseClasses = CRUDBase[
 class BookmarkCRUD(BaseClasses):
     """Manage CRUD operations for the Bookmark model."""
 
-    def get_bookmarks_for_user(self, user_id: UUID) -> Select:
+    def get_bookmarks_for_user(
+        self,
+        user_id: UUID,
+        options: Sequence[ORMOption] = (),
+    ) -> Select:
         """Query a user's bookmarks so that the results can be paginated."""
-        return select(Bookmark).where(Bookmark.user_id == user_id)
+        stmt = select(Bookmark).where(Bookmark.user_id == user_id)
+        stmt = stmt.order_by(Bookmark.created_at.desc(), Bookmark.id)
+        return stmt.options(*options)
 
     def get_bookmark_by_user_and_cause(
         self,
@@ -36,11 +51,21 @@ class BookmarkCRUD(BaseClasses):
         cause_id: UUID,
     ) -> Bookmark | None:
         """Find a bookmark by its user_id and cause_id."""
-        stmt = select(self.model)
-        stmt = stmt.where(self.model.cause_id == cause_id)
-        stmt = stmt.where(self.model.user_id == user_id)
+        stmt = self._query_by_user_and_cause(user_id, cause_id)
         return db.execute(stmt).scalar()
 
+    async def aget_bookmark_by_user_and_cause(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        cause_id: UUID,
+        options: Sequence[ORMOption] = (),
+    ) -> Bookmark | None:
+        """Find a bookmark by its user_id and cause_id, loading the options."""
+        stmt = self._query_by_user_and_cause(user_id, cause_id)
+        return (await db.execute(stmt.options(*options))).scalar()
+
     def bookmark_cause_for_user(
         self,
         db: Session,
@@ -64,5 +89,53 @@ class BookmarkCRUD(BaseClasses):
             data=BookmarkCreateSchema(user_id=user_id, cause_id=cause.id),
         )
 
+    async def abookmark_cause_for_user(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        cause_handle: str,
+        options: Sequence[ORMOption] = (),
+    ) -> Bookmark:
+        """
+        Bookmark a cause for a user, see bookmark_cause_for_user() for details.
+
+        The bookmark is returned with the relationships in options loaded, so
+        that they can be accessed without lazy loading them.
+        """
+        cause = await cause_service.aget_cause_by_handle(db, cause_handle)
+        if not cause:
+            raise CauseHandleNotFoundError(handle=cause_handle)
+        bookmark = await self.aget_bookmark_by_user_and_cause(
+            db=db,
+            user_id=user_id,
+            cause_id=cause.id,
+            options=options,
+        )
+        if bookmark:
+            return bookmark
+        new_bookmark = await self.acreate(
+            db=db,
+            data=BookmarkCreateSchema(user_id=user_id, cause_id=cause.id),
+        )
+        # reload the new bookmark to populate the relationships in options
+        bookmark = await self.aget_bookmark_by_user_and_cause(
+            db=db,
+            user_id=user_id,
+            cause_id=cause.id,
+            options=options,
+        )
+        return bookmark or new_bookmark
+
+    def _query_by_user_and_cause(
+        self,
+        user_id: UUID,
+        cause_id: UUID,
+    ) -> Select:
+        """Query a bookmark by its user_id and cause_id."""
+        stmt = select(self.model)
+        stmt = stmt.where(self.model.cause_id == cause_id)
+        return stmt.where(self.model.user_id == user_id)
+
 
 bookmark_service = BookmarkCRUD(model=Bookmark)
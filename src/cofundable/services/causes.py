@@ -1,11 +1,34 @@
 """Handle business logic related to Cofundable causes."""
 
-from uuid import uuid4
+import re
+from typing import Sequence
+from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    false,
+    func,
+    insert,
+    literal_column,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.interfaces import ORMOption
 
+from cofundable.dependencies.database import check_dialect_name
+from cofundable.models.associations import cause_tag_table
 from cofundable.models.cause import Cause
+from cofundable.models.search import (
+    CAUSE_SEARCH_TABLE,
+    SEARCH_COLUMNS,
+    cause_document,
+    cause_search_table,
+    postgresql_config,
+    tag_document,
+)
 from cofundable.schemas.cause import CauseRequestSchema, CauseResponseSchema
 from cofundable.services.accounts import (
     Account,
@@ -15,6 +38,18 @@ from cofundable.services.accounts import (
 from cofundable.services.base import CRUDBase
 from cofundable.services.tags import Tag, tag_service
 
+# load the relationships that are included in CauseResponseSchema
+CAUSE_LOADER_OPTIONS: Sequence[ORMOption] = (selectinload(Cause.tags),)
+# the bm25() weight of each column of the SQLite search index, so that a match
+# in a cause's name ranks higher than one in its description
+SEARCH_WEIGHTS = {
+    "cause_id": 0.0,
+    "name": 10.0,
+    "handle": 5.0,
+    "description": 1.0,
+    "tags": 2.0,
+}
+
 
 class CauseCRUD(CRUDBase[Cause, CauseRequestSchema, CauseResponseSchema]):
     """Manage CRUD operations for the Cause model."""
@@ -24,6 +59,69 @@ class CauseCRUD(CRUDBase[Cause, CauseRequestSchema, CauseResponseSchema]):
         stmt = select(Cause).where(Cause.handle == handle)
         return db.execute(stmt).scalar()
 
+    async def aget_cause_by_handle(
+        self,
+        db: AsyncSession,
+        handle: str,
+        options: Sequence[ORMOption] = (),
+    ) -> Cause | None:
+        """Find a cause by its handle, loading relationships with the options."""
+        stmt = select(Cause).where(Cause.handle == handle).options(*options)
+        return (await db.execute(stmt)).scalar()
+
+    def query_balances(self) -> Select:
+        """Return a query for the id, handle, name, account_id and balance of each cause."""
+        return select(
+            Cause.id,
+            Cause.handle,
+            Cause.name,
+            Cause.account_id,
+            Account.balance,
+        ).join(Cause.account)
+
+    def query_search(
+        self,
+        text: str,
+        dialect_name: str,
+        options: Sequence[ORMOption] = (),
+    ) -> Select:
+        """
+        Return a query for the causes that match a search, best matches first.
+
+        Each word in the text is matched against the start of the words in a
+        cause's name, handle, description and tags, and a cause must match
+        every word. The causes are found with the full-text index created by
+        cofundable.models.search, so the query can be paginated without
+        reading every cause.
+
+        Parameters
+        ----------
+        text: str
+            The text to search for, anything other than letters, digits and
+            underscores separates the words and is otherwise ignored
+        dialect_name: str
+            The name of the database dialect the query is run on, either
+            "sqlite" (which uses FTS5) or "postgresql" (which uses tsvector)
+        options: Sequence[ORMOption], optional
+            Loader options for the relationships included in the response
+
+        Raises
+        ------
+        ValueError
+            If the dialect isn't one of the SUPPORTED_DIALECTS
+
+        """
+        check_dialect_name(dialect_name)
+        words = search_words(text)
+        if dialect_name == "sqlite":
+            stmt = self._query_search_sqlite(words)
+        else:
+            stmt = self._query_search_postgresql(words)
+        if not words:
+            stmt = stmt.where(false())
+        # order ties by id so that the pages are stable
+        return stmt.order_by(Cause.id).options(*options)
+
     def create(
         self,
         db: Session,
@@ -32,18 +130,206 @@ class CauseCRUD(CRUDBase[Cause, CauseRequestSchema, CauseResponseSchema]):
         defer_commit: bool = False,  # optionally defer commit
     ) -> Cause:
         """Create a new cause."""
-        # convert the cause data to a dict and remove tags to prevent an error
-        cause_data = data.model_dump()
-        cause_data.pop("tags")
-        # create a new record in the cause table then assign the tags to it
-        cause = self.model(id=uuid4(), **cause_data)
-        cause.account = self._create_new_account(db, name=data.handle)
+        cause = self.build(data)
         cause.tags = self._get_tags(db, tags=data.tags)
+        tag_service.count_causes(db, cause.tags)
         # optionally commit the new record before returning it
         if defer_commit:
             return cause
         return self.commit_changes(db, cause)
 
+    async def acreate(
+        self,
+        db: AsyncSession,
+        *,
+        data: CauseRequestSchema,
+        defer_commit: bool = False,  # optionally defer commit
+    ) -> Cause:
+        """Create a new cause, see create() for details."""
+        cause = self.build(data)
+        cause.tags = await tag_service.aget_or_create_tags_by_name(
+            db=db,
+            tag_names=data.tags,
+            defer_commit=True,
+        )
+        await tag_service.acount_causes(db, cause.tags)
+        if defer_commit:
+            return cause
+        return await self.acommit_changes(db, cause)
+
+    def create_many(
+        self,
+        db: Session,
+        *,
+        data: Sequence[CauseRequestSchema],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[Cause]:
+        """Create many new causes along with their accounts and tags."""
+        accounts = account_service.create_many(
+            db,
+            data=self._new_account_data(data),
+            batch_size=batch_size,
+            defer_commit=True,
+        )
+        causes = self.insert_many(
+            db,
+            self._build_rows_with_accounts(data, accounts),
+            batch_size=batch_size,
+        )
+        tags = tag_service.get_or_create_tags_by_name(
+            db,
+            tag_names=[name for item in data for name in item.tags],
+            defer_commit=True,
+        )
+        cause_tags = self._assign_tags_and_accounts(
+            data,
+            causes,
+            accounts,
+            tags,
+        )
+        if cause_tags:
+            db.execute(insert(cause_tag_table), cause_tags)
+        tag_service.count_causes(db, self._linked_tags(causes))
+        if defer_commit:
+            return causes
+        return self.commit_many(
+            db,
+            causes,
+            batch_size=batch_size,
+            options=[*CAUSE_LOADER_OPTIONS, selectinload(Cause.account)],
+        )
+
+    async def acreate_many(
+        self,
+        db: AsyncSession,
+        *,
+        data: Sequence[CauseRequestSchema],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[Cause]:
+        """Create many new causes, see create_many() for details."""
+        accounts = await account_service.acreate_many(
+            db,
+            data=self._new_account_data(data),
+            batch_size=batch_size,
+            defer_commit=True,
+        )
+        causes = await self.ainsert_many(
+            db,
+            self._build_rows_with_accounts(data, accounts),
+            batch_size=batch_size,
+        )
+        tags = await tag_service.aget_or_create_tags_by_name(
+            db,
+            tag_names=[name for item in data for name in item.tags],
+            defer_commit=True,
+        )
+        cause_tags = self._assign_tags_and_accounts(
+            data,
+            causes,
+            accounts,
+            tags,
+        )
+        if cause_tags:
+            await db.execute(insert(cause_tag_table), cause_tags)
+        await tag_service.acount_causes(db, self._linked_tags(causes))
+        if defer_commit:
+            return causes
+        return await self.acommit_many(
+            db,
+            causes,
+            batch_size=batch_size,
+            options=[*CAUSE_LOADER_OPTIONS, selectinload(Cause.account)],
+        )
+
+    def delete(self, db: Session, *, row_id: UUID) -> None:
+        """Delete a cause, and remove it from the cause counts of its tags."""
+        cause = self.get(db, row_id, options=CAUSE_LOADER_OPTIONS)
+        if cause is not None:
+            tag_service.count_causes(db, cause.tags, change=-1)
+        super().delete(db, row_id=row_id)
+
+    async def adelete(self, db: AsyncSession, *, row_id: UUID) -> None:
+        """Delete a cause, see delete() for details."""
+        cause = await self.aget(db, row_id, options=CAUSE_LOADER_OPTIONS)
+        if cause is not None:
+            await tag_service.acount_causes(db, cause.tags, change=-1)
+        await super().adelete(db, row_id=row_id)
+
+    def query_by_tag(
+        self,
+        tag: Tag,
+        options: Sequence[ORMOption] = (),
+    ) -> Select:
+        """
+        Return a query for the causes with a tag, for paginate_by_id().
+
+        The causes are found by a range scan of the (tag_id, cause_id) index on
+        cause_tag, and paginated by its cause_id column so that each page
+        continues the scan instead of sorting every cause with the tag.
+        """
+        return (
+            select(Cause)
+            .join(cause_tag_table, cause_tag_table.c.cause_id == Cause.id)
+            .where(cause_tag_table.c.tag_id == tag.id)
+            .options(*options)
+        )
+
+    def build_rows(self, data: Sequence[CauseRequestSchema]) -> list[dict]:
+        """Create the values for new causes, without their tags or accounts."""
+        return [
+            {"id": self.model.new_id(), **item.model_dump(exclude={"tags"})}
+            for item in data
+        ]
+
+    def build(self, data: CauseRequestSchema) -> Cause:
+        """Create a new cause and its account, without assigning any tags."""
+        # convert the cause data to a dict and remove tags to prevent an error
+        cause_data = data.model_dump()
+        cause_data.pop("tags")
+        # create a new record in the cause table then assign the account to it
+        cause = self.model(id=self.model.new_id(), **cause_data)
+        cause.account = self._create_new_account(name=data.handle)
+        return cause
+
+    def _query_search_sqlite(self, words: list[str]) -> Select:
+        """Search the FTS5 table, ranking the causes by bm25()."""
+        index: ColumnElement = literal_column(CAUSE_SEARCH_TABLE)
+        # quoted so that words like "or" aren't parsed as operators
+        prefixes = " AND ".join(f'"{word}"*' for word in words)
+        columns = " ".join(SEARCH_COLUMNS)
+        return (
+            select(Cause)
+            .join(
+                cause_search_table,
+                cause_search_table.c.cause_id == Cause.id,
+            )
+            .where(index.match(f"{{{columns}}} : ({prefixes})"))
+            .order_by(func.bm25(index, *SEARCH_WEIGHTS.values()))
+        )
+
+    def _query_search_postgresql(self, words: list[str]) -> Select:
+        """
+        Search the tsvector indexes, ranking the causes by ts_rank().
+
+        A cause matches if its own document or one of its tags' names matches
+        every word, each of which is looked up with a GIN index.
+        """
+        prefixes = " & ".join(f"{word}:*" for word in words)
+        query = func.to_tsquery(postgresql_config(), prefixes)
+        tagged = (
+            select(cause_tag_table.c.cause_id)
+            .join(Tag, Tag.id == cause_tag_table.c.tag_id)
+            .where(tag_document().bool_op("@@")(query))
+        )
+        document = cause_document()
+        return (
+            select(Cause)
+            .where(document.bool_op("@@")(query) | Cause.id.in_(tagged))
+            .order_by(func.ts_rank(document, query).desc())
+        )
+
     def _get_tags(self, db: Session, tags: list[str]) -> set[Tag]:
         """Find or create the tags associated with a cause."""
         return tag_service.get_or_create_tags_by_name(
@@ -52,10 +338,64 @@ class CauseCRUD(CRUDBase[Cause, CauseRequestSchema, CauseResponseSchema]):
             defer_commit=True,
         )
 
-    def _create_new_account(self, db: Session, name: str) -> Account:
+    def _linked_tags(self, causes: list[Cause]) -> list[Tag]:
+        """Return the tags of new causes, once for each cause they're linked to."""
+        return [tag for cause in causes for tag in cause.tags]
+
+    def _create_new_account(self, name: str) -> Account:
         """Create a new account for this cause with a balance of 0."""
-        account_data = AccountSchema(name=name, balance=0)
-        return account_service.create(db, data=account_data, defer_commit=True)
+        return account_service.build(AccountSchema(name=name, balance=0))
+
+    def _new_account_data(
+        self,
+        data: Sequence[CauseRequestSchema],
+    ) -> list[AccountSchema]:
+        """Return the data for the accounts of new causes, each with 0 balance."""
+        return [AccountSchema(name=item.handle, balance=0) for item in data]
+
+    def _build_rows_with_accounts(
+        self,
+        data: Sequence[CauseRequestSchema],
+        accounts: list[Account],
+    ) -> list[dict]:
+        """Create the rows for new causes that belong to the accounts."""
+        return [
+            row | {"account_id": account.id}
+            for row, account in zip(
+                self.build_rows(data),
+                accounts,
+                strict=True,
+            )
+        ]
+
+    def _assign_tags_and_accounts(
+        self,
+        data: Sequence[CauseRequestSchema],
+        causes: list[Cause],
+        accounts: list[Account],
+        tags: set[Tag],
+    ) -> list[dict]:
+        """
+        Set the tags and account of each new cause without loading them.
+
+        Returns the rows to insert into the cause_tag table.
+        """
+        tags_by_name = {tag.name: tag for tag in tags}
+        cause_tags: list[dict] = []
+        for item, cause, account in zip(data, causes, accounts, strict=True):
+            cause_tag_set = {tags_by_name[name] for name in item.tags}
+            set_committed_value(cause, "account", account)
+            set_committed_value(cause, "tags", cause_tag_set)
+            cause_tags.extend(
+                {"cause_id": cause.id, "tag_id": tag.id}
+                for tag in cause_tag_set
+            )
+        return cause_tags
+
+
+def search_words(text: str) -> list[str]:
+    """Split a search into words, dropping characters used by query syntax."""
+    return re.findall(r"\w+", text)
 
 
 cause_service = CauseCRUD(model=Cause)
@@ -0,0 +1,280 @@
+"""Handle business logic for the idempotency keys sent with transfers."""
+
+import hashlib
+from datetime import datetime, timedelta
+from typing import cast
+from uuid import UUID
+
+import sqlalchemy as sa
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cofundable import config
+from cofundable.dependencies.database import USE_PRIMARY
+from cofundable.errors import IdempotencyKeyReusedError
+from cofundable.models.base import utc_now
+from cofundable.models.idempotency_key import IdempotencyKey
+from cofundable.models.transaction import Transaction
+from cofundable.schemas.idempotency_key import IdempotencyKeyCreateSchema
+from cofundable.schemas.transaction import TransferResponseSchema
+from cofundable.services.base import InsertOnlyBase
+
+
+class IdempotencyKeyService(
+    InsertOnlyBase[IdempotencyKey, IdempotencyKeyCreateSchema],
+):
+    """Manage the idempotency keys that let clients safely retry transfers."""
+
+    def get_response(
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        key: str,
+        data: BaseModel,
+    ) -> TransferResponseSchema | None:
+        """
+        Return the outcome of an earlier request that was sent with the key.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        user_id: UUID
+            The id of the user that sent the request
+        key: str
+            The value of the request's Idempotency-Key header
+        data: BaseModel
+            The body of the request
+
+        Returns
+        -------
+        TransferResponseSchema | None
+            The transactions created by the earlier request, or None if the
+            key hasn't been used (or has expired)
+
+        Raises
+        ------
+        IdempotencyKeyReusedError
+            If the key was used for a request with a different body
+
+        """
+        record = db.scalar(self._key_query(user_id, key))
+        return self._check_response(record, key, data)
+
+    async def aget_response(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        key: str,
+        data: BaseModel,
+    ) -> TransferResponseSchema | None:
+        """Return the outcome of an earlier request, see get_response()."""
+        record = await db.scalar(self._key_query(user_id, key))
+        return self._check_response(record, key, data)
+
+    # pylint: disable-next=too-many-arguments
+    def record(  # noqa: PLR0913
+        self,
+        db: Session,
+        *,
+        user_id: UUID,
+        key: str,
+        data: BaseModel,
+        transfer: tuple[Transaction, Transaction],
+    ) -> TransferResponseSchema:
+        """
+        Store the outcome of a transfer and commit it along with the transfer.
+
+        The transfer must not have been committed yet, so that if a concurrent
+        request with the same key is recorded first, the unique constraint on
+        (user_id, key) rolls this transfer back and the outcome of the other
+        request is returned instead.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        user_id: UUID
+            The id of the user that sent the request
+        key: str
+            The value of the request's Idempotency-Key header
+        data: BaseModel
+            The body of the request
+        transfer: tuple[Transaction, Transaction]
+            The debit and credit created by the transfer
+
+        """
+        db.execute(self._delete_expired_key_stmt(user_id, key))
+        db.add(self._build_record(user_id, key, data, transfer))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            response = self.get_response(
+                db,
+                user_id=user_id,
+                key=key,
+                data=data,
+            )
+            if response is None:
+                raise
+            return response
+        debit, credit = transfer
+        return TransferResponseSchema(debit_id=debit.id, credit_id=credit.id)
+
+    # pylint: disable-next=too-many-arguments
+    async def arecord(  # noqa: PLR0913
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        key: str,
+        data: BaseModel,
+        transfer: tuple[Transaction, Transaction],
+    ) -> TransferResponseSchema:
+        """Store the outcome of a transfer, see record() for details."""
+        # capture the ids before a rollback expires the transactions
+        debit, credit = transfer
+        response = TransferResponseSchema(
+            debit_id=debit.id,
+            credit_id=credit.id,
+        )
+        await db.execute(self._delete_expired_key_stmt(user_id, key))
+        db.add(self._build_record(user_id, key, data, transfer))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            stored = await self.aget_response(
+                db,
+                user_id=user_id,
+                key=key,
+                data=data,
+            )
+            if stored is None:
+                raise
+            return stored
+        return response
+
+    def purge_expired(
+        self,
+        db: Session,
+        *,
+        batch_size: int | None = None,
+    ) -> int:
+        """
+        Delete the keys that have expired, committing after each batch.
+
+        Deleting them in batches keeps each transaction (and the locks that it
+        holds) short, so that purging a large backlog of keys doesn't block the
+        transfers that are recording new ones.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        batch_size: int | None, optional
+            The maximum number of keys deleted by each DELETE statement,
+            defaults to settings.IDEMPOTENCY_KEY_PURGE_BATCH_SIZE
+
+        Returns
+        -------
+        int
+            The number of keys that were deleted
+
+        """
+        if batch_size is None:
+            batch_size = config.settings.IDEMPOTENCY_KEY_PURGE_BATCH_SIZE
+        # keys that expire while the batches are being deleted are left for
+        # the next purge, so that it always finishes
+        stmt = self._purge_stmt(batch_size, now=utc_now())
+        purged = 0
+        while True:
+            deleted = cast(sa.CursorResult, db.execute(stmt)).rowcount
+            db.commit()
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+
+    def hash_request(self, data: BaseModel) -> str:
+        """Return a hash of the request body that's stored with its key."""
+        return hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+    def _key_query(self, user_id: UUID, key: str) -> sa.Select:
+        """Return a query for a key that hasn't expired."""
+        return (
+            sa.select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > utc_now(),
+            )
+            # read the key from the primary database, since it may have been
+            # recorded too recently to have been copied to the replicas
+            .execution_options(**{USE_PRIMARY: True})
+        )
+
+    def _check_response(
+        self,
+        record: IdempotencyKey | None,
+        key: str,
+        data: BaseModel,
+    ) -> TransferResponseSchema | None:
+        """Return the stored response if the key was used for the same body."""
+        if record is None:
+            return None
+        if record.request_hash != self.hash_request(data):
+            raise IdempotencyKeyReusedError(key)
+        return TransferResponseSchema.model_validate(record)
+
+    def _build_record(
+        self,
+        user_id: UUID,
+        key: str,
+        data: BaseModel,
+        transfer: tuple[Transaction, Transaction],
+    ) -> IdempotencyKey:
+        """Create the record of a transfer's outcome for the key."""
+        debit, credit = transfer
+        ttl = timedelta(seconds=config.settings.IDEMPOTENCY_KEY_TTL)
+        return self.build(
+            IdempotencyKeyCreateSchema(
+                key=key,
+                user_id=user_id,
+                request_hash=self.hash_request(data),
+                debit_id=debit.id,
+                credit_id=credit.id,
+                expires_at=utc_now() + ttl,
+            ),
+        )
+
+    def _delete_expired_key_stmt(self, user_id: UUID, key: str) -> sa.Delete:
+        """Delete the key if it has expired, so that it can be used again."""
+        return (
+            sa.delete(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at <= utc_now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def _purge_stmt(self, batch_size: int, now: datetime) -> sa.Delete:
+        """Delete up to batch_size keys that had expired by a given time."""
+        expired = (
+            sa.select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= now)
+            .limit(batch_size)
+        )
+        return (
+            sa.delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+
+
+idempotency_key_service = IdempotencyKeyService(IdempotencyKey)
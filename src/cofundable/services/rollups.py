@@ -0,0 +1,309 @@
+"""Handle business logic for the daily rollups of each account's transactions."""
+
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cofundable.dependencies.database import check_dialect_name
+from cofundable.models.account import Account
+from cofundable.models.rollup import AccountDailyRollup
+from cofundable.models.transaction import Transaction
+from cofundable.schemas.rollup import (
+    DailyRollupCreateSchema,
+    DailyRollupSchema,
+    FundingStatsSchema,
+    FundingTotalsSchema,
+)
+from cofundable.schemas.transaction import EntryType
+from cofundable.services.base import UPSERT_DIALECTS, InsertOnlyBase
+
+# the columns of a rollup that are added to when transactions are recorded
+TOTALS = ["credit_total", "credit_count", "debit_total", "debit_count"]
+# transactions read from the ledger at a time when the rollups are rebuilt
+REBUILD_BATCH_SIZE = 10_000
+
+RollupKey = tuple[Any, date]
+
+
+def utc_day(timestamp: datetime) -> date:
+    """Return the day (in UTC) of a timestamp, naive timestamps are in UTC."""
+    if timestamp.tzinfo is None:
+        return timestamp.date()
+    return timestamp.astimezone(timezone.utc).date()
+
+
+class RollupService(
+    InsertOnlyBase[AccountDailyRollup, DailyRollupCreateSchema],
+):
+    """Manage the daily rollups of the credits and debits of each account."""
+
+    def record_transactions(
+        self,
+        db: Session,
+        transactions: Sequence[Transaction],
+    ) -> None:
+        """
+        Add new transactions to the rollups of their accounts, without committing.
+
+        The transactions are summed by account and day in Python, then every
+        rollup is updated by one INSERT ... ON CONFLICT DO UPDATE statement
+        that adds to its totals in the database, so concurrent transfers can't
+        overwrite each other's changes. The rollups are upserted in order of
+        (account_id, day), like the balances in transfer_shares(), so that
+        concurrent transfers can't deadlock each other.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions,
+            the rollups are committed along with the transactions
+        transactions: Sequence[Transaction]
+            The transactions to add, they're flushed first if they haven't
+            been inserted yet so that they have a created_at timestamp
+
+        """
+        db.flush()
+        rows = self._build_rollup_rows(transactions)
+        if rows:
+            db.execute(self.upsert_stmt(db.get_bind().dialect.name), rows)
+
+    async def arecord_transactions(
+        self,
+        db: AsyncSession,
+        transactions: Sequence[Transaction],
+    ) -> None:
+        """Add new transactions to the rollups, see record_transactions()."""
+        await db.flush()
+        rows = self._build_rollup_rows(transactions)
+        if rows:
+            stmt = self.upsert_stmt(db.get_bind().dialect.name)
+            await db.execute(stmt, rows)
+
+    def upsert_stmt(self, dialect_name: str) -> sa.Insert:
+        """
+        Return an INSERT that adds to the totals of rollups that already exist.
+
+        Parameters
+        ----------
+        dialect_name: str
+            The name of the database dialect the statement is run on, either
+            "sqlite" or "postgresql" since they both support ON CONFLICT
+
+        Raises
+        ------
+        ValueError
+            If the dialect isn't one of the SUPPORTED_DIALECTS
+
+        """
+        check_dialect_name(dialect_name)
+        stmt = UPSERT_DIALECTS[dialect_name](AccountDailyRollup)
+        totals = {
+            column: getattr(AccountDailyRollup, column) + stmt.excluded[column]
+            for column in TOTALS
+        }
+        return stmt.on_conflict_do_update(
+            index_elements=[
+                AccountDailyRollup.account_id,
+                AccountDailyRollup.day,
+            ],
+            set_={**totals, "updated_at": stmt.excluded.updated_at},
+        )
+
+    def rebuild(
+        self,
+        db: Session,
+        *,
+        batch_size: int = REBUILD_BATCH_SIZE,
+    ) -> int:
+        """
+        Replace every rollup with the sums of the transactions in the ledger.
+
+        The transactions are read in order of (account_id, created_at), which
+        is the order of their index, and in batches with yield_per. Since each
+        account's days are read one after the other, every rollup except the
+        one currently being summed is complete and can be inserted, so the
+        memory used doesn't depend on the size of the ledger. The rollups are
+        replaced in one database transaction, so concurrent readers see either
+        the old rollups or the new ones.
+
+        The rollups are inserted with upsert_stmt(), so a rollup that a
+        transfer creates while the rebuild runs doesn't make it fail with an
+        IntegrityError. That transfer's totals could still be counted twice or
+        not at all though, so the rollups should only be rebuilt while writes
+        (e.g. transfers) are paused.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        batch_size: int, optional
+            The number of transactions read from the ledger at a time
+
+        Returns
+        -------
+        int
+            The number of rollups that were created
+
+        """
+        db.execute(sa.delete(AccountDailyRollup))
+        result = db.execute(
+            sa.select(
+                Transaction.account_id,
+                Transaction.kind,
+                Transaction.amount,
+                Transaction.created_at,
+            ).order_by(Transaction.account_id, Transaction.created_at),
+            execution_options={"yield_per": batch_size},
+        )
+        rollups: dict[RollupKey, DailyRollupCreateSchema] = {}
+        created = 0
+        for batch in result.partitions():
+            self._add_to_rollups(rollups, batch)
+            # only the last rollup can include transactions in the next batch
+            complete = list(rollups)[:-1]
+            created += self._insert_rollups(
+                db,
+                [rollups.pop(key) for key in complete],
+            )
+        created += self._insert_rollups(db, list(rollups.values()))
+        db.commit()
+        return created
+
+    def query_daily_rollups(
+        self,
+        account: Account,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> sa.Select:
+        """Return a query for an account's rollups from start to end, inclusive."""
+        stmt = sa.select(AccountDailyRollup).where(
+            AccountDailyRollup.account_id == account.id,
+        )
+        if start is not None:
+            stmt = stmt.where(AccountDailyRollup.day >= start)
+        if end is not None:
+            stmt = stmt.where(AccountDailyRollup.day <= end)
+        return stmt.order_by(AccountDailyRollup.day)
+
+    def get_stats(
+        self,
+        db: Session,
+        account: Account,
+        *,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> FundingStatsSchema:
+        """
+        Return the funding of an account over a range of days.
+
+        The account's rollups for those days are read by one range scan of the
+        (account_id, day) index, and the totals are summed from the same rows,
+        so the ledger itself isn't read at all.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        account: Account
+            The account to return the funding of
+        start: date | None, optional
+            The first day (in UTC) to include, defaults to the first rollup
+        end: date | None, optional
+            The last day (in UTC) to include, defaults to the last rollup
+
+        Returns
+        -------
+        FundingStatsSchema
+            The totals over the whole range, and the rollup of each day in it
+            that has at least one transaction
+
+        """
+        rollups = db.scalars(self.query_daily_rollups(account, start, end))
+        return self._build_stats(account, start, end, rollups.all())
+
+    async def aget_stats(
+        self,
+        db: AsyncSession,
+        account: Account,
+        *,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> FundingStatsSchema:
+        """Return the funding of an account, see get_stats() for details."""
+        query = self.query_daily_rollups(account, start, end)
+        rollups = (await db.scalars(query)).all()
+        return self._build_stats(account, start, end, rollups)
+
+    def _build_rollup_rows(
+        self,
+        transactions: Sequence[Transaction],
+    ) -> list[dict]:
+        """Sum the transactions into rollups, in order of (account_id, day)."""
+        rollups: dict[RollupKey, DailyRollupCreateSchema] = {}
+        self._add_to_rollups(rollups, transactions)
+        return self.build_rows([rollups[key] for key in sorted(rollups)])
+
+    def _add_to_rollups(
+        self,
+        rollups: dict[RollupKey, DailyRollupCreateSchema],
+        transactions: Iterable[Any],
+    ) -> None:
+        """Add each transaction to the rollup of its account and day."""
+        for transaction in transactions:
+            day = utc_day(transaction.created_at)
+            key = (transaction.account_id, day)
+            if key not in rollups:
+                rollups[key] = DailyRollupCreateSchema(
+                    account_id=transaction.account_id,
+                    day=day,
+                )
+            rollup = rollups[key]
+            if transaction.kind == EntryType.credit:
+                rollup.credit_total += transaction.amount
+                rollup.credit_count += 1
+            else:
+                rollup.debit_total += transaction.amount
+                rollup.debit_count += 1
+
+    def _insert_rollups(
+        self,
+        db: Session,
+        rollups: list[DailyRollupCreateSchema],
+    ) -> int:
+        """Upsert the rebuilt rollups without returning them, and count them."""
+        if rollups:
+            stmt = self.upsert_stmt(db.get_bind().dialect.name)
+            db.execute(stmt, self.build_rows(rollups))
+        return len(rollups)
+
+    def _build_stats(
+        self,
+        account: Account,
+        start: date | None,
+        end: date | None,
+        rollups: Sequence[AccountDailyRollup],
+    ) -> FundingStatsSchema:
+        """Sum the totals of the rollups and return them with each day."""
+        totals = FundingTotalsSchema()
+        for rollup in rollups:
+            for column in TOTALS:
+                setattr(
+                    totals,
+                    column,
+                    getattr(totals, column) + getattr(rollup, column),
+                )
+        return FundingStatsSchema(
+            account_id=account.id,
+            start=start,
+            end=end,
+            totals=totals,
+            days=[
+                DailyRollupSchema.model_validate(rollup) for rollup in rollups
+            ],
+        )
+
+
+rollup_service = RollupService(AccountDailyRollup)
@@ -1,11 +1,25 @@
 """Handle business logic related to tags."""
 
-from sqlalchemy import select
+from collections import Counter
+from typing import Iterable, cast
+
+from sqlalchemy import (
+    Insert,
+    Select,
+    Table,
+    Update,
+    case,
+    select,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from cofundable.dependencies.database import check_dialect_name
 from cofundable.models.tag import Tag
 from cofundable.schemas.tag import TagSchema
-from cofundable.services.base import CRUDBase
+from cofundable.services.base import UPSERT_DIALECTS, CRUDBase
 
 
 class TagsCRUD(CRUDBase[Tag, TagSchema, TagSchema]):
@@ -18,22 +32,148 @@ class TagsCRUD(CRUDBase[Tag, TagSchema, TagSchema]):
         tag_names: list[str],
         defer_commit: bool = False,
     ) -> set[Tag]:
-        """Find a list of tag entries by name, or create them if they don't exist."""
-        # find existing tags records by name
-        tags = self.get_tags_by_name(db, tag_names=tag_names)
-        existing_tags = {tag.name for tag in tags}
-        # create new tag records if they don't exist
-        for tag_name in tag_names:
-            if tag_name not in existing_tags:
-                tag = self.create(
-                    db=db,
-                    data=TagSchema(name=tag_name),
-                    defer_commit=defer_commit,
-                )
-                tags.add(tag)
-        # return existing and newly created tags
+        """
+        Find a list of tag entries by name, or create them if they don't exist.
+
+        The missing tags are created with a single INSERT ... ON CONFLICT DO
+        NOTHING statement, so a tag created by a concurrent request is skipped
+        instead of being duplicated, then every tag is selected at once unless
+        all of them were just inserted. That's at most two queries no matter
+        how many tags there are.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        tag_names: list[str]
+            The names of the tags to return
+        defer_commit: bool
+            Optionally defer committing the new tags, e.g. so that they're
+            committed along with the cause they're assigned to
+
+        """
+        names = list(dict.fromkeys(tag_names))
+        if not names:
+            return set()
+        stmt = self.insert_missing_stmt(db.get_bind().dialect.name)
+        tags = set(db.scalars(stmt, self._build_tag_rows(names)).all())
+        if len(tags) < len(names):
+            tags = self.get_tags_by_name(db, tag_names=names)
+        if not defer_commit:
+            db.commit()
+        return tags
+
+    async def aget_or_create_tags_by_name(
+        self,
+        db: AsyncSession,
+        *,
+        tag_names: list[str],
+        defer_commit: bool = False,
+    ) -> set[Tag]:
+        """Find a list of tags by name, see get_or_create_tags_by_name()."""
+        names = list(dict.fromkeys(tag_names))
+        if not names:
+            return set()
+        stmt = self.insert_missing_stmt(db.get_bind().dialect.name)
+        tags = set((await db.scalars(stmt, self._build_tag_rows(names))).all())
+        if len(tags) < len(names):
+            tags = await self.aget_tags_by_name(db, tag_names=names)
+        if not defer_commit:
+            await db.commit()
         return tags
 
+    def insert_missing_stmt(self, dialect_name: str) -> Insert:
+        """
+        Return an INSERT that skips tags whose names already exist.
+
+        Parameters
+        ----------
+        dialect_name: str
+            The name of the database dialect the statement is run on, either
+            "sqlite" or "postgresql" since they both support ON CONFLICT
+
+        Raises
+        ------
+        ValueError
+            If the dialect isn't one of the SUPPORTED_DIALECTS
+
+        """
+        check_dialect_name(dialect_name)
+        return (
+            UPSERT_DIALECTS[dialect_name](Tag)
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag)
+        )
+
+    def get_tag_by_name(self, db: Session, name: str) -> Tag | None:
+        """Find a tag by its name."""
+        return db.scalar(select(Tag).where(Tag.name == name))
+
+    async def aget_tag_by_name(
+        self,
+        db: AsyncSession,
+        name: str,
+    ) -> Tag | None:
+        """Find a tag by its name."""
+        return await db.scalar(select(Tag).where(Tag.name == name))
+
+    def query_all_with_counts(self) -> Select:
+        """
+        Return a query for every tag and its cause count, in order of name.
+
+        The counts are read from the tag table, so this doesn't join cause_tag,
+        and the order is served by the unique index on name.
+        """
+        return select(Tag).order_by(Tag.name)
+
+    def count_causes(
+        self,
+        db: Session,
+        tags: Iterable[Tag],
+        *,
+        change: int = 1,
+    ) -> None:
+        """
+        Add to the cause count of each tag, without committing.
+
+        The counts are added to in the database by a single UPDATE statement
+        for all of the tags, so concurrent causes can't overwrite each other's
+        changes. The new counts are returned by the statement and set on the
+        tags in the session.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions,
+            the counts are committed along with the causes that were linked
+        tags: Iterable[Tag]
+            The tags linked to (or unlinked from) a cause, a tag that's
+            repeated is counted once for each time it appears
+        change: int, optional
+            The amount to add to the count each time a tag appears, e.g. -1
+            when a cause is deleted
+
+        """
+        changes = Counter(tags)
+        if not changes:
+            return
+        result = db.execute(self._count_causes_stmt(changes, change))
+        self._set_counts(changes, dict(result.tuples().all()))
+
+    async def acount_causes(
+        self,
+        db: AsyncSession,
+        tags: Iterable[Tag],
+        *,
+        change: int = 1,
+    ) -> None:
+        """Add to the cause count of each tag, see count_causes()."""
+        changes = Counter(tags)
+        if not changes:
+            return
+        result = await db.execute(self._count_causes_stmt(changes, change))
+        self._set_counts(changes, dict(result.tuples().all()))
+
     def get_tags_by_name(
         self,
         db: Session,
@@ -44,5 +184,39 @@ class TagsCRUD(CRUDBase[Tag, TagSchema, TagSchema]):
         stmt = select(Tag).where(Tag.name.in_(tag_names))
         return set(db.execute(stmt).scalars().all())
 
+    async def aget_tags_by_name(
+        self,
+        db: AsyncSession,
+        *,
+        tag_names: list[str],
+    ) -> set[Tag]:
+        """Find a list of tag entries by name."""
+        stmt = select(Tag).where(Tag.name.in_(tag_names))
+        return set((await db.execute(stmt)).scalars().all())
+
+    def _count_causes_stmt(self, changes: Counter[Tag], change: int) -> Update:
+        """Return an UPDATE that adds each tag's change to its count."""
+        table = cast(Table, Tag.__table__)
+        by_id = {tag.id: count * change for tag, count in changes.items()}
+        # a Core statement, so the session doesn't expire the counts it updates
+        return (
+            update(table)
+            .where(table.c.id.in_(by_id))
+            .values(
+                cause_count=table.c.cause_count
+                + case(by_id, value=table.c.id),
+            )
+            .returning(table.c.id, table.c.cause_count)
+        )
+
+    def _set_counts(self, changes: Counter[Tag], counts: dict) -> None:
+        """Set the counts returned by the UPDATE on the tags in the session."""
+        for tag in changes:
+            set_committed_value(tag, "cause_count", counts[tag.id])
+
+    def _build_tag_rows(self, names: list[str]) -> list[dict]:
+        """Create the values for each new tag."""
+        return self.build_rows([TagSchema(name=name) for name in names])
+
 
 tag_service = TagsCRUD(model=Tag)
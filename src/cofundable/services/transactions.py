@@ -1,9 +1,10 @@
 """Handle business logic for accounts that store share balances in Cofundable."""
 
-from decimal import Decimal
+from datetime import datetime, timezone
 
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
 from cofundable.models.account import Account
 from cofundable.models.transaction import Transaction
@@ -16,28 +17,33 @@ class TransactionService(InsertOnlyBase[Transaction, TransactionCreateSchema]):
 
     def record_transaction(
         self,
-        db: Session,
+        db: Session | AsyncSession,
         account: Account,
         kind: EntryType,
-        amount: float | Decimal,
+        amount: int,
     ) -> Transaction:
-        """Record a transaction and update the associated account balance."""
-        # update the account balance
-        if kind == EntryType.debit:
-            account.balance -= Decimal(amount)
-        else:
-            account.balance += Decimal(amount)
-        db.add(account)
-        # create and return transaction without committing
-        return self.create(
-            db=db,
-            data=TransactionCreateSchema(
+        """
+        Record a transaction for an account without committing it.
+
+        The account's balance isn't changed, it's updated in the database by
+        AccountCRUD.transfer_shares() so that concurrent transfers can't
+        overwrite each other's changes. account.balance must already be the
+        balance returned by that update, since it's stored as the transaction's
+        balance_after.
+        """
+        transaction = self.build(
+            TransactionCreateSchema(
                 amount=amount,
                 kind=kind,
                 account_id=account.id,
+                balance_after=account.balance,
             ),
-            defer_commit=True,
         )
+        # also add it to account.transactions, if they've already been loaded,
+        # since the account isn't expired and reloaded when the session commits
+        transaction.account = account
+        db.add(transaction)
+        return transaction
 
     def query_transactions_by_account(
         self,
@@ -52,5 +58,138 @@ class TransactionService(InsertOnlyBase[Transaction, TransactionCreateSchema]):
             stmt = stmt.where(Transaction.kind == entry_type)
         return stmt.order_by(sa.desc(Transaction.created_at))
 
+    def query_broken_pairs(self) -> sa.Select:
+        """
+        Return a query for the transactions that aren't matched correctly.
+
+        Each debit should be matched to a credit (and vice versa) of the same
+        amount, whose match_entry_id points back to it. Every transaction is
+        joined to its match by primary key in the database, so the pairs are
+        checked in one pass without loading them into Python.
+
+        Returns
+        -------
+        Select
+            A query for the id, match_entry_id and problem of each transaction
+            whose pair is broken, ordered by id
+
+        """
+        match = aliased(Transaction)
+        problem = sa.case(
+            (Transaction.match_entry_id.is_(None), "unmatched"),
+            (match.id.is_(None), "match is missing"),
+            (
+                match.match_entry_id.is_distinct_from(Transaction.id),
+                "asymmetric",
+            ),
+            (match.amount != Transaction.amount, "amounts differ"),
+            (match.kind == Transaction.kind, "same kind"),
+        )
+        return (
+            sa.select(
+                Transaction.id,
+                Transaction.match_entry_id,
+                problem.label("problem"),
+            )
+            .outerjoin(match, match.id == Transaction.match_entry_id)
+            .where(problem.is_not(None))
+            .order_by(Transaction.id)
+        )
+
+    def get_balance_as_of(
+        self,
+        db: Session,
+        account: Account,
+        as_of: datetime,
+    ) -> int:
+        """
+        Return the balance of an account at a given time.
+
+        The balance is read from the balance_after of the account's last
+        transaction before that time, which is a single lookup on the
+        (account_id, created_at) index instead of a sum of every transaction.
+
+        Parameters
+        ----------
+        db: Session
+            Instance of SQLAlchemy session that manages database transactions
+        account: Account
+            The account to return the balance of
+        as_of: datetime
+            The time to return the balance at, naive datetimes are in UTC
+
+        Returns
+        -------
+        int
+            The account's balance in minor units at that time. If it had no
+            transactions by then, the balance before its first transaction, or
+            its current balance if it has never had any.
+
+        """
+        balance = db.scalar(self._balance_as_of_query(account, as_of))
+        if balance is not None:
+            return balance
+        first = db.execute(self._opening_balance_query(account)).first()
+        return self._opening_balance(account, first)
+
+    async def aget_balance_as_of(
+        self,
+        db: AsyncSession,
+        account: Account,
+        as_of: datetime,
+    ) -> int:
+        """Return the balance at a given time, see get_balance_as_of()."""
+        balance = await db.scalar(self._balance_as_of_query(account, as_of))
+        if balance is not None:
+            return balance
+        result = await db.execute(self._opening_balance_query(account))
+        return self._opening_balance(account, result.first())
+
+    def _balance_as_of_query(
+        self,
+        account: Account,
+        as_of: datetime,
+    ) -> sa.Select:
+        """Return a query for the balance after the last transaction by then."""
+        # SQLite stores the timestamps as UTC strings, so compare them in UTC
+        if as_of.tzinfo is None:
+            as_of = as_of.replace(tzinfo=timezone.utc)
+        as_of = as_of.astimezone(timezone.utc)
+        return (
+            sa.select(Transaction.balance_after)
+            .where(
+                Transaction.account_id == account.id,
+                Transaction.created_at <= as_of,
+            )
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(1)
+        )
+
+    def _opening_balance_query(self, account: Account) -> sa.Select:
+        """Return a query for the account's first transaction."""
+        return (
+            sa.select(
+                Transaction.balance_after,
+                Transaction.amount,
+                Transaction.kind,
+            )
+            .where(Transaction.account_id == account.id)
+            .order_by(Transaction.created_at, Transaction.id)
+            .limit(1)
+        )
+
+    def _opening_balance(
+        self,
+        account: Account,
+        first: sa.Row | None,
+    ) -> int:
+        """Return the balance before the first transaction, if there is one."""
+        if first is None:
+            return account.balance
+        balance_after, amount, kind = first
+        if kind == EntryType.credit:
+            return balance_after - amount
+        return balance_after + amount
+
 
 transaction_service = TransactionService(model=Transaction)
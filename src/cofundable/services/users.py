@@ -1,10 +1,12 @@
 """Handle business logic related to Cofundable users."""
 
-from uuid import uuid4
+from typing import Sequence
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from cofundable.models.user import User
 from cofundable.schemas.user import UserRequestSchema, UserUpdateSchema
@@ -19,21 +21,73 @@ from cofundable.services.base import CRUDBase
 class UserCRUD(CRUDBase[User, UserRequestSchema, UserUpdateSchema]):
     """Manage CRUD operations for the User model."""
 
-    def create(
+    def build(self, data: UserRequestSchema) -> User:
+        """Create a new user with an account balance of 0."""
+        user = self.model(id=self.model.new_id(), **jsonable_encoder(data))
+        user.account = self._create_new_account(name=data.handle)
+        return user
+
+    def create_many(
         self,
         db: Session,
         *,
-        data: UserRequestSchema,
-        defer_commit: bool = False,  # optionally defer commit
-    ) -> User:
-        """Create a new user with an account balance of 0."""
-        # create a new user and an associated account
-        user = self.model(id=uuid4(), **jsonable_encoder(data))
-        user.account = self._create_new_account(db, name=data.handle)
-        # optionally commit before returning user
+        data: Sequence[UserRequestSchema],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[User]:
+        """Create many new users along with their accounts, in batches."""
+        accounts = account_service.create_many(
+            db,
+            data=self._new_account_data(data),
+            batch_size=batch_size,
+            defer_commit=True,
+        )
+        users = self.insert_many(
+            db,
+            self._build_rows_with_accounts(data, accounts),
+            batch_size=batch_size,
+        )
+        for user, account in zip(users, accounts, strict=True):
+            set_committed_value(user, "account", account)
+        if defer_commit:
+            return users
+        return self.commit_many(
+            db,
+            users,
+            batch_size=batch_size,
+            options=[selectinload(User.account)],
+        )
+
+    async def acreate_many(
+        self,
+        db: AsyncSession,
+        *,
+        data: Sequence[UserRequestSchema],
+        batch_size: int | None = None,
+        defer_commit: bool = False,
+    ) -> list[User]:
+        """Create many new users, see create_many() for details."""
+        accounts = await account_service.acreate_many(
+            db,
+            data=self._new_account_data(data),
+            batch_size=batch_size,
+            defer_commit=True,
+        )
+        users = await self.ainsert_many(
+            db,
+            self._build_rows_with_accounts(data, accounts),
+            batch_size=batch_size,
+        )
+        for user, account in zip(users, accounts, strict=True):
+            set_committed_value(user, "account", account)
         if defer_commit:
-            return user
-        return self.commit_changes(db, user)
+            return users
+        return await self.acommit_many(
+            db,
+            users,
+            batch_size=batch_size,
+            options=[selectinload(User.account)],
+        )
 
     def get_user_by_handle(self, db: Session, handle: str) -> User | None:
         """
@@ -56,10 +110,40 @@ class UserCRUD(CRUDBase[User, UserRequestSchema, UserUpdateSchema]):
         stmt = select(User).where(User.handle == handle)
         return db.execute(stmt).scalar()
 
-    def _create_new_account(self, db: Session, *, name: str) -> Account:
+    async def aget_user_by_handle(
+        self,
+        db: AsyncSession,
+        handle: str,
+    ) -> User | None:
+        """Find a user by their handle, see get_user_by_handle() for details."""
+        stmt = select(User).where(User.handle == handle)
+        return (await db.execute(stmt)).scalar()
+
+    def _create_new_account(self, *, name: str) -> Account:
         """Create an account for a new user with a balance of 0."""
-        account_data = AccountSchema(name=name, balance=0)
-        return account_service.create(db, data=account_data, defer_commit=True)
+        return account_service.build(AccountSchema(name=name, balance=0))
+
+    def _new_account_data(
+        self,
+        data: Sequence[UserRequestSchema],
+    ) -> list[AccountSchema]:
+        """Return the data for the accounts of new users, each with 0 balance."""
+        return [AccountSchema(name=item.handle, balance=0) for item in data]
+
+    def _build_rows_with_accounts(
+        self,
+        data: Sequence[UserRequestSchema],
+        accounts: list[Account],
+    ) -> list[dict]:
+        """Create the rows for new users that belong to the accounts."""
+        return [
+            row | {"account_id": account.id}
+            for row, account in zip(
+                self.build_rows(data),
+                accounts,
+                strict=True,
+            )
+        ]
 
 
 user_service = UserCRUD(model=User)
@@ -1,16 +1,23 @@
 # pylint: disable=C0103
 """Configure shared fixtures and pytest settings."""
 
-from typing import Generator
+from pathlib import Path
+from typing import Annotated, AsyncGenerator, Callable, Generator
 
 import pytest
 from dynaconf import Dynaconf
+from fastapi import Depends
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-
-from cofundable import config
-from cofundable.api import app
+from sqlalchemy import NullPool, create_engine, event
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import selectinload, sessionmaker, Session
+
+from cofundable import config, instrumentation, pagination
+from cofundable.api import app, create_app
 from cofundable.dependencies import database, auth
 from cofundable.models import User
 from cofundable.services.users import user_service
@@ -40,6 +47,7 @@ def fixture_db(test_config: Dynaconf):
     test_session = sessionmaker(
         autocommit=False,
         autoflush=False,
+        expire_on_commit=False,
         bind=engine,
     )
     with test_session() as session:
@@ -55,7 +63,6 @@ def fixture_scoped_session(session: Session, monkeypatch: pytest.MonkeyPatch):
     def flush_instead_of_commit() -> None:
         """Flush the transaction instead of committing it to allow rollback."""
         session.flush()
-        session.expire_all()
 
     # replace commit() with flush() to enable rolling back test-specific changes
     monkeypatch.setattr(session, "commit", flush_instead_of_commit)
@@ -66,6 +73,27 @@ def fixture_scoped_session(session: Session, monkeypatch: pytest.MonkeyPatch):
     session.rollback()
 
 
+@pytest.fixture(autouse=True)
+def _clear_count_cache() -> Generator[None, None, None]:
+    """Stop the total counts cached by one test from being used by another."""
+    yield
+    pagination.count_cache.clear()
+
+
+@pytest.fixture(name="instrumented_session")
+def fixture_instrumented_session(test_session: Session):
+    """Count the queries made by the test session in X-Query-Count headers."""
+    engine = test_session.get_bind()
+    instrumentation.instrument_engine(engine)
+    yield test_session
+    event.remove(
+        engine,
+        "before_cursor_execute",
+        instrumentation.before_execute,
+    )
+    event.remove(engine, "after_cursor_execute", instrumentation.after_execute)
+
+
 @pytest.fixture(name="curr_user")
 def fixture_current_user(test_session: Session) -> User:
     """Return a users as the current user."""
@@ -86,6 +114,60 @@ def mock_client(test_session: Session, curr_user: User) -> TestClient:
         """Override the get_current_user() dependency for authenticated endpoints."""
         return curr_user
 
+    def override_get_session_factory() -> Callable[[], Session]:
+        """Open sessions on the test session's connection, to see its changes."""
+        return lambda: Session(bind=test_session.connection())
+
     app.dependency_overrides[database.get_db] = override_get_db
+    app.dependency_overrides[database.get_session_factory] = (
+        override_get_session_factory
+    )
     app.dependency_overrides[auth.get_current_user] = override_get_current_user
     return TestClient(app)
+
+
+@pytest.fixture(name="async_session_factory")
+def fixture_async_session_factory(tmp_path: Path) -> async_sessionmaker:
+    """Create an async session factory for a new test db that uses aiosqlite."""
+    # populate a new db file for each test, so that changes don't persist
+    db_path = tmp_path / "mock_async.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        database.init_test_db(session, testing=True)
+        populate_db(session)
+    engine.dispose()
+    # connect to the same file with aiosqlite, without pooling connections
+    # because the test client runs each request in a different event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        poolclass=NullPool,
+    )
+    return database.create_async_session_factory(async_engine)
+
+
+@pytest.fixture(name="async_client")
+def mock_async_client(async_session_factory: async_sessionmaker) -> TestClient:
+    """Create a mock client to test the API served by the async routers."""
+    async_app = create_app(use_async_db=True)
+
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
+        """Override the get_async_db() dependency to use the test db."""
+        async with async_session_factory() as db:
+            yield db
+
+    async def override_get_async_current_user(
+        db: Annotated[AsyncSession, Depends(database.get_async_db)],
+    ) -> User:
+        """Override the get_async_current_user() dependency."""
+        options = [selectinload(User.account)]
+        user = await user_service.aget(db, ALICE, options=options)
+        assert user is not None
+        return user
+
+    overrides = async_app.dependency_overrides
+    overrides[database.get_async_db] = override_get_async_db
+    overrides[database.get_async_session_factory] = (
+        lambda: async_session_factory
+    )
+    overrides[auth.get_async_current_user] = override_get_async_current_user
+    return TestClient(async_app)
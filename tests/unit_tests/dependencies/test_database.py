@@ -1,9 +1,32 @@
 """Test the database connection."""
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import asyncio
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Iterator
+from uuid import uuid4
 
+import pytest
+from dynaconf import Dynaconf
+from fastapi.testclient import TestClient
+from sqlalchemy import (
+    Engine,
+    QueuePool,
+    create_engine,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session, sessionmaker
+
+from cofundable.api import app
+from cofundable.dependencies import database
+from cofundable.models.base import UUIDAuditBase
 from cofundable.models.cause import Cause
+from cofundable.models.tag import Tag
+
+ReplicatedDbs = tuple[Engine, Engine, Callable[[], None]]
 
 
 def test_mock_db_initialized_correctly(test_session: Session):
@@ -17,3 +40,266 @@ def test_mock_db_initialized_correctly(test_session: Session):
     assert cause is not None
     assert cause.name == "Acme"
     assert len(cause.tags) == 2
+
+
+@pytest.mark.parametrize(
+    ("table", "columns", "unique"),
+    [
+        ("cause", ["handle"], True),
+        ("user", ["handle"], True),
+        ("tag", ["name"], True),
+        ("transaction", ["account_id", "created_at"], False),
+        ("bookmark", ["user_id", "created_at"], False),
+        ("cause_tag", ["tag_id", "cause_id"], False),
+    ],
+)
+def test_lookup_columns_are_indexed(
+    test_session: Session,
+    table: str,
+    columns: list[str],
+    unique: bool,  # noqa: FBT001
+):
+    """The columns used to look up records should be indexed."""
+    # execution
+    indexes = inspect(test_session.get_bind()).get_indexes(table)
+    # validation
+    assert any(
+        index["column_names"] == columns and bool(index["unique"]) == unique
+        for index in indexes
+    )
+
+
+class TestCreateDbEngine:
+    """Test the create_db_engine() function."""
+
+    def test_pool_is_configured_from_settings(self, test_config: Dynaconf):
+        """The connection pool should be sized using the pool settings."""
+        # execution
+        engine = database.create_db_engine(test_config.database_url)
+        # validation
+        assert isinstance(engine.pool, QueuePool)
+        assert engine.pool.size() == test_config.db_pool_size
+        engine.dispose()
+
+    @pytest.mark.parametrize(
+        "create_engine_from_url",
+        [database.create_db_engine, database.create_async_db_engine],
+    )
+    def test_unsupported_databases_raise_an_error(
+        self,
+        create_engine_from_url: Callable,
+    ):
+        """Databases without search or upsert statements should be rejected."""
+        # validation - the error is raised before the driver is imported
+        with pytest.raises(ValueError, match="Unsupported database: mysql"):
+            create_engine_from_url(
+                "mysql+aiomysql://user@localhost/cofundable",
+            )
+
+
+class TestAddSqlitePragmas:
+    """Test the add_sqlite_pragmas() function."""
+
+    def test_pragmas_are_set_from_settings(
+        self,
+        tmp_path: Path,
+        test_config: Dynaconf,
+    ):
+        """Each connection should be configured with the pragmas in settings."""
+        # setup
+        pragmas = test_config.sqlite_pragmas
+        # execution
+        engine = database.create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        with engine.connect() as conn:
+            journal_mode = conn.scalar(text("PRAGMA journal_mode"))
+            busy_timeout = conn.scalar(text("PRAGMA busy_timeout"))
+            foreign_keys = conn.scalar(text("PRAGMA foreign_keys"))
+        engine.dispose()
+        # validation
+        assert journal_mode == pragmas.journal_mode
+        assert busy_timeout == pragmas.busy_timeout
+        assert foreign_keys == 1
+
+    def test_pragmas_are_set_for_async_engines(self, tmp_path: Path):
+        """Connections opened by an AsyncEngine should also be configured."""
+        # setup
+        url = f"sqlite+aiosqlite:///{tmp_path / 'wal.db'}"
+
+        async def get_journal_mode() -> str:
+            engine = database.create_async_db_engine(url)
+            async with engine.connect() as conn:
+                journal_mode = await conn.scalar(text("PRAGMA journal_mode"))
+            await engine.dispose()
+            return journal_mode
+
+        # execution
+        journal_mode = asyncio.run(get_journal_mode())
+        # validation
+        assert journal_mode == "wal"
+
+    @pytest.mark.parametrize(
+        "pragmas",
+        [
+            {"locking_mode": "exclusive"},
+            {"journal_mode": "wal; DROP TABLE cause"},
+        ],
+    )
+    def test_invalid_pragmas_raise_an_error(self, pragmas: dict):
+        """Pragmas that aren't supported or have invalid values are rejected."""
+        # setup
+        engine = create_engine("sqlite://")
+        # validation
+        with pytest.raises(ValueError, match="SQLite pragma"):
+            database.add_sqlite_pragmas(engine, pragmas)
+
+
+class TestRoutingSession:
+    """Test the RoutingSession returned by create_session_factory()."""
+
+    @pytest.fixture(name="dbs")
+    def fixture_primary_and_replica(
+        self,
+        tmp_path: Path,
+    ) -> Iterator[ReplicatedDbs]:
+        """Create a primary database and a replica that is synced by copying."""
+        primary_file = tmp_path / "primary.db"
+        replica_file = tmp_path / "replica.db"
+        primary = create_engine(f"sqlite:///{primary_file}")
+        replica = create_engine(f"sqlite:///{replica_file}")
+        UUIDAuditBase.metadata.create_all(bind=primary)
+
+        def replicate() -> None:
+            """Copy the primary database to the replica."""
+            replica.dispose()
+            shutil.copy(primary_file, replica_file)
+
+        replicate()
+        yield primary, replica, replicate
+        primary.dispose()
+        replica.dispose()
+
+    def test_reads_go_to_replica_and_writes_to_primary(
+        self,
+        dbs: ReplicatedDbs,
+    ):
+        """Reads should use the replica until the session writes something."""
+        # setup
+        primary, replica, replicate = dbs
+        factory = database.create_session_factory(primary, [replica])
+        statement = select(Tag).where(Tag.name == "Replicated")
+        # execution - write a tag in one session then read it in another
+        with factory() as db:
+            assert isinstance(db, database.RoutingSession)
+            db.add(Tag(id=uuid4(), name="Replicated"))
+            db.commit()
+            # validation - the same session is pinned to the primary
+            assert db.get_bind(clause=statement) is primary
+            assert db.scalar(statement) is not None
+        with factory() as db:
+            # validation - a new session reads from the replica
+            assert db.get_bind(clause=statement) is replica
+            assert db.scalar(statement) is None
+        # execution - reads should see the tag once it has been replicated
+        replicate()
+        with factory() as db:
+            # validation
+            assert db.scalar(statement) is not None
+
+    def test_select_for_update_goes_to_primary(self, dbs: ReplicatedDbs):
+        """Statements that lock rows for a write should use the primary."""
+        # setup
+        primary, replica, _ = dbs
+        factory = database.create_session_factory(primary, [replica])
+        statement = select(Tag).with_for_update()
+        # execution
+        with factory() as db:
+            bind = db.get_bind(clause=statement)
+        # validation
+        assert bind is primary
+
+    def test_reads_marked_use_primary_go_to_primary(
+        self,
+        dbs: ReplicatedDbs,
+    ):
+        """Reads with the USE_PRIMARY option should see unreplicated writes."""
+        # setup
+        primary, replica, _ = dbs
+        factory = database.create_session_factory(primary, [replica])
+        with factory() as db:
+            db.add(Tag(id=uuid4(), name="Unreplicated"))
+            db.commit()
+        statement = (
+            select(Tag)
+            .where(Tag.name == "Unreplicated")
+            .execution_options(**{database.USE_PRIMARY: True})
+        )
+        # execution
+        with factory() as db:
+            tag = db.scalar(statement)
+            pinned = db.pinned_to_primary
+        # validation - the read doesn't pin the session to the primary
+        assert tag is not None
+        assert not pinned
+
+    def test_without_replicas_uses_plain_session(self, dbs: ReplicatedDbs):
+        """Without replicas every statement should use the primary engine."""
+        # setup
+        primary, _, _ = dbs
+        # execution
+        factory = database.create_session_factory(primary)
+        # validation
+        with factory() as db:
+            assert not isinstance(db, database.RoutingSession)
+            assert db.get_bind() is primary
+
+
+class TestGetDb:
+    """Test the get_db() dependency."""
+
+    def test_session_is_created_by_app_session_factory(self, session: Session):
+        """The session should come from the factory stored on app.state."""
+        # setup
+        factory = sessionmaker(bind=session.get_bind())
+        state = SimpleNamespace(session_factory=factory)
+        request = SimpleNamespace(app=SimpleNamespace(state=state))
+        # execution
+        db = next(database.get_db(request))  # type: ignore[arg-type]
+        # validation
+        assert isinstance(db, Session)
+        assert db.get_bind() is session.get_bind()
+
+
+class TestLifespan:
+    """Test that the API manages the engine in its lifespan."""
+
+    def test_engine_created_once_and_disposed_on_shutdown(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """The engine should be created at startup and disposed at shutdown."""
+        # setup - replace the engine with one whose calls we can track
+        engine = create_engine("sqlite:///mock.db")
+        calls = {"created": 0, "disposed": 0}
+
+        def mock_create_db_engine() -> Engine:
+            calls["created"] += 1
+            return engine
+
+        def mock_dispose() -> None:
+            calls["disposed"] += 1
+
+        monkeypatch.setattr(
+            database,
+            "create_db_engine",
+            mock_create_db_engine,
+        )
+        monkeypatch.setattr(engine, "dispose", mock_dispose)
+        # execution
+        with TestClient(app) as client:
+            client.get("/health-check")
+            client.get("/health-check")
+            factory = app.state.session_factory
+            assert calls == {"created": 1, "disposed": 0}
+        # validation
+        assert factory.kw["bind"] is engine
+        assert calls == {"created": 1, "disposed": 1}
@@ -0,0 +1 @@
+"""Manage unit tests for the cofundable.models package."""
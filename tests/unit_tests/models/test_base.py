@@ -0,0 +1,65 @@
+"""Test the base models and id generation in cofundable/models/base.py."""
+
+from uuid import uuid4
+
+import pytest
+
+from cofundable.models import Tag
+from cofundable.models.base import UUID7_MAX_COUNTER, UUID7Generator
+
+
+class TestUUID7Generator:
+    """Test the UUID7Generator class."""
+
+    def test_ids_are_version_7(self):
+        """The ids should have the version and variant bits of a UUIDv7."""
+        # execution
+        new_id = UUID7Generator()()
+        # validation
+        assert new_id.version == 7
+        assert new_id.variant == "specified in RFC 4122"
+
+    def test_ids_are_monotonic_within_a_millisecond(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Ids created in the same millisecond should still increase."""
+        # setup
+        monkeypatch.setattr("time.time_ns", lambda: 1_700_000_000_000_000_000)
+        generator = UUID7Generator()
+        # execution
+        ids = [generator() for _ in range(UUID7_MAX_COUNTER * 2)]
+        # validation
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_timestamp_is_in_the_first_48_bits(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """The id should start with the Unix timestamp in milliseconds."""
+        # setup
+        monkeypatch.setattr("time.time_ns", lambda: 1_700_000_000_123_456_789)
+        # execution
+        new_id = UUID7Generator()()
+        # validation
+        assert new_id.int >> 80 == 1_700_000_000_123
+
+
+class TestUUIDAuditBase:
+    """Test the UUIDAuditBase.new_id() method."""
+
+    def test_new_ids_use_uuid7_by_default(self):
+        """Models should generate UUIDv7 ids unless configured otherwise."""
+        # validation
+        assert Tag.new_id().version == 7
+
+    def test_id_generator_can_be_replaced(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """A model's id_generator should be used to create its ids."""
+        # setup
+        monkeypatch.setattr(Tag, "id_generator", staticmethod(uuid4))
+        # validation
+        assert Tag.new_id().version == 4
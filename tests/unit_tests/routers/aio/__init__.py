@@ -0,0 +1 @@
+"""Manage unit tests for the cofundable.routers.aio package."""
@@ -0,0 +1,69 @@
+"""Test the async bookmark_router in cofundable/routers/aio/bookmarks.py."""
+
+from fastapi.testclient import TestClient
+
+from tests.utils import test_data
+
+
+class TestListBookmarksForCurrentUser:
+    """Test the GET /user/bookmarks/ endpoint."""
+
+    ENDPOINT = "/user/bookmarks/"
+
+    def test_return_correct_list_of_bookmarks(self, async_client: TestClient):
+        """The bookmarks should be returned with the bookmarked cause."""
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        bookmarks = response.json()["items"]
+        # validation
+        assert response.status_code == 200
+        assert len(bookmarks) == 1
+        assert bookmarks[0]["id"] == str(test_data.ALICE_ACME)
+        assert set(bookmarks[0]["cause"]["tag_names"]) == {"a", "b"}
+
+
+class TestListBookmarksByCursor:
+    """Test the GET /user/bookmarks/cursor endpoint."""
+
+    def test_bookmarks_are_returned_with_causes(
+        self,
+        async_client: TestClient,
+    ):
+        """Bookmarks should be returned along with the bookmarked cause."""
+        # execution
+        response = async_client.get("/user/bookmarks/cursor")
+        items = response.json()["items"]
+        # validation
+        assert response.status_code == 200
+        assert [item["cause"]["handle"] for item in items] == ["acme"]
+
+
+class TestBookmarkCauseForCurrentUser:
+    """Test the PUT /user/bookmarks/{cause} endpoint."""
+
+    def make_endpoint(self, cause: str) -> str:
+        """Create the PUT endpoint to test."""
+        return f"/user/bookmarks/{cause}"
+
+    def test_create_new_bookmark(self, async_client: TestClient):
+        """A new bookmark should be returned with the bookmarked cause."""
+        # execution
+        response = async_client.put(self.make_endpoint("mutual-aid"))
+        response_body = response.json()
+        # validation
+        assert response.status_code == 200
+        assert response_body["cause"]["handle"] == "mutual-aid"
+        assert set(response_body["cause"]["tag_names"]) == {"b", "c"}
+
+    def test_multiple_endpoint_calls_return_same_response(
+        self,
+        async_client: TestClient,
+    ):
+        """Multiple calls should be idempotent and return the same bookmark."""
+        # execution
+        response1 = async_client.put(self.make_endpoint("mutual-aid"))
+        response2 = async_client.put(self.make_endpoint("mutual-aid"))
+        # validation
+        assert response1.status_code == 200
+        assert response2.status_code == 200
+        assert response2.json()["id"] == response1.json()["id"]
@@ -0,0 +1,179 @@
+"""Test the async cause_router in cofundable/routers/aio/causes.py."""
+
+import asyncio
+import json
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from cofundable.dependencies.leaderboard import get_leaderboard
+from cofundable.leaderboard import Leaderboard
+from tests.utils import test_data
+
+
+class TestListCauses:
+    """Test the GET /causes/ endpoint."""
+
+    ENDPOINT = "/causes/"
+
+    def test_return_all_causes_with_their_tags(self, async_client: TestClient):
+        """All causes should be returned along with their tags."""
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        items = response.json()["items"]
+        # validation
+        assert response.status_code == 200
+        assert len(items) == len(test_data.CAUSES)
+        acme = next(item for item in items if item["handle"] == "acme")
+        assert set(acme["tag_names"]) == {"a", "b"}
+
+    def test_change_item_count_with_pagination_params(
+        self,
+        async_client: TestClient,
+    ):
+        """The size param should limit the number of items returned."""
+        # execution
+        response_body = async_client.get(f"{self.ENDPOINT}?size=1").json()
+        # validation
+        assert len(response_body["items"]) == 1
+        assert response_body["links"]["next"] is not None
+
+
+class TestListCausesByCursor:
+    """Test the GET /causes/cursor endpoint."""
+
+    ENDPOINT = "/causes/cursor"
+
+    def test_pages_return_every_cause_once(self, async_client: TestClient):
+        """Following next_cursor should return each cause exactly once."""
+        # setup
+        params: dict = {"size": 2}
+        handles = []
+        # execution
+        while True:
+            body = async_client.get(self.ENDPOINT, params=params).json()
+            handles.extend(item["handle"] for item in body["items"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        # validation
+        assert sorted(handles) == sorted(
+            cause["handle"] for cause in test_data.CAUSES.values()
+        )
+
+
+class TestPostCause:
+    """Test the POST /causes/ endpoint."""
+
+    ENDPOINT = "/causes/"
+
+    def test_return_status_code_201_if_successful(
+        self,
+        async_client: TestClient,
+    ):
+        """A successful response should return the new cause and its tags."""
+        # setup
+        payload = {
+            "name": "Test cause",
+            "description": "This is a test description.",
+            "handle": "testcause",
+            "tags": ["a", "new-tag"],
+        }
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        response_body = response.json()
+        # validation
+        assert response.status_code == 201
+        assert response_body["name"] == "Test cause"
+        assert response_body["created_at"] is not None
+        assert set(response_body["tag_names"]) == {"a", "new-tag"}
+
+
+class TestGetCauseLeaderboard:
+    """Test the GET /causes/leaderboard endpoint."""
+
+    ENDPOINT = "/causes/leaderboard"
+
+    def test_top_causes_are_returned(
+        self,
+        async_client: TestClient,
+        async_session_factory: async_sessionmaker,
+    ):
+        """The causes should be returned from highest balance to lowest."""
+        # setup
+        board = Leaderboard()
+        asyncio.run(board.aresync(async_session_factory))
+        overrides = async_client.app.dependency_overrides
+        overrides[get_leaderboard] = lambda: board
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        ranks = [entry["rank"] for entry in response.json()["causes"]]
+        assert ranks == [1, 2, 2]
+
+
+class TestSearchCauses:
+    """Test the GET /causes/search endpoint."""
+
+    ENDPOINT = "/causes/search"
+
+    def test_causes_are_found_by_their_tags(self, async_client: TestClient):
+        """A cause should be returned if its tags match the search."""
+        # execution
+        response = async_client.get(self.ENDPOINT, params={"q": "b"})
+        # validation
+        assert response.status_code == 200
+        handles = {item["handle"] for item in response.json()["items"]}
+        assert handles == {"acme", "mutual-aid"}
+
+
+class TestImportCauses:
+    """Test the POST /causes/import endpoint."""
+
+    ENDPOINT = "/causes/import"
+
+    def test_causes_are_created_with_their_tags(
+        self,
+        async_client: TestClient,
+    ):
+        """Repeated handles should be reported and the other causes created."""
+        # setup
+        lines = [
+            json.dumps(
+                {"name": "Food bank", "handle": "food-bank", "tags": ["a"]},
+            ),
+            json.dumps({"name": "Food bank 2", "handle": "food-bank"}),
+            json.dumps({"name": "Library", "handle": "library"}),
+        ]
+        # execution
+        response = async_client.post(self.ENDPOINT, content="\n".join(lines))
+        # validation
+        assert response.status_code == 200
+        assert response.json() == {
+            "created": 2,
+            "failed": 1,
+            "errors": [{"line": 2, "error": "handle: food-bank is taken"}],
+        }
+
+
+class TestGetCauseById:
+    """Test the GET /causes/<cause_id> endpoint."""
+
+    def test_return_correct_cause(self, async_client: TestClient):
+        """The correct cause should be returned."""
+        # execution
+        response = async_client.get(f"/causes/{test_data.ACME}")
+        # validation
+        assert response.status_code == 200
+        assert response.json()["id"] == str(test_data.ACME)
+        assert set(response.json()["tag_names"]) == {"a", "b"}
+
+    def test_return_404_if_id_has_no_match(self, async_client: TestClient):
+        """Return 404 if id provided doesn't have a database match."""
+        # execution
+        response = async_client.get(f"/causes/{uuid4()}")
+        # validation
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Cause not found"}
@@ -0,0 +1,42 @@
+"""Test the async tag_router in cofundable/routers/aio/tags.py."""
+
+from fastapi.testclient import TestClient
+
+from tests.utils import test_data
+
+
+class TestListTags:
+    """Test the GET /tags/ endpoint."""
+
+    ENDPOINT = "/tags/"
+
+    def test_tags_are_returned_with_cause_counts(
+        self,
+        async_client: TestClient,
+    ):
+        """Each tag should include the number of causes with it."""
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        counts = {
+            item["name"]: item["cause_count"]
+            for item in response.json()["items"]
+        }
+        assert counts == {
+            tag["name"]: tag["cause_count"] for tag in test_data.TAGS.values()
+        }
+
+
+class TestListCausesByTag:
+    """Test the GET /tags/<tag_name>/causes endpoint."""
+
+    def test_causes_with_the_tag_are_returned(self, async_client: TestClient):
+        """The causes with the tag should be returned, newest first."""
+        # execution
+        response = async_client.get("/tags/c/causes")
+        # validation
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["handle"] for item in body["items"]] == ["mutual-aid"]
+        assert body["next_cursor"] is None
@@ -0,0 +1,266 @@
+"""Test the async transaction_router in cofundable/routers/aio/transactions.py."""
+
+import json
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from tests.utils import test_data
+
+
+class TestListUserTransactions:
+    """Test the GET /user/transactions/ endpoint."""
+
+    ENDPOINT = "/user/transactions/"
+
+    def test_return_transactions_for_current_user(
+        self,
+        async_client: TestClient,
+    ):
+        """The transactions for the current user should be returned."""
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 2
+
+
+class TestListCauseTransactions:
+    """Test the GET /causes/{cause_handle}/transactions/ endpoint."""
+
+    def test_return_transactions_for_cause(self, async_client: TestClient):
+        """The transactions for the cause should be returned."""
+        # execution
+        response = async_client.get("/causes/acme/transactions/")
+        # validation
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+
+    def test_status_code_is_404_when_given_invalid_cause_handle(
+        self,
+        async_client: TestClient,
+    ):
+        """The status code should be 404 if the cause doesn't exist."""
+        # execution
+        response = async_client.get("/causes/fake/transactions/")
+        # validation
+        assert response.status_code == 404
+
+
+class TestListTransactionsByCursor:
+    """Test the cursor paginated transaction endpoints."""
+
+    def test_user_transactions_are_paginated(self, async_client: TestClient):
+        """The current user's transactions should be split across pages."""
+        # execution
+        first = async_client.get(
+            "/user/transactions/cursor",
+            params={"size": 1},
+        )
+        cursor = first.json()["next_cursor"]
+        second = async_client.get(
+            "/user/transactions/cursor",
+            params={"size": 1, "cursor": cursor},
+        )
+        # validation
+        assert first.status_code == 200
+        assert len(first.json()["items"]) == 1
+        assert len(second.json()["items"]) == 1
+        assert second.json()["next_cursor"] is None
+
+    def test_cause_transactions_are_returned(self, async_client: TestClient):
+        """The transactions for the cause should be returned."""
+        # execution
+        response = async_client.get("/causes/acme/transactions/cursor")
+        # validation
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+
+
+class TestTransferShares:
+    """Test the POST /user/transactions/transfer endpoint."""
+
+    ENDPOINT = "/user/transactions/transfer"
+
+    def test_transfer_is_recorded_for_both_accounts(
+        self,
+        async_client: TestClient,
+    ):
+        """The transfer should be added to the transactions for both accounts."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 5.0}
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 202
+        user_txns = async_client.get("/user/transactions/").json()["items"]
+        cause_txns = async_client.get("/causes/mutual-aid/transactions/")
+        assert len(user_txns) == 3
+        assert len(cause_txns.json()["items"]) == 1
+
+    def test_status_code_is_400_if_amount_exceeds_account_balance(
+        self,
+        async_client: TestClient,
+    ):
+        """The status code should be 400 if the user's balance is too low."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 100}
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+
+    def test_status_code_is_404_if_to_account_id_is_invalid(
+        self,
+        async_client: TestClient,
+    ):
+        """The status code should be 404 if the target account doesn't exist."""
+        # setup
+        payload = {"to_account_id": uuid4().hex, "amount": 5}
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 404
+
+    def test_status_code_is_400_if_to_account_is_the_users_own(
+        self,
+        async_client: TestClient,
+    ):
+        """Users can't transfer shares to their own account."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_ALICE.hex, "amount": 1}
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+        assert "own account" in response.json()["detail"]
+
+
+class TestTransferSharesIdempotently:
+    """Test POST /user/transactions/transfer with an Idempotency-Key header."""
+
+    ENDPOINT = "/user/transactions/transfer"
+
+    def test_retries_return_the_original_outcome(
+        self,
+        async_client: TestClient,
+    ):
+        """A retry should return the same transactions without a new transfer."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        headers = {"Idempotency-Key": "transfer-1"}
+        # execution
+        first = async_client.post(self.ENDPOINT, json=payload, headers=headers)
+        retry = async_client.post(self.ENDPOINT, json=payload, headers=headers)
+        # validation
+        assert first.status_code == retry.status_code == 202
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        user_txns = async_client.get("/user/transactions/").json()["items"]
+        assert len(user_txns) == 3
+
+
+class TestTransferSharesInBulk:
+    """Test the POST /user/transactions/transfers endpoint."""
+
+    ENDPOINT = "/user/transactions/transfers"
+
+    def test_transfers_are_recorded_for_every_account(
+        self,
+        async_client: TestClient,
+    ):
+        """Each transfer should be added to the transactions of both accounts."""
+        # setup
+        payload = [
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1},
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 2},
+        ]
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 202
+        user_txns = async_client.get("/user/transactions/").json()["items"]
+        cause_txns = async_client.get("/causes/mutual-aid/transactions/")
+        assert len(user_txns) == 4
+        assert len(cause_txns.json()["items"]) == 2
+
+    def test_status_code_is_400_if_total_exceeds_account_balance(
+        self,
+        async_client: TestClient,
+    ):
+        """The status code should be 400 if the user's balance is too low."""
+        # setup
+        payload = [
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 50},
+            {"to_account_id": test_data.ACCOUNT_BOB.hex, "amount": 50},
+        ]
+        # execution
+        response = async_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+        user_txns = async_client.get("/user/transactions/").json()["items"]
+        assert len(user_txns) == 2
+
+
+class TestExportTransactions:
+    """Test the GET /user/transactions/export endpoint."""
+
+    def test_ndjson_export_has_every_transaction(
+        self,
+        async_client: TestClient,
+    ):
+        """Each line should be one of the user's transactions."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        async_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        response = async_client.get("/user/transactions/export")
+        # validation
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        user_txns = async_client.get("/user/transactions/").json()["items"]
+        assert len(rows) == len(user_txns) == 3
+        assert {row["amount"] for row in rows} == {10.0, 5.0, 1.0}
+
+
+class TestGetBalance:
+    """Test the GET /causes/{cause_handle}/balance endpoint."""
+
+    def test_balance_as_of_now_matches_current_balance(
+        self,
+        async_client: TestClient,
+    ):
+        """The balance as of now should be the balance after the last transfer."""
+        # execution
+        current = async_client.get("/causes/acme/balance").json()
+        as_of = async_client.get(
+            "/causes/acme/balance",
+            params={"as_of": current["as_of"]},
+        )
+        # validation
+        assert as_of.status_code == 200
+        assert as_of.json()["balance"] == current["balance"]
+
+
+class TestGetCauseStats:
+    """Test the GET /causes/{cause_handle}/stats endpoint."""
+
+    ENDPOINT = "/causes/mutual-aid/stats"
+
+    def test_transfers_are_included_in_the_stats(
+        self,
+        async_client: TestClient,
+    ):
+        """Each transfer to the cause should be counted on the day it's made."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1.5}
+        for _ in range(2):
+            async_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        totals = response.json()["totals"]
+        assert totals["credit_total"] == 3.0
+        assert totals["credit_count"] == 2
+        assert len(response.json()["days"]) == 1
@@ -0,0 +1,87 @@
+"""Test the async user_router in cofundable/routers/aio/users.py."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from tests.utils import test_data
+
+
+class TestGetCurrentLoggedInUser:
+    """Test the GET /user/ endpoint."""
+
+    ENDPOINT = "/user/"
+
+    def test_return_current_user(self, async_client: TestClient):
+        """The current user should be returned."""
+        # execution
+        response = async_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        assert response.json()["id"] == str(test_data.ALICE)
+
+
+class TestCreateUser:
+    """Test the POST /users/ endpoint."""
+
+    ENDPOINT = "/users/"
+
+    def test_status_code_201_when_user_is_created(
+        self,
+        async_client: TestClient,
+    ):
+        """Status code should be 201 when the user is created."""
+        # setup
+        data = {
+            "name": "Test User",
+            "bio": "Test bio",
+            "handle": "testuser",
+        }
+        # execution
+        response = async_client.post(self.ENDPOINT, json=data)
+        # validation
+        assert response.status_code == 201
+        assert response.json()["handle"] == "testuser"
+
+    def test_status_code_422_when_required_field_is_missing(
+        self,
+        async_client: TestClient,
+    ):
+        """Status code should be 422 when a required field is missing."""
+        # setup
+        data = {"bio": "Test bio", "handle": "testuser"}  # missing name
+        # execution
+        response = async_client.post(self.ENDPOINT, json=data)
+        # validation
+        assert response.status_code == 422
+
+
+class TestImportUsers:
+    """Test the POST /users/import endpoint."""
+
+    ENDPOINT = "/users/import"
+
+    def test_valid_rows_are_created_and_errors_reported(
+        self,
+        async_client: TestClient,
+    ):
+        """Each invalid row should be reported without blocking the others."""
+        # setup
+        lines = [
+            json.dumps({"name": "Carol", "handle": "carol"}),
+            "",
+            "not json",
+            json.dumps({"name": "Dave"}),
+            json.dumps({"name": "Alice again", "handle": "alice"}),
+            json.dumps({"name": "Erin", "handle": "erin"}),
+        ]
+        # execution
+        response = async_client.post(self.ENDPOINT, content="\n".join(lines))
+        # validation
+        assert response.status_code == 200
+        report = response.json()
+        assert report["created"] == 2
+        assert report["failed"] == 3
+        assert [error["line"] for error in report["errors"]] == [3, 4, 5]
+        assert report["errors"][1]["error"].startswith("handle:")
+        assert "taken" in report["errors"][2]["error"]
@@ -40,6 +40,47 @@ class TestListBookmarksForCurrentUser:
         assert isinstance(response_body.get("items"), list)
         assert isinstance(response_body.get("links"), dict)
 
+    def test_query_count_is_constant_per_page(
+        self,
+        instrumented_session: Session,
+        test_client: TestClient,
+    ):
+        """Causes and tags should be loaded for the page instead of per row."""
+        # setup - bookmark more causes so that the page has several rows
+        for cause in ("mutual-aid", "cofundable"):
+            test_client.put(f"{self.ENDPOINT}{cause}")
+        instrumented_session.expire_all()
+        # execution
+        small_page = test_client.get(self.ENDPOINT, params={"size": 1})
+        instrumented_session.expire_all()
+        full_page = test_client.get(self.ENDPOINT, params={"size": 50})
+        # validation
+        assert len(full_page.json()["items"]) == 3
+        assert small_page.headers["X-Query-Count"] == (
+            full_page.headers["X-Query-Count"]
+        )
+
+
+class TestListBookmarksByCursor:
+    """Test the GET /user/bookmarks/cursor endpoint."""
+
+    ENDPOINT = "/user/bookmarks/cursor"
+
+    def test_newest_bookmarks_are_returned_first(
+        self,
+        test_client: TestClient,
+    ):
+        """Bookmarks should be returned from newest to oldest."""
+        # setup
+        test_client.put("/user/bookmarks/cofundable")
+        # execution
+        response = test_client.get(self.ENDPOINT, params={"size": 1})
+        body = response.json()
+        # validation
+        assert response.status_code == 200
+        assert body["items"][0]["cause"]["handle"] == "cofundable"
+        assert body["next_cursor"] is not None
+
 
 class TestBookmarkCauseForCurrentUser:
     """Test the PUT /user/bookmarks/{cause} endpoint."""
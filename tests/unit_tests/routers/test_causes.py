@@ -1,9 +1,16 @@
 """Test the causes_router in cofundable/routers/causes.py."""
 
+import json
+from typing import Generator
 from uuid import UUID, uuid4
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from cofundable import pagination
+from cofundable.dependencies.leaderboard import get_leaderboard
+from cofundable.leaderboard import Leaderboard
 from tests.utils import test_data
 
 
@@ -44,6 +51,85 @@ class TestListCauses:
         assert response_body["links"]["next"] is not None
         assert response_body["links"]["prev"] is None
 
+    @pytest.mark.usefixtures("instrumented_session")
+    def test_query_count_is_constant_per_page(self, test_client: TestClient):
+        """Tags should be loaded for the page instead of once per cause."""
+        # execution
+        small_page = test_client.get(self.ENDPOINT, params={"size": 1})
+        pagination.count_cache.clear()
+        full_page = test_client.get(self.ENDPOINT, params={"size": 50})
+        # validation
+        assert len(full_page.json()["items"]) > 1
+        assert small_page.headers["X-Query-Count"] == (
+            full_page.headers["X-Query-Count"]
+        )
+
+    @pytest.mark.usefixtures("instrumented_session")
+    def test_total_is_skipped_if_include_total_is_false(
+        self,
+        test_client: TestClient,
+    ):
+        """The total shouldn't be counted if include_total=false is passed."""
+        # execution
+        counted = test_client.get(self.ENDPOINT, params={"size": 1})
+        pagination.count_cache.clear()
+        skipped = test_client.get(
+            self.ENDPOINT,
+            params={"size": 1, "include_total": False},
+        )
+        # validation
+        output = skipped.json()
+        assert output["total"] is None
+        assert output["links"]["last"] is None
+        assert output["links"]["next"] is not None
+        assert int(skipped.headers["X-Query-Count"]) == (
+            int(counted.headers["X-Query-Count"]) - 1
+        )
+
+    @pytest.mark.usefixtures("instrumented_session")
+    def test_total_is_cached_between_requests(self, test_client: TestClient):
+        """The total should only be counted once within the cache's TTL."""
+        # execution
+        first = test_client.get(self.ENDPOINT)
+        second = test_client.get(self.ENDPOINT)
+        # validation
+        assert first.json()["total"] == second.json()["total"]
+        assert int(second.headers["X-Query-Count"]) == (
+            int(first.headers["X-Query-Count"]) - 1
+        )
+
+
+class TestListCausesByCursor:
+    """Test the GET /causes/cursor endpoint."""
+
+    ENDPOINT = "/causes/cursor"
+
+    def test_pages_return_every_cause_once(self, test_client: TestClient):
+        """Following next_cursor should return each cause exactly once."""
+        # setup
+        params: dict = {"size": 1}
+        handles = []
+        # execution
+        while True:
+            response = test_client.get(self.ENDPOINT, params=params)
+            assert response.status_code == 200
+            body = response.json()
+            handles.extend(item["handle"] for item in body["items"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        # validation
+        assert sorted(handles) == sorted(
+            cause["handle"] for cause in test_data.CAUSES.values()
+        )
+
+    def test_return_400_if_cursor_is_invalid(self, test_client: TestClient):
+        """A cursor that wasn't issued by the API should be rejected."""
+        # execution
+        response = test_client.get(self.ENDPOINT, params={"cursor": "a.b"})
+        # validation
+        assert response.status_code == 400
+
 
 class TestPostCause:
     """Test the POST /causes/ endpoint."""
@@ -69,6 +155,29 @@ class TestPostCause:
         assert response.status_code == 201
         assert response_body["name"] == "Test cause"
 
+    @pytest.mark.usefixtures("instrumented_session")
+    def test_no_queries_are_made_after_the_inserts(
+        self,
+        test_client: TestClient,
+    ):
+        """The new cause shouldn't be selected again to return it."""
+        # setup - "a" exists and "new-tag" doesn't
+        payload = {
+            "name": "Test",
+            "handle": "testcause",
+            "tags": ["a", "new-tag"],
+        }
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation - upsert and select the tags, update their cause counts,
+        # then insert the account, the cause and the cause_tag rows
+        assert response.status_code == 201
+        assert {tag["name"] for tag in response.json()["tags"]} == {
+            "a",
+            "new-tag",
+        }
+        assert response.headers["X-Query-Count"] == "6"
+
     def test_return_status_code_422_if_missing_required_field(
         self,
         test_client: TestClient,
@@ -101,6 +210,116 @@ class TestPostCause:
         assert response_body["description"] is None
 
 
+class TestGetCauseLeaderboard:
+    """Test the GET /causes/leaderboard endpoint."""
+
+    ENDPOINT = "/causes/leaderboard"
+
+    @pytest.fixture(name="board")
+    def fixture_board(
+        self,
+        test_client: TestClient,
+        test_session: Session,
+    ) -> Generator[Leaderboard, None, None]:
+        """Serve a leaderboard loaded from the test session."""
+        board = Leaderboard()
+        board.load(test_session)
+        overrides = test_client.app.dependency_overrides
+        overrides[get_leaderboard] = lambda: board
+        yield board
+        del overrides[get_leaderboard]
+
+    @pytest.mark.usefixtures("board", "instrumented_session")
+    def test_top_causes_and_rank_are_returned(self, test_client: TestClient):
+        """The causes should be ranked without querying the database."""
+        # execution
+        response = test_client.get(
+            self.ENDPOINT,
+            params={"limit": 1, "cause_handle": "mutual-aid"},
+        )
+        # validation
+        assert response.status_code == 200
+        body = response.json()
+        assert [entry["handle"] for entry in body["causes"]] == ["acme"]
+        assert body["causes"][0]["balance"] == 5.0
+        assert body["cause"]["rank"] == 2
+        assert response.headers["X-Query-Count"] == "0"
+
+    def test_status_code_is_404_for_invalid_cause(
+        self,
+        test_client: TestClient,
+        board: Leaderboard,
+    ):
+        """The status code should be 404 if the cause isn't ranked."""
+        # execution
+        response = test_client.get(
+            self.ENDPOINT,
+            params={"cause_handle": "fake"},
+        )
+        # validation
+        assert len(board) == 3
+        assert response.status_code == 404
+
+
+class TestSearchCauses:
+    """Test the GET /causes/search endpoint."""
+
+    ENDPOINT = "/causes/search"
+
+    def test_matching_causes_are_paginated(self, test_client: TestClient):
+        """The causes that match every word should be returned a page at a time."""
+        # execution
+        response = test_client.get(
+            self.ENDPOINT,
+            params={"q": "local org", "size": 1},
+        )
+        # validation
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 2
+        assert len(body["items"]) == 1
+        assert body["items"][0]["handle"] in {"acme", "mutual-aid"}
+
+    def test_status_code_is_422_without_a_search(
+        self,
+        test_client: TestClient,
+    ):
+        """An empty search should be rejected."""
+        # execution
+        response = test_client.get(self.ENDPOINT, params={"q": ""})
+        # validation
+        assert response.status_code == 422
+
+
+class TestImportCauses:
+    """Test the POST /causes/import endpoint."""
+
+    ENDPOINT = "/causes/import"
+
+    def test_causes_are_created_with_their_tags(
+        self,
+        test_client: TestClient,
+    ):
+        """Repeated handles should be reported and the other causes created."""
+        # setup
+        lines = [
+            json.dumps(
+                {"name": "Food bank", "handle": "food-bank", "tags": ["a"]},
+            ),
+            json.dumps({"name": "Food bank 2", "handle": "food-bank"}),
+            json.dumps({"name": "Library", "handle": "library"}),
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, content="\n".join(lines))
+        # validation
+        assert response.status_code == 200
+        assert response.json() == {
+            "created": 2,
+            "failed": 1,
+            "errors": [{"line": 2, "error": "handle: food-bank is taken"}],
+        }
+
+
 class TestGetCauseById:
     """Test the GET /causes/<cause_id> endpoint."""
 
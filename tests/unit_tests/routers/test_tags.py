@@ -0,0 +1,66 @@
+"""Test the tag_router in cofundable/routers/tags.py."""
+
+from fastapi.testclient import TestClient
+
+from tests.utils import test_data
+
+
+class TestListTags:
+    """Test the GET /tags/ endpoint."""
+
+    ENDPOINT = "/tags/"
+
+    def test_tags_are_returned_with_cause_counts(
+        self,
+        test_client: TestClient,
+    ):
+        """Each tag should include the number of causes with it."""
+        # execution
+        response = test_client.get(self.ENDPOINT)
+        # validation
+        assert response.status_code == 200
+        counts = {
+            item["name"]: item["cause_count"]
+            for item in response.json()["items"]
+        }
+        assert counts == {
+            tag["name"]: tag["cause_count"] for tag in test_data.TAGS.values()
+        }
+
+
+class TestListCausesByTag:
+    """Test the GET /tags/<tag_name>/causes endpoint."""
+
+    def endpoint(self, tag_name: str) -> str:
+        """Make the endpoint path to test."""
+        return f"/tags/{tag_name}/causes"
+
+    def test_pages_return_every_cause_with_the_tag(
+        self,
+        test_client: TestClient,
+    ):
+        """Following next_cursor should return each cause with the tag once."""
+        # setup
+        params: dict = {"size": 1}
+        handles = []
+        # execution
+        while True:
+            response = test_client.get(self.endpoint("b"), params=params)
+            assert response.status_code == 200
+            body = response.json()
+            handles.extend(item["handle"] for item in body["items"])
+            if body["next_cursor"] is None:
+                break
+            params["cursor"] = body["next_cursor"]
+        # validation
+        assert sorted(handles) == ["acme", "mutual-aid"]
+
+    def test_status_code_is_404_for_invalid_tag(
+        self,
+        test_client: TestClient,
+    ):
+        """A tag that doesn't exist should return a 404."""
+        # execution
+        response = test_client.get(self.endpoint("fake"))
+        # validation
+        assert response.status_code == 404
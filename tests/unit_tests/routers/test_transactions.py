@@ -1,6 +1,7 @@
 """Test the transaction router."""
 
-from decimal import Decimal
+import csv
+import json
 from uuid import uuid4
 
 from fastapi.testclient import TestClient
@@ -8,6 +9,8 @@ from sqlalchemy.orm import Session
 
 from cofundable.models import Account
 from cofundable.models import User
+from cofundable.models.base import utc_now
+from cofundable.schemas.base import MINOR_UNITS_PER_SHARE, to_shares
 from tests.utils import test_data
 
 
@@ -53,6 +56,47 @@ class TestListCauseTransactions:
         assert response.status_code == 404
 
 
+class TestListTransactionsByCursor:
+    """Test the cursor paginated transaction endpoints."""
+
+    def test_user_transactions_are_paginated(self, test_client: TestClient):
+        """The current user's transactions should be split across pages."""
+        # execution
+        first = test_client.get(
+            "/user/transactions/cursor",
+            params={"size": 1},
+        )
+        cursor = first.json()["next_cursor"]
+        second = test_client.get(
+            "/user/transactions/cursor",
+            params={"size": 1, "cursor": cursor},
+        )
+        # validation
+        assert first.status_code == 200
+        assert len(first.json()["items"]) == 1
+        assert len(second.json()["items"]) == 1
+        assert second.json()["next_cursor"] is None
+
+    def test_cause_transactions_return_404_for_invalid_cause(
+        self,
+        test_client: TestClient,
+    ):
+        """The status code should be 404 if the cause doesn't exist."""
+        # execution
+        response = test_client.get("/causes/fake/transactions/cursor")
+        # validation
+        assert response.status_code == 404
+
+    def test_cause_transactions_are_returned(self, test_client: TestClient):
+        """The transactions for the cause should be returned."""
+        # execution
+        response = test_client.get("/causes/acme/transactions/cursor")
+        # validation
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+        assert response.json()["next_cursor"] is None
+
+
 class TestTransferShares:
     """Test the GET /causes/ endpoint."""
 
@@ -77,7 +121,9 @@ class TestTransferShares:
         """The status code should be 422 if the user's balance is too low."""
         # setup
         transfer_amount = 100
-        assert curr_user.account.balance < transfer_amount
+        assert (
+            curr_user.account.balance < transfer_amount * MINOR_UNITS_PER_SHARE
+        )
         payload = {
             "to_account_id": test_data.ACCOUNT_AID.hex,
             "amount": transfer_amount,
@@ -108,6 +154,22 @@ class TestTransferShares:
         assert response.status_code == 404
         assert response.json()["detail"] == wanted
 
+    def test_status_code_is_400_if_to_account_is_the_users_own(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """Users can't transfer shares to their own account."""
+        # setup
+        balance_old = curr_user.account.balance
+        payload = {"to_account_id": curr_user.account.id.hex, "amount": 1}
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+        assert "own account" in response.json()["detail"]
+        assert curr_user.account.balance == balance_old
+
     def test_transfer_updates_account_balances(
         self,
         test_session: Session,
@@ -118,8 +180,7 @@ class TestTransferShares:
         # setup - create the payload
         acme_account = test_session.get(Account, test_data.ACCOUNT_AID)
         assert acme_account is not None
-        amount = 5.0
-        payload = {"to_account_id": acme_account.id.hex, "amount": amount}
+        payload = {"to_account_id": acme_account.id.hex, "amount": 0.25}
         # setup - get the current account balances for the source and target
         src_balance_old = curr_user.account.balance
         tgt_balance_old = acme_account.balance
@@ -129,5 +190,330 @@ class TestTransferShares:
         assert response.status_code == 202
         src_balance_new = curr_user.account.balance
         tgt_balance_new = acme_account.balance
-        assert src_balance_old - Decimal(amount) == src_balance_new
-        assert tgt_balance_old + Decimal(amount) == tgt_balance_new
+        # amounts are stored as integer minor units, i.e. 0.25 shares is 25
+        assert src_balance_old - 25 == src_balance_new
+        assert tgt_balance_old + 25 == tgt_balance_new
+
+    def test_status_code_is_422_if_amount_is_too_precise(
+        self,
+        test_client: TestClient,
+    ):
+        """Amounts can't be split into fractions of a minor unit."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 0.001}
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 422
+
+
+class TestTransferSharesIdempotently:
+    """Test POST /user/transactions/transfer with an Idempotency-Key header."""
+
+    ENDPOINT = "/user/transactions/transfer"
+
+    def test_retries_return_the_original_outcome(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """The transfer should only be made once, however often it's sent."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        headers = {"Idempotency-Key": "transfer-1"}
+        balance_old = curr_user.account.balance
+        # execution
+        first = test_client.post(
+            self.ENDPOINT,
+            json=payload,
+            headers=headers,
+        )
+        retry = test_client.post(
+            self.ENDPOINT,
+            json=payload,
+            headers=headers,
+        )
+        # validation
+        assert first.status_code == retry.status_code == 202
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert curr_user.account.balance == balance_old - MINOR_UNITS_PER_SHARE
+
+    def test_status_code_is_422_if_key_is_reused(
+        self,
+        test_client: TestClient,
+    ):
+        """A key can't be sent again with a different request."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        headers = {"Idempotency-Key": "transfer-2"}
+        other = {**payload, "amount": 2}
+        # execution
+        test_client.post(self.ENDPOINT, json=payload, headers=headers)
+        response = test_client.post(self.ENDPOINT, json=other, headers=headers)
+        # validation
+        assert response.status_code == 422
+        assert "Idempotency-Key" in response.json()["detail"]
+
+
+class TestTransferSharesInBulk:
+    """Test the POST /user/transactions/transfers endpoint."""
+
+    ENDPOINT = "/user/transactions/transfers"
+
+    def test_every_transfer_is_made(
+        self,
+        test_session: Session,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """Each recipient should be credited and the total debited once."""
+        # setup
+        recipients = [test_data.ACCOUNT_AID, test_data.ACCOUNT_BOB]
+        accounts = [test_session.get(Account, id_) for id_ in recipients]
+        balances_old = [account.balance for account in accounts if account]
+        src_balance_old = curr_user.account.balance
+        payload = [
+            {"to_account_id": account_id.hex, "amount": 2}
+            for account_id in recipients
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 202
+        assert curr_user.account.balance == src_balance_old - 400
+        assert [account.balance for account in accounts if account] == [
+            balance + 200 for balance in balances_old
+        ]
+
+    def test_status_code_is_400_if_total_exceeds_account_balance(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """Transfers that are each affordable can't exceed the balance in total."""
+        # setup
+        amount = float(to_shares(curr_user.account.balance))
+        payload = [
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": amount},
+            {"to_account_id": test_data.ACCOUNT_BOB.hex, "amount": amount},
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+        assert "doesn't have enough" in response.json()["detail"]
+
+    def test_status_code_is_404_if_any_account_is_invalid(
+        self,
+        test_client: TestClient,
+    ):
+        """The missing account ids should be listed in the response."""
+        # setup
+        fake_account = uuid4()
+        payload = [
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1},
+            {"to_account_id": fake_account.hex, "amount": 1},
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        wanted = f"No account found with id: {fake_account.hex}"
+        assert response.status_code == 404
+        assert response.json()["detail"] == wanted
+
+    def test_status_code_is_400_if_any_account_is_the_users_own(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """Users can't include their own account in the transfers."""
+        # setup
+        balance_old = curr_user.account.balance
+        payload = [
+            {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1},
+            {"to_account_id": curr_user.account.id.hex, "amount": 1},
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, json=payload)
+        # validation
+        assert response.status_code == 400
+        assert "own account" in response.json()["detail"]
+        assert curr_user.account.balance == balance_old
+
+    def test_status_code_is_422_for_empty_or_negative_transfers(
+        self,
+        test_client: TestClient,
+    ):
+        """An empty list or a transfer that isn't positive should be rejected."""
+        # setup
+        negative = [{"to_account_id": test_data.ACCOUNT_AID.hex, "amount": -1}]
+        # validation
+        assert test_client.post(self.ENDPOINT, json=[]).status_code == 422
+        assert (
+            test_client.post(self.ENDPOINT, json=negative).status_code == 422
+        )
+
+
+class TestExportTransactions:
+    """Test the GET /user/transactions/export and cause export endpoints."""
+
+    def test_ndjson_export_has_every_transaction(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """Each line should be one of the user's transactions, in shares."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 0.5}
+        test_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        response = test_client.get("/user/transactions/export")
+        # validation
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        transactions = curr_user.account.transactions
+        assert {row["id"] for row in rows} == {
+            str(txn.id) for txn in transactions
+        }
+        assert {row["amount"] for row in rows} == {
+            float(to_shares(txn.amount)) for txn in transactions
+        }
+
+    def test_csv_export_has_a_header_and_a_row_per_transaction(
+        self,
+        test_client: TestClient,
+    ):
+        """The cause's transactions should be exported as CSV."""
+        # execution
+        response = test_client.get(
+            "/causes/acme/transactions/export",
+            params={"format": "csv"},
+        )
+        # validation
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert (
+            "acme-transactions.csv" in response.headers["content-disposition"]
+        )
+        rows = list(csv.DictReader(response.text.splitlines()))
+        assert [row["id"] for row in rows] == [str(test_data.ACME_FROM_ALICE)]
+        assert rows[0]["amount"] == "5.0"
+        assert rows[0]["kind"] == "credit"
+
+    def test_status_code_is_404_for_invalid_cause(
+        self,
+        test_client: TestClient,
+    ):
+        """The status code should be 404 if the cause doesn't exist."""
+        # execution
+        response = test_client.get("/causes/fake/transactions/export")
+        # validation
+        assert response.status_code == 404
+
+    def test_status_code_is_422_for_invalid_format(
+        self,
+        test_client: TestClient,
+    ):
+        """Only the supported formats should be accepted."""
+        # execution
+        response = test_client.get(
+            "/user/transactions/export",
+            params={"format": "xml"},
+        )
+        # validation
+        assert response.status_code == 422
+
+
+class TestGetBalance:
+    """Test the GET /user/balance and /causes/{cause_handle}/balance endpoints."""
+
+    def test_balance_as_of_a_time_before_a_transfer(
+        self,
+        test_client: TestClient,
+        curr_user: User,
+    ):
+        """The balance from before a transfer shouldn't include it."""
+        # setup
+        balance_old = curr_user.account.balance
+        as_of = utc_now().isoformat()
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        test_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        current = test_client.get("/user/balance")
+        historical = test_client.get("/user/balance", params={"as_of": as_of})
+        # validation
+        assert current.status_code == historical.status_code == 200
+        assert current.json()["balance"] == float(to_shares(balance_old)) - 1
+        assert historical.json()["balance"] == float(to_shares(balance_old))
+
+    def test_cause_balance_is_returned(self, test_client: TestClient):
+        """The balance of the cause's account should be returned."""
+        # execution
+        response = test_client.get("/causes/acme/balance")
+        # validation
+        assert response.status_code == 200
+        assert response.json()["account_id"] == str(test_data.ACCOUNT_ACME)
+
+    def test_status_code_is_404_for_invalid_cause(
+        self,
+        test_client: TestClient,
+    ):
+        """The status code should be 404 if the cause doesn't exist."""
+        # execution
+        response = test_client.get("/causes/fake/balance")
+        # validation
+        assert response.status_code == 404
+
+
+class TestGetCauseStats:
+    """Test the GET /causes/{cause_handle}/stats endpoint."""
+
+    ENDPOINT = "/causes/mutual-aid/stats"
+
+    def test_transfers_are_included_in_the_stats(
+        self,
+        test_client: TestClient,
+    ):
+        """Each transfer to the cause should be counted on the day it's made."""
+        # setup
+        today = utc_now().date().isoformat()
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1.5}
+        for _ in range(2):
+            test_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        response = test_client.get(self.ENDPOINT, params={"start": today})
+        # validation
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["account_id"] == str(test_data.ACCOUNT_AID)
+        assert stats["totals"]["credit_total"] == 3.0
+        assert stats["totals"]["credit_count"] == 2
+        assert [day["day"] for day in stats["days"]] == [today]
+
+    def test_days_outside_the_range_are_excluded(
+        self,
+        test_client: TestClient,
+    ):
+        """No days should be returned if none are in the range."""
+        # setup
+        payload = {"to_account_id": test_data.ACCOUNT_AID.hex, "amount": 1}
+        test_client.post("/user/transactions/transfer", json=payload)
+        # execution
+        response = test_client.get(self.ENDPOINT, params={"end": "2000-01-01"})
+        # validation
+        assert response.status_code == 200
+        assert response.json()["days"] == []
+        assert response.json()["totals"]["credit_count"] == 0
+
+    def test_status_code_is_404_for_invalid_cause(
+        self,
+        test_client: TestClient,
+    ):
+        """The status code should be 404 if the cause doesn't exist."""
+        # execution
+        response = test_client.get("/causes/fake/stats")
+        # validation
+        assert response.status_code == 404
@@ -1,6 +1,12 @@
 """Test the user router in cofundable/routers/users.py."""
 
+import json
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from cofundable.services.users import user_service
 
 
 class TestGetCurrentLoggedInUser:
@@ -40,6 +46,21 @@ class TestCreateUser:
         # validation
         assert response.status_code == 201
 
+    @pytest.mark.usefixtures("instrumented_session")
+    def test_no_queries_are_made_after_the_inserts(
+        self,
+        test_client: TestClient,
+    ):
+        """The new user shouldn't be selected again to return it."""
+        # setup
+        data = {"name": "Test User", "handle": "testuser"}
+        # execution
+        response = test_client.post(self.ENDPOINT, json=data)
+        # validation - one INSERT each for the account and the user
+        assert response.status_code == 201
+        assert response.json()["handle"] == "testuser"
+        assert response.headers["X-Query-Count"] == "2"
+
     def test_status_code_422_when_required_field_is_missing(
         self,
         test_client: TestClient,
@@ -54,3 +75,53 @@ class TestCreateUser:
         response = test_client.post(self.ENDPOINT, json=data)
         # validation
         assert response.status_code == 422
+
+
+class TestImportUsers:
+    """Test the POST /users/import endpoint."""
+
+    ENDPOINT = "/users/import"
+
+    def test_valid_rows_are_created_and_errors_reported(
+        self,
+        test_client: TestClient,
+    ):
+        """Each invalid row should be reported without blocking the others."""
+        # setup
+        lines = [
+            json.dumps({"name": "Carol", "handle": "carol"}),
+            "",
+            "not json",
+            json.dumps({"name": "Dave"}),
+            json.dumps({"name": "Alice again", "handle": "alice"}),
+            json.dumps({"name": "Erin", "handle": "erin"}),
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, content="\n".join(lines))
+        # validation
+        assert response.status_code == 200
+        report = response.json()
+        assert report["created"] == 2
+        assert report["failed"] == 3
+        assert [error["line"] for error in report["errors"]] == [3, 4, 5]
+        assert report["errors"][1]["error"].startswith("handle:")
+        assert "taken" in report["errors"][2]["error"]
+
+    def test_each_user_is_created_with_an_account(
+        self,
+        test_client: TestClient,
+        test_session: Session,
+    ):
+        """The imported users should be committed along with their accounts."""
+        # setup
+        lines = [
+            json.dumps({"name": f"User {i}", "handle": f"user-{i}"})
+            for i in range(5)
+        ]
+        # execution
+        response = test_client.post(self.ENDPOINT, content="\n".join(lines))
+        # validation
+        assert response.status_code == 200
+        user = user_service.get_user_by_handle(test_session, "user-4")
+        assert user is not None
+        assert user.account.balance == 0
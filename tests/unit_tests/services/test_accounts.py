@@ -1,10 +1,26 @@
 """Test the cofundable.services.accounts module."""
 
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
+from cofundable.dependencies import database
+from cofundable.errors import (
+    AccountNotFoundError,
+    InsufficientBalanceError,
+    SelfTransferError,
+)
+from cofundable.models import Transaction, UUIDAuditBase
 from cofundable.models.account import Account
+from cofundable.schemas.base import MINOR_UNITS_PER_SHARE, to_shares
+from cofundable.schemas.transaction import (
+    EntryType,
+    TransferSharesBodySchema,
+)
 from cofundable.services.accounts import account_service
 
 from tests.utils import test_data
@@ -27,7 +43,7 @@ class TestTransferShares:
         # execution
         debit, credit = account_service.transfer_shares(
             test_session,
-            amount=5.0,
+            amount=500,
             from_account=source,
             to_account=target,
         )
@@ -48,7 +64,7 @@ class TestTransferShares:
         # execution
         debit, credit = account_service.transfer_shares(
             test_session,
-            amount=5.0,
+            amount=500,
             from_account=source,
             to_account=target,
         )
@@ -66,7 +82,7 @@ class TestTransferShares:
         source_balance_old = source.balance
         target_balance_old = target.balance
         # execution
-        amount = Decimal(5.0)
+        amount = 500
         account_service.transfer_shares(
             test_session,
             amount=amount,
@@ -76,3 +92,367 @@ class TestTransferShares:
         # validation - confirm balances were adjusted correctly
         assert source.balance == source_balance_old - amount
         assert target.balance == target_balance_old + amount
+
+    def test_balance_after_is_recorded(self, test_session: Session):
+        """Each transaction should store the new balance of its account."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ACME)
+        target = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        assert source is not None
+        assert target is not None
+        # execution
+        debit, credit = account_service.transfer_shares(
+            test_session,
+            amount=500,
+            from_account=source,
+            to_account=target,
+        )
+        # validation
+        assert debit.balance_after == source.balance
+        assert credit.balance_after == target.balance
+
+    def test_error_raised_if_balance_is_too_low(self, test_session: Session):
+        """Transfers larger than the balance should fail without any changes."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_ACME)
+        assert source is not None
+        assert target is not None
+        amount = source.balance + 1
+        target_balance_old = target.balance
+        # execution
+        with pytest.raises(InsufficientBalanceError):
+            account_service.transfer_shares(
+                test_session,
+                amount=amount,
+                from_account=source,
+                to_account=target,
+            )
+        # validation - the credit was rolled back too
+        test_session.refresh(target)
+        assert target.balance == target_balance_old
+
+    def test_error_raised_if_accounts_are_the_same(
+        self,
+        test_session: Session,
+    ):
+        """Transfers to the sending account should fail without any changes."""
+        # setup
+        account = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        assert account is not None
+        balance_old = account.balance
+        transaction_count_old = len(account.transactions)
+        # execution
+        with pytest.raises(SelfTransferError):
+            account_service.transfer_shares(
+                test_session,
+                amount=1,
+                from_account=account,
+                to_account=account,
+            )
+        # validation
+        test_session.refresh(account)
+        assert account.balance == balance_old
+        assert len(account.transactions) == transaction_count_old
+
+
+class TestTransferSharesInBulk:
+    """Test the AccountCRUD.transfer_shares_in_bulk() method."""
+
+    RECIPIENTS = (
+        test_data.ACCOUNT_ACME,
+        test_data.ACCOUNT_AID,
+        test_data.ACCOUNT_BOB,
+    )
+
+    def test_balances_updated_and_entries_matched(
+        self,
+        test_session: Session,
+    ):
+        """Every recipient should be credited and each pair matched."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        assert source is not None
+        targets = [test_session.get(Account, id_) for id_ in self.RECIPIENTS]
+        source_balance_old = source.balance
+        target_balances_old = [target.balance for target in targets if target]
+        transfers = [
+            TransferSharesBodySchema(to_account_id=account_id, amount=amount)
+            for account_id, amount in zip(self.RECIPIENTS, (1, 2, 3))
+        ]
+        # execution
+        pairs = account_service.transfer_shares_in_bulk(
+            test_session,
+            from_account=source,
+            transfers=transfers,
+        )
+        # validation - confirm balances were adjusted correctly
+        assert source.balance == source_balance_old - 6 * MINOR_UNITS_PER_SHARE
+        assert [target.balance for target in targets if target] == [
+            balance + amount * MINOR_UNITS_PER_SHARE
+            for balance, amount in zip(target_balances_old, (1, 2, 3))
+        ]
+        # validation - confirm each debit is matched to the right credit
+        assert len(pairs) == 3
+        for (debit, credit), transfer in zip(pairs, transfers):
+            assert debit.account_id == source.id
+            assert credit.account_id == transfer.to_account_id
+            assert debit.match_entry == credit
+            assert credit.match_entry == debit
+            assert credit.match_entry_id == debit.id
+
+    def test_running_balances_are_recorded(self, test_session: Session):
+        """Transfers to the same account should each record its new balance."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_AID)
+        assert source is not None
+        assert target is not None
+        source_balance_old = source.balance
+        target_balance_old = target.balance
+        transfers = [
+            TransferSharesBodySchema(to_account_id=target.id, amount=amount)
+            for amount in (1, 2, 3)
+        ]
+        # execution
+        pairs = account_service.transfer_shares_in_bulk(
+            test_session,
+            from_account=source,
+            transfers=transfers,
+        )
+        # validation
+        assert [debit.balance_after for debit, _ in pairs] == [
+            source_balance_old - change * MINOR_UNITS_PER_SHARE
+            for change in (1, 3, 6)
+        ]
+        assert [credit.balance_after for _, credit in pairs] == [
+            target_balance_old + change * MINOR_UNITS_PER_SHARE
+            for change in (1, 3, 6)
+        ]
+
+    @pytest.mark.parametrize("recipients", [1, 3])
+    def test_query_count_is_constant(
+        self,
+        test_session: Session,
+        recipients: int,
+    ):
+        """The number of statements shouldn't grow with the transfers."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        assert source is not None
+        transfers = [
+            TransferSharesBodySchema(to_account_id=account_id, amount=1)
+            for account_id in self.RECIPIENTS[:recipients]
+        ]
+        statements: list[str] = []
+
+        def record_statement(*args) -> None:  # noqa: ANN002
+            statements.append(args[2])
+
+        engine = test_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record_statement)
+        # execution
+        try:
+            account_service.transfer_shares_in_bulk(
+                test_session,
+                from_account=source,
+                transfers=transfers,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+        # validation - one SELECT to lock the accounts, two UPDATEs for the
+        # balances, two INSERTs, one UPDATE to match the credits to their
+        # debits and one upsert for the daily rollups
+        queries = [
+            sql for sql in statements if not sql.startswith("SAVEPOINT")
+        ]
+        assert len(queries) == 7
+
+    @pytest.mark.parametrize("error", ["balance", "account"])
+    def test_no_transfers_made_if_any_fail(
+        self,
+        test_session: Session,
+        error: str,
+    ):
+        """None of the transfers should be made if one of them is invalid."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_ACME)
+        assert source is not None
+        assert target is not None
+        source_balance_old = source.balance
+        target_balance_old = target.balance
+        invalid = {
+            "balance": (test_data.ACCOUNT_BOB, to_shares(source.balance)),
+            "account": (Account.new_id(), 1),
+        }
+        to_account_id, amount = invalid[error]
+        transfers = [
+            TransferSharesBodySchema(to_account_id=target.id, amount=1),
+            TransferSharesBodySchema(
+                to_account_id=to_account_id,
+                amount=amount,
+            ),
+        ]
+        # execution
+        with pytest.raises((InsufficientBalanceError, AccountNotFoundError)):
+            account_service.transfer_shares_in_bulk(
+                test_session,
+                from_account=source,
+                transfers=transfers,
+            )
+        # validation
+        test_session.refresh(source)
+        test_session.refresh(target)
+        assert source.balance == source_balance_old
+        assert target.balance == target_balance_old
+
+    def test_error_raised_if_sender_is_a_recipient(
+        self,
+        test_session: Session,
+    ):
+        """Transfers to the sending account should fail without any changes."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_ACME)
+        assert source is not None
+        assert target is not None
+        source_balance_old = source.balance
+        target_balance_old = target.balance
+        transfers = [
+            TransferSharesBodySchema(to_account_id=target.id, amount=1),
+            TransferSharesBodySchema(to_account_id=source.id, amount=1),
+        ]
+        # execution
+        with pytest.raises(SelfTransferError):
+            account_service.transfer_shares_in_bulk(
+                test_session,
+                from_account=source,
+                transfers=transfers,
+            )
+        # validation
+        test_session.refresh(source)
+        test_session.refresh(target)
+        assert source.balance == source_balance_old
+        assert target.balance == target_balance_old
+
+    def test_accounts_are_locked_in_order_of_id(self, test_session: Session):
+        """The sender and recipients should be locked by one query, by id."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        assert source is not None
+        transfers = [
+            TransferSharesBodySchema(to_account_id=account_id, amount=1)
+            for account_id in self.RECIPIENTS
+        ]
+        # execution
+        # pylint: disable-next=protected-access
+        query = account_service._lock_accounts_query(  # noqa: SLF001
+            source,
+            transfers,
+        )
+        # validation - SQLite doesn't render FOR UPDATE, PostgreSQL does
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        assert sql.endswith("ORDER BY account.id FOR UPDATE")
+        accounts = test_session.scalars(query).all()
+        assert [account.id for account in accounts] == sorted(
+            [source.id, *self.RECIPIENTS],
+        )
+
+
+class TestQueryBalanceDrift:
+    """Test the AccountCRUD.query_balance_drift() method."""
+
+    def test_only_accounts_that_drift_are_returned(
+        self,
+        test_session: Session,
+    ):
+        """Transfers shouldn't cause drift, but changing a balance directly should."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_AID)
+        assert source is not None
+        assert target is not None
+        query = account_service.query_balance_drift()
+        drift_old = {
+            row.account_id: row.drift for row in test_session.execute(query)
+        }
+        assert target.id not in drift_old
+        # execution
+        account_service.transfer_shares(
+            test_session,
+            amount=1,
+            from_account=source,
+            to_account=target,
+        )
+        target.balance += 3
+        test_session.flush()
+        rows = test_session.execute(query).all()
+        # validation
+        drift = {row.account_id: row.drift for row in rows}
+        assert drift.pop(target.id) == 3
+        assert drift == drift_old
+
+
+class TestConcurrentTransfers:
+    """Test transfer_shares() when it's called by many threads at once."""
+
+    THREADS = 8
+    TRANSFERS = 50
+    BALANCE = 100
+
+    def test_no_updates_are_lost(self, tmp_path: Path):
+        """The balances should match the transactions that were recorded."""
+        # setup
+        engine = database.create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        UUIDAuditBase.metadata.create_all(bind=engine)
+        factory = database.create_session_factory(engine)
+        ids = [Account.new_id(), Account.new_id()]
+        with factory() as db:
+            db.add_all(
+                Account(id=account_id, name=str(i), balance=self.BALANCE)
+                for i, account_id in enumerate(ids)
+            )
+            db.commit()
+        rejected = []
+
+        def transfer(thread: int) -> None:
+            for i in range(self.TRANSFERS):
+                # mostly debit the first account, so that it runs out
+                from_id, to_id = ids[::-1] if (thread + i) % 3 == 0 else ids
+                with factory() as db:
+                    from_account = db.get(Account, from_id)
+                    to_account = db.get(Account, to_id)
+                    assert from_account is not None
+                    assert to_account is not None
+                    try:
+                        account_service.transfer_shares(
+                            db,
+                            amount=1 + i % 5,
+                            from_account=from_account,
+                            to_account=to_account,
+                        )
+                    except InsufficientBalanceError:
+                        rejected.append(i)
+
+        # execution
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            list(executor.map(transfer, range(self.THREADS)))
+        # validation - no balance is overdrawn and each balance matches the
+        # initial balance plus the transactions recorded for the account
+        with factory() as db:
+            for account_id in ids:
+                account = db.get(Account, account_id)
+                assert account is not None
+                net_change = sum(
+                    txn.amount if txn.kind == EntryType.credit else -txn.amount
+                    for txn in account.transactions
+                )
+                assert account.balance >= 0
+                assert account.balance == self.BALANCE + net_change
+            transactions = db.scalars(select(Transaction)).all()
+        engine.dispose()
+        # validation - every transfer either succeeded or was rejected
+        attempts = self.THREADS * self.TRANSFERS
+        assert rejected
+        assert len(transactions) == 2 * (attempts - len(rejected))
@@ -1,8 +1,11 @@
 """Test the cofundable.services.causes module."""
 
+import asyncio
 from uuid import UUID, uuid5
 
+import pytest
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import Session
 
 from cofundable.models.bookmark import Bookmark
@@ -33,6 +36,7 @@ class TestCreate:
         # validation
         assert isinstance(cause, Cause)
         assert isinstance(cause.id, UUID)
+        assert cause.id.version == 7
         assert cause.created_at is not None
         assert cause.updated_at is not None
         assert cause.tags != set()
@@ -58,6 +62,72 @@ class TestCreate:
         assert {tag.name for tag in cause.tags} == set(tags)
 
 
+class TestCreateMany:
+    """Test the CauseCRUD.create_many() method."""
+
+    def test_causes_are_created_with_accounts_and_tags(
+        self,
+        test_session: Session,
+    ):
+        """Each cause should be created with an account and its tags."""
+        # setup
+        data = [
+            CauseRequestSchema(
+                name=f"Cause {i}",
+                handle=f"bulk-cause-{i}",
+                tags=["a", f"bulk-tag-{i % 2}"],
+            )
+            for i in range(4)
+        ]
+        tags_old = tag_service.get_all(test_session)
+        # execution
+        causes = cause_service.create_many(test_session, data=data)
+        # validation
+        assert [cause.handle for cause in causes] == [
+            item.handle for item in data
+        ]
+        for cause, item in zip(causes, data, strict=True):
+            assert cause.account.name == item.handle
+            assert {tag.name for tag in cause.tags} == set(item.tags)
+        # validation - only the tags that didn't exist were created
+        tags_new = tag_service.get_all(test_session)
+        assert len(tags_new) == len(tags_old) + 2
+        stmt = select(Cause).where(Cause.handle == "bulk-cause-3")
+        cause = test_session.scalars(stmt).one()
+        assert {tag.name for tag in cause.tags} == {"a", "bulk-tag-1"}
+
+    def test_causes_are_created_with_an_async_session(
+        self,
+        async_session_factory: async_sessionmaker,
+    ):
+        """acreate_many() should return causes with their tags and accounts."""
+        # setup
+        data = [
+            CauseRequestSchema(name="Cause", handle=f"async-{i}", tags=["a"])
+            for i in range(3)
+        ]
+
+        async def create_causes() -> list[tuple[str, set[str]]]:
+            async with async_session_factory() as db:
+                causes = await cause_service.acreate_many(db, data=data)
+                return [
+                    (cause.account.name, {tag.name for tag in cause.tags})
+                    for cause in causes
+                ]
+
+        # execution
+        output = asyncio.run(create_causes())
+        # validation
+        assert output == [(item.handle, {"a"}) for item in data]
+
+    def test_no_rows_are_inserted_without_data(self, test_session: Session):
+        """An empty list should be returned if there's no data."""
+        # execution
+        causes = cause_service.create_many(test_session, data=[])
+        # validation
+        assert causes == []
+
+
 class TestGetCauseByHandle:
     """Tests the get_cause_by_handle() method."""
 
@@ -103,3 +173,71 @@ class TestDelete:
         assert len(bookmarks_after) == 0
         # validation - confirm alice was NOT deleted
         assert test_session.get(User, alice_id) is not None
+
+
+class TestQuerySearch:
+    """Test the CauseCRUD.query_search() method."""
+
+    def search(self, db: Session, text: str) -> list[str]:
+        """Return the handles of the causes that match the search, in order."""
+        query = cause_service.query_search(text, "sqlite")
+        return [cause.handle for cause in db.scalars(query)]
+
+    def test_index_is_updated_by_create_and_update(
+        self,
+        test_session: Session,
+    ):
+        """New causes and changes to a cause should be searchable."""
+        # setup
+        cause = cause_service.create(
+            test_session,
+            data=CauseRequestSchema(
+                name="Food bank",
+                handle="food-bank",
+                tags=["groceries"],
+            ),
+        )
+        assert self.search(test_session, "grocer") == ["food-bank"]
+        # execution
+        cause_service.update(
+            test_session,
+            record=cause,
+            update_data=CauseRequestSchema(
+                name="Community pantry",
+                handle="food-bank",
+            ),
+        )
+        # validation
+        assert self.search(test_session, "pantry") == ["food-bank"]
+        assert self.search(test_session, "food bank") == ["food-bank"]
+        assert self.search(test_session, "groceries pantry") == ["food-bank"]
+        assert self.search(test_session, "Food bank") == ["food-bank"]
+
+    def test_matches_in_the_name_rank_first(self, test_session: Session):
+        """A cause named after the search should rank above one that mentions it."""
+        # setup
+        cause_service.create(
+            test_session,
+            data=CauseRequestSchema(
+                name="Friends of the park",
+                handle="park-friends",
+                description="A volunteer group that works with Acme",
+            ),
+        )
+        # execution
+        handles = self.search(test_session, "acme")
+        # validation
+        assert handles == ["acme", "park-friends"]
+
+    def test_query_syntax_is_ignored(self, test_session: Session):
+        """Quotes and operators in a search shouldn't cause an error."""
+        # validation
+        assert self.search(test_session, '"-*') == []
+        assert self.search(test_session, 'local "NOT" mut') == []
+        assert self.search(test_session, "local: mut") == ["mutual-aid"]
+
+    def test_error_is_raised_for_other_dialects(self):
+        """Dialects without a full-text index should raise a ValueError."""
+        # validation
+        with pytest.raises(ValueError, match="Unsupported database: mysql"):
+            cause_service.query_search("acme", "mysql")
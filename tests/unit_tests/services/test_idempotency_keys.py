@@ -0,0 +1,188 @@
+"""Test the cofundable.services.idempotency_keys module."""
+
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from cofundable.dependencies import database
+from cofundable.errors import IdempotencyKeyReusedError
+from cofundable.models import Account, IdempotencyKey, Transaction
+from cofundable.models.base import utc_now
+from cofundable.schemas.transaction import TransferSharesBodySchema
+from cofundable.services.accounts import account_service
+from cofundable.services.idempotency_keys import idempotency_key_service
+
+from tests.utils import test_data
+from tests.utils.populate_db import populate_db
+
+BODY = TransferSharesBodySchema(to_account_id=test_data.ACCOUNT_AID, amount=1)
+
+
+def transfer(db: Session) -> tuple[Transaction, Transaction]:
+    """Make a transfer from Alice to the mutual aid account without committing it."""
+    from_account = db.get(Account, test_data.ACCOUNT_ALICE)
+    to_account = db.get(Account, test_data.ACCOUNT_AID)
+    assert from_account is not None
+    assert to_account is not None
+    return account_service.transfer_shares(
+        db,
+        amount=BODY.amount,
+        from_account=from_account,
+        to_account=to_account,
+        defer_commit=True,
+    )
+
+
+class TestGetResponse:
+    """Test the IdempotencyKeyService.get_response() method."""
+
+    def test_outcome_is_returned_for_the_same_request(
+        self,
+        test_session: Session,
+    ):
+        """A retry of the same request should return the recorded transfer."""
+        # setup
+        debit, credit = transfer(test_session)
+        idempotency_key_service.record(
+            test_session,
+            user_id=test_data.ALICE,
+            key="retry",
+            data=BODY,
+            transfer=(debit, credit),
+        )
+        # execution
+        response = idempotency_key_service.get_response(
+            test_session,
+            user_id=test_data.ALICE,
+            key="retry",
+            data=BODY,
+        )
+        # validation
+        assert response is not None
+        assert response.debit_id == debit.id
+        assert response.credit_id == credit.id
+
+    def test_error_raised_if_key_is_reused(self, test_session: Session):
+        """A key can't be used again for a request with a different body."""
+        # setup
+        idempotency_key_service.record(
+            test_session,
+            user_id=test_data.ALICE,
+            key="reused",
+            data=BODY,
+            transfer=transfer(test_session),
+        )
+        other = BODY.model_copy(update={"amount": 2 * BODY.amount})
+        # validation
+        with pytest.raises(IdempotencyKeyReusedError):
+            idempotency_key_service.get_response(
+                test_session,
+                user_id=test_data.ALICE,
+                key="reused",
+                data=other,
+            )
+
+    def test_expired_and_unknown_keys_return_none(
+        self,
+        test_session: Session,
+    ):
+        """Keys that have expired, or belong to another user, are ignored."""
+        # setup
+        idempotency_key_service.record(
+            test_session,
+            user_id=test_data.ALICE,
+            key="expired",
+            data=BODY,
+            transfer=transfer(test_session),
+        )
+        record = test_session.scalar(select(IdempotencyKey))
+        assert record is not None
+        record.expires_at = utc_now() - timedelta(seconds=1)
+        test_session.flush()
+        # validation
+        for user_id in (test_data.ALICE, test_data.BOB):
+            assert (
+                idempotency_key_service.get_response(
+                    test_session,
+                    user_id=user_id,
+                    key="expired",
+                    data=BODY,
+                )
+                is None
+            )
+
+
+class TestRecord:
+    """Test the IdempotencyKeyService.record() method."""
+
+    def test_concurrent_retry_is_rolled_back(self, tmp_path: Path):
+        """If another request records the key first, its outcome is returned."""
+        # setup
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        factory = database.create_session_factory(engine)
+        with factory() as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+        # execution - both requests make the transfer before recording the key
+        with factory() as first, factory() as second:
+            first_transfer = transfer(first)
+            first_response = idempotency_key_service.record(
+                first,
+                user_id=test_data.ALICE,
+                key="race",
+                data=BODY,
+                transfer=first_transfer,
+            )
+            second_response = idempotency_key_service.record(
+                second,
+                user_id=test_data.ALICE,
+                key="race",
+                data=BODY,
+                transfer=transfer(second),
+            )
+        # validation - only the first transfer was committed
+        with factory() as db:
+            transactions = len(db.scalars(select(Transaction.id)).all())
+            account = db.get(Account, test_data.ACCOUNT_ALICE)
+            assert account is not None
+            balance = account.balance
+        engine.dispose()
+        assert second_response == first_response
+        assert transactions == len(test_data.TRANSACTIONS) + 2
+        assert (
+            balance
+            == test_data.ACCOUNTS[test_data.ACCOUNT_ALICE]["balance"]
+            - BODY.amount
+        )
+
+
+class TestPurgeExpired:
+    """Test the IdempotencyKeyService.purge_expired() method."""
+
+    def test_expired_keys_are_deleted_in_batches(self, test_session: Session):
+        """Every expired key should be deleted, and no other keys."""
+        # setup
+        for i in range(5):
+            idempotency_key_service.record(
+                test_session,
+                user_id=test_data.ALICE,
+                key=str(i),
+                data=BODY,
+                transfer=transfer(test_session),
+            )
+        records = test_session.scalars(select(IdempotencyKey)).all()
+        for record in records[:3]:
+            record.expires_at = utc_now() - timedelta(seconds=1)
+        test_session.flush()
+        # execution
+        purged = idempotency_key_service.purge_expired(
+            test_session,
+            batch_size=2,
+        )
+        # validation
+        remaining = test_session.scalars(select(IdempotencyKey.key)).all()
+        assert purged == 3
+        assert sorted(remaining) == ["3", "4"]
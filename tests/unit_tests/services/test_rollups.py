@@ -0,0 +1,215 @@
+"""Test the cofundable.services.rollups module."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from cofundable.models import AccountDailyRollup, Transaction
+from cofundable.models.account import Account
+from cofundable.models.base import utc_now
+from cofundable.schemas.rollup import DailyRollupCreateSchema
+from cofundable.services.accounts import account_service
+from cofundable.services.rollups import rollup_service, utc_day
+
+from tests.utils import test_data
+
+
+def get_accounts(db: Session) -> tuple[Account, Account]:
+    """Return the accounts of Alice and Acme from the test data."""
+    alice = db.get(Account, test_data.ACCOUNT_ALICE)
+    acme = db.get(Account, test_data.ACCOUNT_ACME)
+    assert alice is not None
+    assert acme is not None
+    return alice, acme
+
+
+def get_rollups(db: Session) -> dict[tuple, tuple]:
+    """Return the totals of every rollup, keyed by account and day."""
+    rollups = db.scalars(select(AccountDailyRollup)).all()
+    return {
+        (rollup.account_id, rollup.day): (
+            rollup.credit_total,
+            rollup.credit_count,
+            rollup.debit_total,
+            rollup.debit_count,
+        )
+        for rollup in rollups
+    }
+
+
+class TestUtcDay:
+    """Test the utc_day() function."""
+
+    def test_aware_timestamps_are_converted_to_utc(self):
+        """The day should be the one in UTC, not in the timestamp's zone."""
+        # setup
+        eastern = timezone(timedelta(hours=-5))
+        timestamp = datetime(2024, 5, 1, 22, tzinfo=eastern)
+        # validation
+        assert utc_day(timestamp).isoformat() == "2024-05-02"
+        assert utc_day(timestamp.replace(tzinfo=None)).isoformat() == (
+            "2024-05-01"
+        )
+
+
+class TestRecordTransactions:
+    """Test the RollupService.record_transactions() method."""
+
+    def test_transfers_on_the_same_day_are_added_up(
+        self,
+        test_session: Session,
+    ):
+        """Each transfer should add to the rollups of both accounts."""
+        # setup
+        alice, acme = get_accounts(test_session)
+        today = utc_day(utc_now())
+        # execution
+        for amount in (100, 250):
+            account_service.transfer_shares(
+                test_session,
+                amount=amount,
+                from_account=alice,
+                to_account=acme,
+            )
+        # validation
+        rollups = get_rollups(test_session)
+        assert rollups[(acme.id, today)] == (350, 2, 0, 0)
+        assert rollups[(alice.id, today)] == (0, 0, 350, 2)
+
+    def test_rollups_match_a_rebuild(self, test_session: Session):
+        """Rebuilding the rollups from the ledger shouldn't change them."""
+        # setup
+        alice, acme = get_accounts(test_session)
+        rollup_service.rebuild(test_session)
+        account_service.transfer_shares(
+            test_session,
+            amount=300,
+            from_account=alice,
+            to_account=acme,
+        )
+        incremental = get_rollups(test_session)
+        # execution
+        rollup_service.rebuild(test_session, batch_size=1)
+        # validation
+        assert get_rollups(test_session) == incremental
+
+
+class TestUpsertStmt:
+    """Test the RollupService.upsert_stmt() method."""
+
+    def test_error_is_raised_for_other_dialects(self):
+        """Dialects without ON CONFLICT support should raise a ValueError."""
+        # validation
+        with pytest.raises(ValueError, match="Unsupported database: mysql"):
+            rollup_service.upsert_stmt("mysql")
+
+
+class TestRebuild:
+    """Test the RollupService.rebuild() method."""
+
+    def test_rollups_are_summed_from_the_ledger(self, test_session: Session):
+        """There should be a rollup for each account and day with transactions."""
+        # setup
+        day = utc_day(
+            test_session.get_one(
+                Transaction,
+                test_data.ALICE_FROM_COFUNDABLE,
+            ).created_at,
+        )
+        # execution
+        created = rollup_service.rebuild(test_session, batch_size=1)
+        # validation
+        rollups = get_rollups(test_session)
+        assert created == len(rollups) == 3
+        assert rollups[(test_data.ACCOUNT_ALICE, day)] == (1000, 1, 500, 1)
+        assert rollups[(test_data.ACCOUNT_ACME, day)] == (500, 1, 0, 0)
+
+    def test_rollups_created_during_a_rebuild_are_added_to(
+        self,
+        test_session: Session,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """A rollup inserted after the old ones were deleted shouldn't conflict."""
+        # setup
+        day = utc_day(
+            test_session.get_one(
+                Transaction,
+                test_data.ALICE_FROM_COFUNDABLE,
+            ).created_at,
+        )
+        add_to_rollups = rollup_service._add_to_rollups  # noqa: SLF001
+
+        def add_after_a_transfer(*args) -> None:  # noqa: ANN002
+            # e.g. a transfer committed after the ledger was read
+            test_session.execute(
+                insert(AccountDailyRollup),
+                rollup_service.build_rows(
+                    [
+                        DailyRollupCreateSchema(
+                            account_id=test_data.ACCOUNT_ACME,
+                            day=day,
+                            credit_total=200,
+                            credit_count=1,
+                        ),
+                    ],
+                ),
+            )
+            monkeypatch.setattr(
+                rollup_service,
+                "_add_to_rollups",
+                add_to_rollups,
+            )
+            add_to_rollups(*args)
+
+        monkeypatch.setattr(
+            rollup_service,
+            "_add_to_rollups",
+            add_after_a_transfer,
+        )
+        # execution
+        rollup_service.rebuild(test_session)
+        # validation
+        rollups = get_rollups(test_session)
+        assert rollups[(test_data.ACCOUNT_ACME, day)] == (700, 2, 0, 0)
+
+
+class TestGetStats:
+    """Test the RollupService.get_stats() method."""
+
+    def test_only_days_in_the_range_are_included(
+        self,
+        test_session: Session,
+    ):
+        """The totals should be summed from the days in the range."""
+        # setup
+        alice, acme = get_accounts(test_session)
+        today = utc_day(utc_now())
+        yesterday = today - timedelta(days=1)
+        test_session.add(
+            AccountDailyRollup(
+                id=AccountDailyRollup.new_id(),
+                account_id=acme.id,
+                day=yesterday,
+                credit_total=700,
+                credit_count=3,
+                debit_total=0,
+                debit_count=0,
+            ),
+        )
+        account_service.transfer_shares(
+            test_session,
+            amount=200,
+            from_account=alice,
+            to_account=acme,
+        )
+        # execution
+        everything = rollup_service.get_stats(test_session, acme)
+        today_only = rollup_service.get_stats(test_session, acme, start=today)
+        # validation
+        assert [day.day for day in everything.days] == [yesterday, today]
+        assert everything.totals.credit_total == 900
+        assert everything.totals.credit_count == 4
+        assert today_only.totals.credit_total == 200
+        assert today_only.start == today
@@ -1,8 +1,14 @@
 """Test the cofundable.services.tags module."""
 
+import pytest
+from sqlalchemy import Dialect, event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
+from cofundable.schemas.cause import CauseRequestSchema
+from cofundable.services.causes import cause_service
 from cofundable.services.tags import tag_service
+from tests.utils import test_data
 
 
 class TestGetTagsByName:
@@ -92,3 +98,130 @@ class TestGetOrCreateTagsByName:
         assert len(tags_out) == 3
         assert tags_out.issubset(tags_new)
         assert missing in {tag.name for tag in tags_out}
+
+    @pytest.mark.parametrize("new_tags", [1, 10])
+    def test_query_count_is_constant(
+        self,
+        test_session: Session,
+        new_tags: int,
+    ):
+        """Tags should be created and returned with at most two queries."""
+        # setup
+        tag_names = ["a", "b", *(f"new-{i}" for i in range(new_tags))]
+        statements: list[str] = []
+
+        def record_statement(*args) -> None:  # noqa: ANN002
+            statements.append(args[2])
+
+        engine = test_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record_statement)
+        # execution
+        try:
+            tags_out = tag_service.get_or_create_tags_by_name(
+                db=test_session,
+                tag_names=tag_names,
+                defer_commit=True,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+        # validation
+        assert {tag.name for tag in tags_out} == set(tag_names)
+        queries = [
+            sql for sql in statements if not sql.startswith("SAVEPOINT")
+        ]
+        assert len(queries) == 2
+
+    def test_duplicate_names_are_created_once(self, test_session: Session):
+        """Creating the same tags twice shouldn't create duplicate rows."""
+        # setup
+        tag_names = ["z", "z", "y"]
+        # execution
+        first = tag_service.get_or_create_tags_by_name(
+            db=test_session,
+            tag_names=tag_names,
+        )
+        second = tag_service.get_or_create_tags_by_name(
+            db=test_session,
+            tag_names=tag_names,
+        )
+        # validation
+        assert first == second
+        tags = tag_service.get_tags_by_name(test_session, tag_names=tag_names)
+        assert len(tags) == 2
+
+
+class TestInsertMissingStmt:
+    """Test the TagsCRUD.insert_missing_stmt() method."""
+
+    @pytest.mark.parametrize(
+        "dialect",
+        [sqlite.dialect(), postgresql.dialect()],
+    )
+    def test_statement_compiles_with_on_conflict(self, dialect: Dialect):
+        """The statement should skip existing names on SQLite and PostgreSQL."""
+        # execution
+        stmt = tag_service.insert_missing_stmt(dialect.name)
+        sql = str(stmt.compile(dialect=dialect))
+        # validation
+        assert "ON CONFLICT (name) DO NOTHING" in sql
+        assert "RETURNING" in sql
+
+    def test_error_is_raised_for_other_dialects(self):
+        """Dialects without ON CONFLICT support should raise a ValueError."""
+        # validation
+        with pytest.raises(ValueError, match="Unsupported database: mysql"):
+            tag_service.insert_missing_stmt("mysql")
+
+
+class TestCountCauses:
+    """Test that CauseCRUD keeps the tags' cause counts up to date."""
+
+    def counts(self, db: Session) -> dict[str, int]:
+        """Return the cause count of each tag, read from the database."""
+        tags = tag_service.get_all(db)
+        for tag in tags:
+            db.refresh(tag, ["cause_count"])
+        return {tag.name: tag.cause_count for tag in tags}
+
+    def test_counts_are_updated_when_causes_are_created(
+        self,
+        test_session: Session,
+    ):
+        """Each new cause should add one to the count of each of its tags."""
+        # setup
+        before = self.counts(test_session)
+        # execution
+        cause = cause_service.create(
+            test_session,
+            data=CauseRequestSchema(name="A", handle="a", tags=["a", "new"]),
+        )
+        created = {tag.name: tag.cause_count for tag in cause.tags}
+        cause_service.create_many(
+            test_session,
+            data=[
+                CauseRequestSchema(name="B", handle="b", tags=["a"]),
+                CauseRequestSchema(name="C", handle="c", tags=["a", "b"]),
+            ],
+        )
+        # validation - the counts returned by the UPDATE are set on the tags
+        assert created == {
+            "a": before["a"] + 1,
+            "new": 1,
+        }
+        after = self.counts(test_session)
+        assert after["a"] == before["a"] + 3
+        assert after["b"] == before["b"] + 1
+        assert after["new"] == 1
+
+    def test_counts_are_updated_when_causes_are_deleted(
+        self,
+        test_session: Session,
+    ):
+        """Deleting a cause should subtract one from each of its tags' counts."""
+        # setup
+        before = self.counts(test_session)
+        # execution
+        cause_service.delete(test_session, row_id=test_data.MUTUAL_AID)
+        # validation
+        after = self.counts(test_session)
+        assert after == before | {"b": before["b"] - 1, "c": before["c"] - 1}
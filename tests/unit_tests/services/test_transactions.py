@@ -4,6 +4,9 @@ import pytest
 from sqlalchemy.orm import Session
 
 from cofundable.models.account import Account
+from cofundable.models.transaction import Transaction
+from cofundable.models.base import utc_now
+from cofundable.services.accounts import account_service
 from cofundable.services.transactions import EntryType, transaction_service
 
 from tests.utils import test_data
@@ -52,3 +55,108 @@ class TestQueryTransactionsByAccount:
         assert len(transactions) < txn_count_all
         for entry in transactions:
             assert entry.kind == entry_type
+
+
+class TestGetBalanceAsOf:
+    """Test the get_balance_as_of() method."""
+
+    def test_balance_at_each_point_in_time(self, test_session: Session):
+        """The balance should match the transactions made by then."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_BOB)
+        target = test_session.get(Account, test_data.ACCOUNT_AID)
+        assert source is not None
+        assert target is not None
+        opening_balance = source.balance
+        times = [utc_now()]
+        # execution - make two transfers and record the time after each
+        for amount in (2, 1):
+            account_service.transfer_shares(
+                test_session,
+                amount=amount,
+                from_account=source,
+                to_account=target,
+            )
+            times.append(utc_now())
+        balances = [
+            transaction_service.get_balance_as_of(test_session, source, as_of)
+            for as_of in times
+        ]
+        # validation
+        assert balances == [
+            opening_balance,
+            opening_balance - 2,
+            opening_balance - 3,
+        ]
+        assert balances[-1] == source.balance
+
+    def test_current_balance_returned_if_there_are_no_transactions(
+        self,
+        test_session: Session,
+    ):
+        """An account without transactions has always had the same balance."""
+        # setup
+        account = test_session.get(Account, test_data.ACCOUNT_BOB)
+        assert account is not None
+        assert not account.transactions
+        # execution
+        balance = transaction_service.get_balance_as_of(
+            test_session,
+            account,
+            utc_now(),
+        )
+        # validation
+        assert balance == account.balance
+
+
+class TestQueryBrokenPairs:
+    """Test the query_broken_pairs() method."""
+
+    def test_matched_pairs_are_not_returned(self, test_session: Session):
+        """Transfers should create pairs that match each other."""
+        # setup
+        source = test_session.get(Account, test_data.ACCOUNT_ALICE)
+        target = test_session.get(Account, test_data.ACCOUNT_AID)
+        assert source is not None
+        assert target is not None
+        # execution
+        account_service.transfer_shares(
+            test_session,
+            amount=1,
+            from_account=source,
+            to_account=target,
+        )
+        rows = test_session.execute(transaction_service.query_broken_pairs())
+        # validation
+        assert rows.all() == []
+
+    @pytest.mark.parametrize(
+        ("change", "problems"),
+        [
+            ({"amount": 4}, ["amounts differ", "amounts differ"]),
+            ({"kind": EntryType.credit}, ["same kind", "same kind"]),
+            ({"match_entry_id": None}, ["asymmetric", "unmatched"]),
+        ],
+    )
+    def test_broken_pairs_are_returned(
+        self,
+        test_session: Session,
+        change: dict,
+        problems: list[str],
+    ):
+        """Both transactions in a pair should be returned if it's broken."""
+        # setup
+        debit = test_session.get(Transaction, test_data.ALICE_TO_ACME)
+        assert debit is not None
+        for key, value in change.items():
+            setattr(debit, key, value)
+        test_session.flush()
+        # execution
+        rows = test_session.execute(transaction_service.query_broken_pairs())
+        # validation
+        broken = {row.id: row.problem for row in rows}
+        assert set(broken) == {
+            test_data.ALICE_TO_ACME,
+            test_data.ACME_FROM_ALICE,
+        }
+        assert sorted(broken.values()) == problems
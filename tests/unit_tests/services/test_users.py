@@ -2,19 +2,76 @@
 
 from uuid import uuid5
 
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
 
 from cofundable.models.bookmark import Bookmark
 from cofundable.models.cause import Cause
 from cofundable.models.user import User
-from cofundable.schemas.user import UserUpdateSchema
+from cofundable.schemas.user import UserRequestSchema, UserUpdateSchema
 from cofundable.services.users import user_service
 from tests.utils import test_data
 
 NAMESPACE = test_data.namespace
 
 
+class TestCreateMany:
+    """Test the UserCRUD.create_many() method."""
+
+    def test_users_are_created_with_accounts(self, test_session: Session):
+        """Each new user should be returned in order with a new account."""
+        # setup
+        data = [
+            UserRequestSchema(name=f"User {i}", handle=f"bulk-user-{i}")
+            for i in range(5)
+        ]
+        # execution
+        users = user_service.create_many(test_session, data=data)
+        # validation
+        assert [user.handle for user in users] == [
+            item.handle for item in data
+        ]
+        for user in users:
+            assert user.account.name == user.handle
+            assert user.account.balance == 0
+        stmt = select(User).where(User.handle.startswith("bulk-user-"))
+        assert len(test_session.scalars(stmt).all()) == len(data)
+
+    def test_rows_are_inserted_in_batches(self, test_session: Session):
+        """Rows should be inserted by one statement per batch, not per row."""
+        # setup
+        data = [
+            UserRequestSchema(name=f"User {i}", handle=f"bulk-user-{i}")
+            for i in range(5)
+        ]
+        statements: list[str] = []
+
+        def record_statement(*args) -> None:  # noqa: ANN002
+            statements.append(args[2])
+
+        engine = test_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record_statement)
+        # execution
+        try:
+            users = user_service.create_many(
+                test_session,
+                data=data,
+                batch_size=2,
+            )
+            inserts = [
+                stmt for stmt in statements if stmt.startswith("INSERT")
+            ]
+            statements.clear()
+            accounts = [user.account.name for user in users]
+        finally:
+            event.remove(engine, "before_cursor_execute", record_statement)
+        # validation - 3 batches each for the accounts and the users
+        assert len(inserts) == 6
+        # the records are reloaded after the commit, so no queries are needed
+        assert accounts == [item.handle for item in data]
+        assert not statements
+
+
 class TestGetUserByUsername:
     """Tests the get_user_by_handle() method."""
 
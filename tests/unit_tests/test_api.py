@@ -1,6 +1,17 @@
 """Test the endpoints defined in api.py."""
 
+import inspect
+from typing import Callable
+
+import pytest
+from dynaconf import ValidationError
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from cofundable import config
+from cofundable.api import create_app
 
 
 class TestHealthCheck:
@@ -33,3 +44,56 @@ class TestRoot:
         """The response message should contain the path to `/docs`."""
         response = test_client.get(self.ENDPOINT)
         assert "/docs" in response.json()["message"]
+
+
+class TestCreateApp:
+    """Test the create_app() function."""
+
+    def get_endpoint(self, app: FastAPI, path: str) -> Callable:
+        """Get the function that handles GET requests to a given path."""
+        for route in app.routes:
+            if isinstance(route, APIRoute) and route.path == path:
+                return route.endpoint
+        raise KeyError(path)
+
+    def test_use_sync_routers_when_async_db_is_disabled(self):
+        """The sync routers should be used if use_async_db is False."""
+        # execution
+        app = create_app(use_async_db=False)
+        # validation
+        endpoint = self.get_endpoint(app, "/causes/")
+        assert not inspect.iscoroutinefunction(endpoint)
+
+    def test_use_async_routers_when_async_db_is_enabled(self):
+        """The async routers should be used if use_async_db is True."""
+        # execution
+        app = create_app(use_async_db=True)
+        # validation
+        endpoint = self.get_endpoint(app, "/causes/")
+        assert inspect.iscoroutinefunction(endpoint)
+
+    def test_async_session_factory_created_in_lifespan(self):
+        """An async session factory should be created at startup."""
+        # setup
+        app = create_app(use_async_db=True)
+        # execution
+        with TestClient(app):
+            factory = app.state.async_session_factory
+        # validation
+        assert isinstance(factory, async_sessionmaker)
+
+    def test_startup_fails_without_a_pagination_secret(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """The API shouldn't start if the cursor signing secret isn't set."""
+        # setup - the default settings don't have a pagination_secret
+        settings = config.settings.from_env("production")
+        monkeypatch.setattr(config, "settings", settings)
+        app = create_app(use_async_db=False)
+        # validation
+        with (
+            pytest.raises(ValidationError, match="PAGINATION_SECRET"),
+            TestClient(app),
+        ):
+            pass
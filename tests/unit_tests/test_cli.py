@@ -0,0 +1,163 @@
+"""Test the command line tasks defined in cli.py."""
+
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import Session
+
+from cofundable import cli
+from cofundable.models import Cause, IdempotencyKey, Transaction
+from cofundable.models.base import utc_now
+from cofundable.dependencies import database
+
+from tests.utils import test_data
+from tests.utils.populate_db import populate_db
+
+
+class TestPurgeIdempotencyKeys:
+    """Test the purge-idempotency-keys task."""
+
+    def test_expired_keys_are_purged(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture,
+    ):
+        """Only the keys that have expired should be deleted."""
+        # setup
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+        engine = create_engine(url)
+        with Session(engine) as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+            transaction_id = db.scalars(select(Transaction.id)).first()
+            db.execute(
+                insert(IdempotencyKey),
+                [
+                    {
+                        "id": IdempotencyKey.new_id(),
+                        "key": str(hours),
+                        "user_id": test_data.ALICE,
+                        "request_hash": "",
+                        "debit_id": transaction_id,
+                        "credit_id": transaction_id,
+                        "expires_at": utc_now() + timedelta(hours=hours),
+                    }
+                    for hours in (-2, -1, 1)
+                ],
+            )
+            db.commit()
+        # execution
+        cli.main(["--database-url", url, "purge-idempotency-keys"])
+        # validation
+        with Session(engine) as db:
+            remaining = db.scalars(select(IdempotencyKey.key)).all()
+        engine.dispose()
+        assert remaining == ["1"]
+        assert "Purged 2" in capsys.readouterr().out
+
+
+class TestReconcile:
+    """Test the reconcile task."""
+
+    def test_problems_are_reported(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture,
+    ):
+        """Drift and broken pairs should be written out with a status of 1."""
+        # setup
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+        engine = create_engine(url)
+        with Session(engine) as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+            db.execute(
+                update(Transaction)
+                .where(Transaction.id == test_data.ALICE_TO_ACME)
+                .values(amount=4),
+            )
+            db.commit()
+        engine.dispose()
+        # execution
+        status = cli.main(["--database-url", url, "reconcile"])
+        # validation
+        output = capsys.readouterr().out
+        assert status == 1
+        assert f"Account {test_data.ACCOUNT_ALICE.hex}" in output
+        assert (
+            f"Transaction {test_data.ALICE_TO_ACME.hex}: amounts differ"
+            in output
+        )
+        assert "broken pairs" in output.splitlines()[-1]
+
+
+class TestImportRecords:
+    """Test the import task."""
+
+    def test_rows_are_imported_in_batches(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture,
+    ):
+        """Every valid row should be created and the invalid ones reported."""
+        # setup
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+        engine = create_engine(url)
+        with Session(engine) as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+        engine.dispose()
+        path = tmp_path / "causes.ndjson"
+        lines = [
+            json.dumps({"name": f"Cause {i}", "handle": f"cause-{i}"})
+            for i in range(5)
+        ]
+        path.write_text("\n".join([*lines, '{"name": "No handle"}']))
+        # execution
+        status = cli.main(
+            [
+                "--database-url",
+                url,
+                "import",
+                "causes",
+                str(path),
+                "--batch-size",
+                "2",
+            ],
+        )
+        # validation
+        output = capsys.readouterr().out
+        assert status == 1
+        assert output.splitlines()[0].startswith("Line 6: handle:")
+        assert output.splitlines()[-1] == "Created 5 causes, 1 rows failed"
+        engine = create_engine(url)
+        with Session(engine) as db:
+            handles = db.scalars(select(Cause.handle)).all()
+        engine.dispose()
+        assert {f"cause-{i}" for i in range(5)} <= set(handles)
+
+
+class TestRebuildRollups:
+    """Test the rebuild-rollups task."""
+
+    def test_rollups_are_rebuilt(
+        self,
+        tmp_path: Path,
+        capsys: pytest.CaptureFixture,
+    ):
+        """A rollup should be created for each account and day in the ledger."""
+        # setup
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+        engine = create_engine(url)
+        with Session(engine) as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+        engine.dispose()
+        # execution
+        status = cli.main(["--database-url", url, "rebuild-rollups"])
+        # validation
+        assert status == 0
+        assert "Rebuilt 3 daily rollups" in capsys.readouterr().out
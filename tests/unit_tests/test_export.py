@@ -0,0 +1,47 @@
+"""Test the streaming exports defined in export.py."""
+
+import json
+
+from sqlalchemy.orm import Session
+
+from cofundable import export
+from cofundable.export import ExportFormat
+from cofundable.schemas.transaction import TransactionExportSchema
+from cofundable.services.transactions import transaction_service
+
+
+class TestExportChunks:
+    """Test the export_chunks() function."""
+
+    def test_each_batch_is_sent_as_a_chunk(self, test_session: Session):
+        """Rows should be fetched and serialized a batch at a time."""
+        # setup
+        query = transaction_service.query_all()
+        total = len(test_session.scalars(query).all())
+        # execution
+        chunks = list(
+            export.export_chunks(
+                lambda: Session(bind=test_session.connection()),
+                query,
+                TransactionExportSchema,
+                ExportFormat.ndjson,
+                batch_size=1,
+            ),
+        )
+        # validation
+        assert len(chunks) == total
+        assert all(len(chunk.splitlines()) == 1 for chunk in chunks)
+        assert "balance_after" in json.loads(chunks[0])
+
+    def test_csv_export_starts_with_a_header(self, test_session: Session):
+        """The first chunk of a CSV export should name the columns."""
+        # execution
+        chunks = export.export_chunks(
+            lambda: Session(bind=test_session.connection()),
+            transaction_service.query_all(),
+            TransactionExportSchema,
+            ExportFormat.csv,
+        )
+        # validation
+        header = next(iter(chunks)).strip().split(",")
+        assert header == list(TransactionExportSchema.model_fields)
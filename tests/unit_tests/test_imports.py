@@ -0,0 +1,150 @@
+"""Test the bulk imports defined in imports.py."""
+
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.orm import Session
+
+from cofundable import imports
+from cofundable.imports import BulkImport
+from cofundable.schemas.user import UserRequestSchema
+from cofundable.services.users import user_service
+
+
+class TestAiterLines:
+    """Test the aiter_lines() function."""
+
+    def test_lines_are_split_across_chunks(self):
+        """Lines should be rejoined when they span more than one chunk."""
+
+        # setup
+        async def chunks() -> AsyncIterator[bytes]:
+            for chunk in [b'{"a"', b": 1}\n{", b'"b": 2}\n', b"last"]:
+                yield chunk
+
+        async def collect() -> list[bytes]:
+            return [line async for line in imports.aiter_lines(chunks())]
+
+        # execution
+        lines = asyncio.run(collect())
+        # validation
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b"last"]
+
+    def test_lines_that_are_too_long_are_skipped(self):
+        """Lines over the limit should be replaced by None without buffering."""
+
+        # setup
+        async def chunks() -> AsyncIterator[bytes]:
+            for chunk in [b"ok\nxxxx", b"xxxx", b"xx\nfine\n", b"toolong"]:
+                yield chunk
+
+        async def collect() -> list[bytes | None]:
+            lines = imports.aiter_lines(chunks(), max_line_length=5)
+            return [line async for line in lines]
+
+        # execution
+        lines = asyncio.run(collect())
+        # validation
+        assert lines == [b"ok", None, b"fine", None]
+
+
+class TestImportLines:
+    """Test the import_lines() function."""
+
+    def test_errors_are_counted_past_the_reported_limit(
+        self,
+        test_session: Session,
+    ):
+        """Only the first MAX_REPORTED_ERRORS errors should be included."""
+        # setup
+        bulk_import = BulkImport(
+            user_service,
+            UserRequestSchema,
+            batch_size=10,
+        )
+        lines = ["{}"] * (imports.MAX_REPORTED_ERRORS + 5)
+        # execution
+        report = imports.import_lines(test_session, lines, bulk_import)
+        # validation
+        assert report.created == 0
+        assert report.failed == imports.MAX_REPORTED_ERRORS + 5
+        assert len(report.errors) == imports.MAX_REPORTED_ERRORS
+
+    def test_repeated_handles_in_separate_batches_are_reported(
+        self,
+        test_session: Session,
+    ):
+        """A handle created by an earlier batch should be taken in the next."""
+        # setup
+        bulk_import = BulkImport(user_service, UserRequestSchema, batch_size=1)
+        lines = ['{"name": "Carol", "handle": "carol"}'] * 2
+        # execution
+        report = imports.import_lines(test_session, lines, bulk_import)
+        # validation
+        assert report.created == 1
+        assert report.model_dump()["errors"] == [
+            {"line": 2, "error": "handle: carol is taken"},
+        ]
+
+    def test_only_rows_that_conflict_are_reported(
+        self,
+        test_session: Session,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """A conflict should only fail its row, not the rest of the batch."""
+        # setup
+        bulk_import = BulkImport(user_service, UserRequestSchema, batch_size=3)
+        # the handle is taken after the batch is checked, e.g. by another import
+        monkeypatch.setattr(
+            bulk_import,
+            "_skip_taken_handles",
+            lambda rows, _: rows,
+        )
+        lines = [
+            '{"name": "Carol", "handle": "carol"}',
+            '{"name": "Alice", "handle": "alice"}',
+            '{"name": "Dave", "handle": "dave"}',
+        ]
+        # execution
+        report = imports.import_lines(test_session, lines, bulk_import)
+        # validation
+        assert report.created == 2
+        assert report.model_dump()["errors"] == [
+            {
+                "line": 2,
+                "error": "Conflicted with a concurrent change, alice wasn't created",
+            },
+        ]
+        handles = {user.handle for user in user_service.get_all(test_session)}
+        assert {"carol", "dave"} <= handles
+
+
+class TestImportStream:
+    """Test the import_stream() function."""
+
+    def test_lines_that_are_too_long_are_reported(
+        self,
+        test_session: Session,
+    ):
+        """A line over MAX_LINE_LENGTH should fail without stopping the import."""
+        # setup
+        bulk_import = BulkImport(user_service, UserRequestSchema)
+        long_name = "x" * imports.MAX_LINE_LENGTH
+
+        async def chunks() -> AsyncIterator[bytes]:
+            yield f'{{"name": "{long_name}", "handle": "long"}}\n'.encode()
+            yield b'{"name": "Carol", "handle": "carol"}\n'
+
+        # execution
+        report = asyncio.run(
+            imports.import_stream(test_session, chunks(), bulk_import),
+        )
+        # validation
+        assert report.created == 1
+        assert report.model_dump()["errors"] == [
+            {
+                "line": 1,
+                "error": f"Line is longer than {imports.MAX_LINE_LENGTH} bytes",
+            },
+        ]
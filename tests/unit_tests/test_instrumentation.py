@@ -0,0 +1,109 @@
+"""Test the request instrumentation defined in instrumentation.py."""
+
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from cofundable import config, instrumentation, pagination
+from cofundable.api import create_app
+from cofundable.instrumentation import (
+    QUERY_COUNT_HEADER,
+    SERVER_TIMING_HEADER,
+    RequestMetrics,
+)
+
+TIMING_PATTERN = re.compile(
+    r"db;dur=[\d.]+, orm;dur=[\d.]+, serialize;dur=[\d.]+, app;dur=[\d.]+",
+)
+
+
+@pytest.fixture(name="instrumented_async_factory")
+def fixture_instrumented_async_factory(
+    async_session_factory: async_sessionmaker,
+):
+    """Instrument the engine used by the async session factory."""
+    engine = async_session_factory.kw["bind"].sync_engine
+    instrumentation.instrument_engine(engine)
+    yield async_session_factory
+    event.remove(
+        engine,
+        "before_cursor_execute",
+        instrumentation.before_execute,
+    )
+    event.remove(engine, "after_cursor_execute", instrumentation.after_execute)
+
+
+class TestRequestMetrics:
+    """Test the RequestMetrics class."""
+
+    def test_server_timing_is_formatted_in_milliseconds(self):
+        """Each timing should be converted to milliseconds."""
+        # setup
+        metrics = RequestMetrics(db_time=0.0125, orm_time=0.002)
+        # execution
+        output = metrics.server_timing(app_time=0.05)
+        # validation
+        assert output == (
+            "db;dur=12.50, orm;dur=2.00, serialize;dur=0.00, app;dur=50.00"
+        )
+
+
+@pytest.mark.usefixtures("instrumented_session")
+class TestServerTimingMiddleware:
+    """Test the headers added by the ServerTimingMiddleware."""
+
+    def test_headers_are_added_to_responses(self, test_client: TestClient):
+        """Responses should include the query count and server timing."""
+        # execution
+        response = test_client.get("/user/bookmarks/")
+        # validation
+        assert response.status_code == 200
+        assert int(response.headers[QUERY_COUNT_HEADER]) > 0
+        assert TIMING_PATTERN.fullmatch(response.headers[SERVER_TIMING_HEADER])
+
+    def test_no_queries_are_counted_without_db_access(
+        self,
+        test_client: TestClient,
+    ):
+        """Endpoints that don't query the database should report 0 queries."""
+        # execution
+        response = test_client.get("/health-check")
+        # validation
+        assert response.headers[QUERY_COUNT_HEADER] == "0"
+
+    def test_queries_are_counted_per_request(self, test_client: TestClient):
+        """The query count shouldn't accumulate across requests."""
+        # execution
+        first = test_client.get("/causes/")
+        pagination.count_cache.clear()
+        second = test_client.get("/causes/")
+        # validation
+        assert first.headers[QUERY_COUNT_HEADER] != "0"
+        assert first.headers[QUERY_COUNT_HEADER] == (
+            second.headers[QUERY_COUNT_HEADER]
+        )
+
+    @pytest.mark.usefixtures("instrumented_async_factory")
+    def test_async_queries_are_counted(self, async_client: TestClient):
+        """Queries made with an AsyncSession should also be counted."""
+        # execution
+        response = async_client.get("/user/bookmarks/")
+        # validation
+        assert response.status_code == 200
+        assert int(response.headers[QUERY_COUNT_HEADER]) > 0
+
+    def test_headers_are_omitted_when_disabled(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """No headers should be added if settings.INSTRUMENT_REQUESTS is off."""
+        # setup
+        monkeypatch.setattr(config.settings, "INSTRUMENT_REQUESTS", False)
+        # execution
+        with TestClient(create_app()) as client:
+            response = client.get("/health-check")
+        # validation
+        assert QUERY_COUNT_HEADER not in response.headers
+        assert SERVER_TIMING_HEADER not in response.headers
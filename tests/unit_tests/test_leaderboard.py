@@ -0,0 +1,147 @@
+"""Test the in-memory leaderboard defined in leaderboard.py."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from cofundable import leaderboard
+from cofundable.dependencies import database
+from cofundable.errors import InsufficientBalanceError
+from cofundable.leaderboard import Leaderboard
+from cofundable.models.account import Account
+from cofundable.services.accounts import account_service
+from cofundable.services.causes import cause_service
+
+from tests.utils import test_data
+from tests.utils.populate_db import populate_db
+
+
+@pytest.fixture(name="board")
+def fixture_board(test_session: Session) -> Leaderboard:
+    """Return a leaderboard loaded from the test data."""
+    board = Leaderboard()
+    board.load(test_session)
+    return board
+
+
+class TestLeaderboard:
+    """Test the Leaderboard class."""
+
+    def test_causes_are_ranked_by_balance(self, board: Leaderboard):
+        """The causes should be ranked highest first, ties sharing a rank."""
+        # execution
+        top = board.top(10)
+        # validation
+        assert len(board) == len(top) == 3
+        assert top[0].handle == "acme"
+        assert [entry.rank for entry in top] == [1, 2, 2]
+        assert board.synced_at is not None
+
+    def test_updates_move_causes(self, board: Leaderboard):
+        """A new balance should change the cause's rank, and the others'."""
+        # execution
+        board.update({test_data.ACCOUNT_AID: 600})
+        # validation
+        aid = board.rank("mutual-aid")
+        acme = board.rank("acme")
+        assert aid is not None
+        assert acme is not None
+        assert (aid.rank, aid.balance) == (1, 600)
+        assert acme.rank == 2
+        assert board.top(1)[0].handle == "mutual-aid"
+
+    def test_accounts_that_arent_causes_are_skipped(self, board: Leaderboard):
+        """Users' accounts shouldn't be added to the leaderboard."""
+        # execution
+        board.update({test_data.ACCOUNT_ALICE: 10_000})
+        # validation
+        assert len(board) == 3
+        assert board.rank("alice") is None
+
+    def test_updates_made_while_loading_are_kept(
+        self,
+        board: Leaderboard,
+        test_session: Session,
+    ):
+        """A commit applied during a load shouldn't be overwritten by it."""
+        # setup
+        rows = test_session.execute(
+            cause_service.query_balances(),
+        ).all()
+        # execution - the update arrives after the rows were read
+        # pylint: disable=protected-access
+        board._start_load()  # noqa: SLF001
+        board.update({test_data.ACCOUNT_COFUNDABLE: 900})
+        board._replace(rows)
+        # validation
+        cofundable = board.rank("cofundable")
+        assert cofundable is not None
+        assert (cofundable.rank, cofundable.balance) == (1, 900)
+
+
+class TestTrackCommits:
+    """Test that committed transfers update an attached leaderboard."""
+
+    def test_only_committed_transfers_are_applied(self, tmp_path: Path):
+        """A transfer that's rolled back shouldn't change the leaderboard."""
+        # setup
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        with Session(engine) as db:
+            database.init_test_db(db, testing=True)
+            populate_db(db)
+            db.commit()
+        factory = database.create_session_factory(engine)
+        board = Leaderboard()
+        leaderboard.attach(board, factory)
+        leaderboard.track_commits()
+        board.resync(factory)
+        # execution
+        with factory() as db:
+            alice = db.get_one(Account, test_data.ACCOUNT_ALICE)
+            aid = db.get_one(Account, test_data.ACCOUNT_AID)
+            account_service.transfer_shares(
+                db,
+                amount=700,
+                from_account=alice,
+                to_account=aid,
+            )
+            with pytest.raises(InsufficientBalanceError):
+                account_service.transfer_shares(
+                    db,
+                    amount=10_000,
+                    from_account=aid,
+                    to_account=alice,
+                )
+        engine.dispose()
+        # validation
+        entry = board.rank("mutual-aid")
+        assert entry is not None
+        assert (entry.rank, entry.balance) == (1, 700)
+
+
+class TestKeepSynced:
+    """Test the keep_synced() context manager."""
+
+    def test_failed_loads_dont_stop_startup(self):
+        """A load that fails should be retried instead of raising."""
+        # setup
+        calls = []
+
+        async def resync() -> None:
+            calls.append(1)
+            if len(calls) == 1:
+                statement = "SELECT"
+                raise OperationalError(statement, {}, LookupError(statement))
+
+        async def run() -> None:
+            async with leaderboard.keep_synced(resync, interval=0.01):
+                await asyncio.sleep(0.05)
+
+        # execution
+        asyncio.run(run())
+        # validation
+        assert len(calls) > 1
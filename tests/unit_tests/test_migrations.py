@@ -0,0 +1,141 @@
+"""Test the alembic migrations in alembic/versions."""
+
+from pathlib import Path
+from uuid import uuid4
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+from cofundable import pagination
+from cofundable.pagination import CursorParams
+from cofundable.services.causes import cause_service
+
+ROOT = Path(__file__).parents[2]
+# the revision before handles were made unique
+BEFORE_UNIQUE_HANDLES = "d9734eb061ad"
+# the revision before whole second timestamps were normalized
+BEFORE_NORMALIZED_TIMESTAMPS = "72b2bf073dae"
+# the rows were timestamped by SQLite's now() before utc_now() was the default
+INSERT_ACCOUNT = sa.text(
+    """
+    INSERT INTO account (id, name, balance, created_at, updated_at)
+    VALUES (:id, :name, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    """,
+)
+INSERT_CAUSE = sa.text(
+    """
+    INSERT INTO cause (id, name, handle, account_id, created_at, updated_at)
+    VALUES (:id, :name, :name, :account_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    """,
+)
+
+INSERT_USER = sa.text(
+    """
+    INSERT INTO user (id, name, handle, account_id, created_at, updated_at)
+    VALUES (:id, :name, :name, :account_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    """,
+)
+
+
+def alembic_config() -> Config:
+    """Return a config for the migrations in alembic/versions."""
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    return config
+
+
+def test_upgrade_to_head_then_downgrade_to_base(tmp_path: Path):
+    """Every migration should apply, then be reverted, in order."""
+    # setup
+    config = alembic_config()
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    # execution
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+        tables = set(sa.inspect(connection).get_table_names())
+        command.downgrade(config, "base")
+    # validation
+    assert {"cause", "cause_search", "tag"} <= tables
+    assert sa.inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def test_cursors_page_through_whole_second_timestamps(tmp_path: Path):
+    """Rows created by the old now() default should each be paged once."""
+    # setup
+    config = alembic_config()
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, BEFORE_NORMALIZED_TIMESTAMPS)
+        for name in ("acme", "globex", "initech"):
+            account_id = uuid4().hex
+            connection.execute(
+                INSERT_ACCOUNT,
+                {"id": account_id, "name": name},
+            )
+            connection.execute(
+                INSERT_CAUSE,
+                {"id": uuid4().hex, "name": name, "account_id": account_id},
+            )
+        # execution
+        command.upgrade(config, "head")
+    handles: list[str] = []
+    with sa.orm.Session(engine) as session:
+        params = CursorParams(size=1)
+        # a cursor that doesn't move past its row would page forever
+        for _ in range(5):
+            page = pagination.paginate_by_keyset(
+                session,
+                cause_service.query_all(),
+                params,
+            )
+            handles.extend(cause.handle for cause in page["items"])
+            if page["next_cursor"] is None:
+                break
+            after = pagination.decode_cursor(page["next_cursor"])
+            params = CursorParams(size=1, after=after)
+    # validation
+    assert sorted(handles) == ["acme", "cofundable", "globex", "initech"]
+    engine.dispose()
+
+
+def test_duplicate_handles_are_renamed(tmp_path: Path):
+    """Repeated handles should get the row's id, except on the first row."""
+    # setup
+    config = alembic_config()
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    ids = {"cause": sorted(uuid4().hex for _ in range(2))}
+    ids["user"] = sorted(uuid4().hex for _ in range(2))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, BEFORE_UNIQUE_HANDLES)
+        for table, insert in (("cause", INSERT_CAUSE), ("user", INSERT_USER)):
+            for row_id in ids[table]:
+                account_id = uuid4().hex
+                connection.execute(
+                    INSERT_ACCOUNT,
+                    {"id": account_id, "name": "acme"},
+                )
+                connection.execute(
+                    insert,
+                    {"id": row_id, "name": "acme", "account_id": account_id},
+                )
+        # execution
+        command.upgrade(config, "head")
+        handles = {
+            table: connection.scalars(
+                sa.select(sa.column("handle"))
+                .select_from(sa.table(table))
+                .where(sa.column("name") == "acme"),
+            ).all()
+            for table in ("cause", "user")
+        }
+        # validation
+        # validation - the row with the lowest id is first, since the rows
+        # were created in the same second
+        for table, (_, second_id) in ids.items():
+            assert sorted(handles[table]) == ["acme", f"acme-{second_id}"]
+    engine.dispose()
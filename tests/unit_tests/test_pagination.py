@@ -0,0 +1,121 @@
+"""Test the pagination defined in pagination.py."""
+
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from cofundable import pagination
+from cofundable.pagination import CountCache, CursorParams
+from cofundable.services.causes import cause_service
+
+
+class TestCursors:
+    """Test encode_cursor() and decode_cursor()."""
+
+    def test_decoded_cursor_matches_encoded_keys(self):
+        """Decoding a cursor should return the keys that were encoded."""
+        # setup
+        keys = (
+            datetime(2024, 5, 12, 17, 18, 53, 197940, tzinfo=timezone.utc),
+            uuid4(),
+        )
+        # execution
+        cursor = pagination.encode_cursor(*keys)
+        # validation
+        assert pagination.decode_cursor(cursor) == keys
+
+    @pytest.mark.parametrize("change", ["payload", "signature", "format"])
+    def test_modified_cursors_are_rejected(self, change: str):
+        """Cursors that have been tampered with should raise a ValueError."""
+        # setup
+        keys = (
+            datetime(2024, 5, 12, 17, 18, 53, tzinfo=timezone.utc),
+            uuid4(),
+        )
+        payload, signature = pagination.encode_cursor(*keys).split(".")
+        forged = pagination.encode_cursor(keys[0], uuid4()).split(".")[0]
+        cursors = {
+            "payload": f"{forged}.{signature}",
+            "signature": f"{payload}.{signature[:-2]}AA",
+            "format": payload,
+        }
+        # validation
+        with pytest.raises(ValueError, match="(?i)cursor"):
+            pagination.decode_cursor(cursors[change])
+
+
+class TestCountCache:
+    """Test the CountCache class."""
+
+    def test_counts_are_cached_per_query(self, test_session: Session):
+        """Counts should be cached separately for each statement."""
+        # setup
+        cache = CountCache(ttl=60)
+        bind = test_session.get_bind()
+        query = cause_service.query_all()
+        filtered = query.where(cause_service.model.handle == "acme")
+        # execution
+        cache.set(cache.key(bind, query), 3)
+        # validation
+        assert cache.get(cache.key(bind, query)) == 3
+        assert cache.get(cache.key(bind, filtered)) is None
+
+    def test_counts_expire_after_ttl(self, test_session: Session):
+        """A count shouldn't be returned once its TTL has passed."""
+        # setup
+        cache = CountCache(ttl=0)
+        key = cache.key(test_session.get_bind(), cause_service.query_all())
+        # execution
+        cache.set(key, 3)
+        time.sleep(0.01)
+        # validation
+        assert cache.get(key) is None
+
+    def test_expired_counts_are_removed(self, test_session: Session):
+        """Setting a count should remove the counts that have expired."""
+        # setup
+        cache = CountCache(ttl=0)
+        bind = test_session.get_bind()
+        query = cause_service.query_all()
+        expired = cache.key(bind, query)
+        filtered = query.where(cause_service.model.handle == "acme")
+        current = cache.key(bind, filtered)
+        cache.set(expired, 3)
+        time.sleep(0.01)
+        # execution
+        cache.set(current, 2)
+        # validation
+        # pylint: disable=protected-access
+        assert expired not in cache._counts  # noqa: SLF001
+        assert current in cache._counts  # noqa: SLF001
+
+
+class TestPaginateByKeyset:
+    """Test the paginate_by_keyset() function."""
+
+    def test_pages_cover_every_row_once(self, test_session: Session):
+        """Following next_cursor should return every row in key order."""
+        # setup
+        query = cause_service.query_all()
+        expected = sorted(
+            test_session.scalars(query).all(),
+            key=lambda cause: (cause.created_at, cause.id),
+            reverse=True,
+        )
+        params = CursorParams(size=2)
+        causes: list = []
+        # execution
+        while True:
+            page = pagination.paginate_by_keyset(test_session, query, params)
+            causes.extend(page["items"])
+            if page["next_cursor"] is None:
+                break
+            after = pagination.decode_cursor(page["next_cursor"])
+            params = CursorParams(size=2, after=after)
+        # validation
+        assert [cause.id for cause in causes] == [
+            cause.id for cause in expected
+        ]
@@ -31,26 +31,27 @@ ACCOUNT_ACME = uuid5(namespace, "acme-account")
 ACCOUNT_AID = uuid5(namespace, "mutual-aid-account")
 ACCOUNT_ALICE = uuid5(namespace, "alice-account")
 ACCOUNT_BOB = uuid5(namespace, "bob-account")
+# balances and amounts are in minor units (hundredths of a share)
 ACCOUNTS = {
     ACCOUNT_COFUNDABLE: {
         "name": "cofundable",
-        "balance": 0.0,
+        "balance": 0,
     },
     ACCOUNT_ACME: {
         "name": "acme",
-        "balance": 5.00,
+        "balance": 500,
     },
     ACCOUNT_AID: {
         "name": "mutual-aid",
-        "balance": 0.00,
+        "balance": 0,
     },
     ACCOUNT_ALICE: {
         "name": "alice",
-        "balance": 10.00,
+        "balance": 1000,
     },
     ACCOUNT_BOB: {
         "name": "bob",
-        "balance": 5.00,
+        "balance": 500,
     },
 }
 
@@ -84,9 +85,9 @@ TAG_A = uuid5(namespace, "a")
 TAG_B = uuid5(namespace, "b")
 TAG_C = uuid5(namespace, "c")
 TAGS = {
-    TAG_A: {"name": "a"},
-    TAG_B: {"name": "b"},
-    TAG_C: {"name": "c"},
+    TAG_A: {"name": "a", "cause_count": 1},
+    TAG_B: {"name": "b", "cause_count": 2},
+    TAG_C: {"name": "c", "cause_count": 1},
 }
 
 # cause tags
@@ -134,27 +135,31 @@ ALICE_TO_ACME = uuid5(namespace, "alice-inflow")
 ACME_FROM_ALICE = uuid5(namespace, "acme-from-alice")
 TRANSACTIONS = {
     COFUNDABLE_TO_ALICE: {
-        "amount": 10,
+        "amount": 1000,
         "account_id": ACCOUNT_COFUNDABLE,
         "kind": EntryType.debit,
+        "balance_after": 0,
         "match_entry_id": ALICE_FROM_COFUNDABLE,
     },
     ALICE_FROM_COFUNDABLE: {
-        "amount": 10,
+        "amount": 1000,
         "account_id": ACCOUNT_ALICE,
         "kind": EntryType.credit,
+        "balance_after": 1500,
         "match_entry_id": COFUNDABLE_TO_ALICE,
     },
     ALICE_TO_ACME: {
-        "amount": 5,
+        "amount": 500,
         "account_id": ACCOUNT_ALICE,
         "kind": EntryType.debit,
+        "balance_after": 1000,
         "match_entry_id": ACME_FROM_ALICE,
     },
     ACME_FROM_ALICE: {
-        "amount": 5,
+        "amount": 500,
         "account_id": ACCOUNT_ACME,
         "kind": EntryType.credit,
+        "balance_after": 500,
         "match_entry_id": ALICE_TO_ACME,
     },
 }